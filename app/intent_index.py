@@ -0,0 +1,88 @@
+# app/intent_index.py
+"""
+Query index over the /intents cards.
+
+Built once when the schema loads:
+  - industry -> card positions (inverted index, in card order)
+  - per-scope sorted prefix keys (lowercased label and id) for `q` lookups
+
+Every query is a dict lookup or a bisect plus a walk over the matching slice,
+so its cost is proportional to the page returned, not to the registry size.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+Card = Dict[str, str]
+
+_KIND_LABEL = 0
+_KIND_ID = 1
+
+
+class IntentIndex:
+    def __init__(self, cards: List[Card]):
+        self.cards: List[Card] = list(cards)
+        self.by_industry: Dict[str, List[int]] = {}
+        for pos, card in enumerate(self.cards):
+            self.by_industry.setdefault(card.get("industry") or "Registry", []).append(pos)
+
+        # scope None = whole registry; otherwise one scope per industry
+        self._prefix: Dict[Optional[str], Tuple[List[str], List[Tuple[int, int]]]] = {
+            None: self._build_prefix(range(len(self.cards)))
+        }
+        for industry, positions in self.by_industry.items():
+            self._prefix[industry] = self._build_prefix(positions)
+
+    def _build_prefix(self, positions) -> Tuple[List[str], List[Tuple[int, int]]]:
+        entries: List[Tuple[str, int, int]] = []
+        for pos in positions:
+            card = self.cards[pos]
+            entries.append(((card.get("label") or "").lower(), _KIND_LABEL, pos))
+            entries.append(((card.get("id") or "").lower(), _KIND_ID, pos))
+        entries.sort()
+        return [e[0] for e in entries], [(e[1], e[2]) for e in entries]
+
+    def industries(self) -> List[Dict[str, object]]:
+        return [
+            {"industry": name, "count": len(positions)}
+            for name, positions in sorted(self.by_industry.items(), key=lambda kv: kv[0].lower())
+        ]
+
+    def query(
+        self,
+        industry: Optional[str] = None,
+        q: Optional[str] = None,
+        cursor: int = 0,
+        limit: Optional[int] = None,
+    ) -> Tuple[List[Card], Optional[int]]:
+        """
+        Return (cards, next_cursor). next_cursor is None when there is nothing left.
+        Without `q` the cursor is an offset into the (industry) card list; with `q`
+        it is an offset into that scope's sorted prefix keys.
+        """
+        cursor = max(0, int(cursor or 0))
+        if industry and industry not in self.by_industry:
+            return [], None
+
+        prefix = (q or "").strip().lower()
+        if not prefix:
+            positions = self.by_industry[industry] if industry else range(len(self.cards))
+            end = len(positions) if limit is None else min(len(positions), cursor + limit)
+            page = [self.cards[p] for p in positions[cursor:end]]
+            return page, (end if end < len(positions) else None)
+
+        keys, refs = self._prefix[industry or None]
+        i = max(cursor, bisect_left(keys, prefix))
+        out: List[Card] = []
+        while i < len(keys) and keys[i].startswith(prefix):
+            if limit is not None and len(out) >= limit:
+                return out, i
+            kind, pos = refs[i]
+            i += 1
+            card = self.cards[pos]
+            # an id hit is a duplicate when the same card's label also matches
+            if kind == _KIND_ID and (card.get("label") or "").lower().startswith(prefix):
+                continue
+            out.append(card)
+        return out, None
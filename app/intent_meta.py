@@ -0,0 +1,108 @@
+# app/intent_meta.py
+"""
+Immutable runtime view of the schema.
+
+Each intent is turned (on first access) into a frozen, slotted `IntentMeta` with
+tuples/frozensets for its field lists and the template path already normalized,
+so the request path reads attributes instead of walking nested dicts.
+
+A `SchemaSnapshot` bundles the raw schema, the /intents cards, the query index
+and the per-intent metadata. Reloading builds a new snapshot and swaps one
+reference; requests keep using whichever snapshot they started with.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, List, Mapping, Optional, Tuple
+
+from app.intent_index import IntentIndex
+from app.schema_store import LazySchema, build_cards
+
+_EMPTY: Mapping[str, str] = MappingProxyType({})
+
+
+def _strs(v: Any) -> Tuple[str, ...]:
+    return tuple(str(x) for x in v) if isinstance(v, (list, tuple)) else ()
+
+
+@dataclass(frozen=True, slots=True)
+class TemplateMeta:
+    subject: str = ""
+    body_path: str = ""
+
+    @property
+    def name(self) -> str:
+        """Template name relative to templates/ ('' when the intent has no body file)."""
+        p = self.body_path
+        return p[len("templates/"):] if p.startswith("templates/") else p
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class IntentMeta:
+    id: str
+    label: str
+    description: str
+    industry: str
+    required: Tuple[str, ...]
+    optional: Tuple[str, ...]
+    fields: FrozenSet[str]
+    field_types: Mapping[str, str]
+    date_fields: Tuple[str, ...]
+    template: TemplateMeta
+
+    @classmethod
+    def from_dict(cls, iid: str, d: Any) -> "IntentMeta":
+        if not isinstance(d, dict):
+            d = {}
+        label = d.get("label")
+        ftypes = d.get("fieldTypes") if isinstance(d.get("fieldTypes"), dict) else {}
+        tpl = d.get("template") if isinstance(d.get("template"), dict) else {}
+        required, optional = _strs(d.get("required")), _strs(d.get("optional"))
+        return cls(
+            id=iid,
+            label=label if isinstance(label, str) and label.strip() else iid,
+            description=str(d.get("description") or ""),
+            industry=str(d.get("industry") or "Registry"),
+            required=required,
+            optional=optional,
+            fields=frozenset(required) | frozenset(optional) | frozenset(ftypes),
+            field_types=MappingProxyType({str(k): str(v) for k, v in ftypes.items()}),
+            date_fields=tuple(str(k) for k, t in ftypes.items() if str(t).lower() == "date"),
+            template=TemplateMeta(
+                subject=str(tpl.get("subject") or ""),
+                body_path=str(tpl.get("bodyPath") or ""),
+            ),
+        )
+
+    @classmethod
+    def empty(cls, iid: str) -> "IntentMeta":
+        """Placeholder for intents outside the schema (e.g. rendered from an override)."""
+        return cls(iid, iid, "", "Registry", (), (), frozenset(), _EMPTY, (), TemplateMeta())
+
+
+class SchemaSnapshot:
+    __slots__ = ("schema", "cards", "index", "version", "derived", "_meta")
+
+    def __init__(self, schema: Mapping[str, Any]):
+        self.schema = schema
+        self.version: int = schema.version if isinstance(schema, LazySchema) else 0
+        cards = schema.cards if isinstance(schema, LazySchema) else build_cards(schema or {})
+        self.cards: Tuple[Dict[str, str], ...] = tuple(cards)
+        self.index = IntentIndex(list(self.cards))
+        # per-snapshot precomputed responses (e.g. /bootstrap bytes + ETag)
+        self.derived: Dict[str, Any] = {}
+        self._meta: Dict[str, IntentMeta] = {}
+
+    def __contains__(self, iid: object) -> bool:
+        return iid in self.schema
+
+    def meta(self, iid: str) -> Optional[IntentMeta]:
+        hit = self._meta.get(iid)
+        if hit is None and iid in self.schema:
+            # benign race: two threads may build equal objects; either one wins
+            hit = self._meta[iid] = IntentMeta.from_dict(iid, self.schema[iid])
+        return hit
+
+    def intents_list(self) -> List[Dict[str, str]]:
+        return list(self.cards)
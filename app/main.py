@@ -1,18 +1,41 @@
 # app/main.py
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import TYPE_CHECKING, Dict, List, Mapping, Optional, Any, Tuple
 
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel
-from jinja2 import Environment, FileSystemLoader, Undefined, TemplateNotFound
 
+import hashlib
 import json
+import os
 import re
+import threading
+import time
 
-app = FastAPI(title="Smart Mail Template API")
+from app.intent_meta import IntentMeta, SchemaSnapshot
+from app.preprocess import authored_text
+from app.schema_store import LazySchema, load_indexed_schema, load_samples
+from app.templating import TEMPLATES_DIR, compile_string, get_env
+from app.user_templates import VersionConflict, get_store
+
+if TYPE_CHECKING:  # jinja2 is imported lazily on first render
+    from jinja2 import Environment
+
+@asynccontextmanager
+async def _lifespan(_app):
+    # Warm up off the event loop so /health and /ready answer while it runs
+    if os.environ.get("SMART_MAIL_WARMUP", "1") == "0":
+        _mark_ready()
+    else:
+        threading.Thread(target=warmup, name="warmup", daemon=True).start()
+    yield
+
+app = FastAPI(title="Smart Mail Template API", lifespan=_lifespan)
 
 # --- Static UI (best-effort) ---
 try:
@@ -23,12 +46,16 @@ try:
 except Exception:
     pass
 
-# --- Schema loading (import first, file fallback) ---
-def _load_schema() -> Dict[str, Any]:
+# --- Schema loading (indexed artifact first, then module, then file fallback) ---
+def _load_schema() -> Mapping[str, Any]:
+    # Preferred: mmapped blob + offset index; intents decode on first access
+    indexed = load_indexed_schema()
+    if indexed is not None:
+        return indexed
     try:
-        # Preferred: generated Python module
+        # Generated Python module (imports the whole dict literal)
         from app.schema_generated import SCHEMA_GENERATED as SCHEMA  # type: ignore
-        return dict(SCHEMA)
+        return SCHEMA
     except Exception:
         pass
     # Fallback: generated JSON (either /public/ or repo root mirror)
@@ -44,55 +71,35 @@ def _load_schema() -> Dict[str, Any]:
             continue
     return {}
 
-SCHEMA: Dict[str, Any] = _load_schema()
+# Immutable snapshot (schema + cards + index + per-intent IntentMeta). Handlers read
+# it once per request; reload_schema() swaps the reference atomically.
+_SNAPSHOT: SchemaSnapshot = SchemaSnapshot(_load_schema())
+
+def _snapshot() -> SchemaSnapshot:
+    return _SNAPSHOT
+
+def reload_schema() -> SchemaSnapshot:
+    global _SNAPSHOT
+    _SNAPSHOT = SchemaSnapshot(_load_schema())
+    return _SNAPSHOT
+
 # --- Autodetect rules (imported from generated file, fallback safe) ---
 try:
     from app.autodetect_rules_generated import AUTODETECT_GENERATED as AUTODETECT  # type: ignore
 except Exception:
     AUTODETECT: Dict[str, Any] = {}
 
-# Build compact intent list for cards (id + label + description + industry).
-# Also include "name" as an alias for id to simplify frontend code.
+# Compact intent list for cards (id + label + description + industry).
+# The indexed schema ships these precomputed; otherwise the snapshot builds them.
 def _intents_list() -> List[Dict[str, str]]:
-    items: List[Dict[str, str]] = []
-    for iid, meta in (SCHEMA or {}).items():
-        if not isinstance(meta, dict):
-            meta = {}
-        label = (meta.get("label") or iid) if isinstance(meta.get("label"), str) else iid
-        desc  = meta.get("description") or ""
-        industry = meta.get("industry") or "Registry"
-        items.append({
-            "id": iid,
-            "name": iid,               # alias for convenience on the UI
-            "label": label or iid,
-            "description": desc,
-            "industry": industry,
-        })
-
-    # Put Auto Detect first; then alphabetical by label
-    def sort_key(x):
-        return (0 if x["id"] == "auto_detect" else 1, (x.get("label") or "").lower())
-    items.sort(key=sort_key)
-    return items
+    return _snapshot().intents_list()
 
 def _env() -> Environment:
-    # templates/ should contain one file per intent, e.g., order_request.j2
-    tdir = Path(__file__).resolve().parent.parent / "templates"
-    return Environment(
-        loader=FileSystemLoader(str(tdir)),
-        autoescape=False,
-        undefined=Undefined,   # missing optionals render as empty
-        trim_blocks=True,
-        lstrip_blocks=True,
-    )
+    return get_env()
 
 def _label_for(intent: str) -> str:
-    meta = SCHEMA.get(intent) if isinstance(SCHEMA, dict) else None
-    if isinstance(meta, dict):
-        lab = meta.get("label")
-        if isinstance(lab, str) and lab.strip():
-            return lab
-    return intent
+    meta = _snapshot().meta(intent)
+    return meta.label if meta is not None else intent
 
 # --- Models ---
 class TemplateOverride(BaseModel):
@@ -103,11 +110,22 @@ class GenerateReq(BaseModel):
     intent: str
     fields: Dict[str, Any] = {}
     templateOverride: Optional[TemplateOverride] = None  # NEW
+    templateId: Optional[str] = None        # server-side user template (see /user_templates)
+    templateVersion: Optional[int] = None   # optional pin; 409 if the stored version moved on
 
 class GenerateResp(BaseModel):
     subject: str
     body: str
     missing: List[str] = []
+
+class UserTemplateIn(BaseModel):
+    id: Optional[str] = None
+    label: Optional[str] = None
+    description: Optional[str] = None
+    subject: Optional[str] = None
+    body: Optional[str] = None
+    fields: Optional[List[Dict[str, Any]]] = None
+    version: Optional[int] = None  # PUT only: expected current version
 class AutoDetectReq(BaseModel):
     to: Optional[str] = None
     subject: Optional[str] = None
@@ -218,30 +236,240 @@ def _strip_subject_line(body: str) -> str:
         return ""
     return re.sub(r"^\s*subject\s*:\s*.*\n+", "", body, flags=re.IGNORECASE)
 
+def _is_missing(v: Any) -> bool:
+    # Treat empty list/dict/blank as missing
+    if isinstance(v, list):
+        return len(v) == 0
+    if isinstance(v, dict):
+        return len(v) == 0
+    return str(v or "").strip() == ""
+
+def _polish_body(body: str) -> str:
+    # Clean up body & add polite closing if absent
+    body = _strip_subject_line(body)
+    low = body.lower()
+    if not any(k in low for k in ("thank you", "thanks", "appreciate")):
+        body = body.rstrip() + "\n\nThank you.\n"
+    return body
+
 # --- Routes ---
 @app.get("/schema")
-def get_schema():
-    return JSONResponse(SCHEMA)
+def get_schema(since: Optional[int] = None):
+    """
+    Full schema, or with `since=<version>` only the intents added/changed/removed
+    after that version. The current version is sent in X-Schema-Version.
+    """
+    schema = _snapshot().schema
+    if not isinstance(schema, LazySchema):
+        # Unversioned fallback (module / JSON file): always the full schema
+        return JSONResponse(dict(schema))
+    headers = {"X-Schema-Version": str(schema.version)}
+    if since is not None:
+        return JSONResponse(schema.delta(since), headers=headers)
+    return Response(content=schema.to_json_bytes(), media_type="application/json", headers=headers)
 
 @app.get("/intents")
-def list_intents():
-    return JSONResponse(_intents_list())
+def list_intents(
+    industry: Optional[str] = None,
+    q: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+):
+    """
+    Intent cards, optionally filtered by industry and/or label/id prefix (`q`).
+    With `limit`, the next page's cursor is returned in the X-Next-Cursor header.
+    """
+    if industry is None and not q and cursor is None and limit is None:
+        return JSONResponse(_intents_list())
+    try:
+        start = int(cursor) if cursor else 0
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {cursor}")
+    items, next_cursor = _snapshot().index.query(industry=industry, q=q, cursor=start, limit=limit)
+    headers = {"X-Next-Cursor": str(next_cursor)} if next_cursor is not None else None
+    return JSONResponse(items, headers=headers)
+
+@app.get("/industries")
+def list_industries():
+    return JSONResponse(_snapshot().index.industries())
+
+def _capabilities(snap: SchemaSnapshot) -> Dict[str, Any]:
+    return {
+        "schemaVersion": snap.version,
+        "schemaDelta": isinstance(snap.schema, LazySchema),
+        "intentFilters": ["industry", "q", "cursor", "limit"],
+        "userTemplates": True,
+        "autodetect": "rules",
+    }
+
+def _bootstrap_bytes(snap: SchemaSnapshot, with_schema: bool = True):
+    """(body, etag) for /bootstrap, built once per schema snapshot."""
+    key = "bootstrap" if with_schema else "bootstrap_lite"
+    hit = snap.derived.get(key)
+    if hit is not None:
+        return hit
+    rest = json.dumps({
+        "intents": snap.intents_list(),
+        "industries": snap.index.industries(),
+        "capabilities": _capabilities(snap),
+    }, separators=(",", ":")).encode("utf-8")
+    body = rest
+    if with_schema:
+        schema = snap.schema
+        schema_json = (
+            schema.to_json_bytes() if isinstance(schema, LazySchema)
+            else json.dumps(dict(schema), separators=(",", ":")).encode("utf-8")
+        )
+        body = b'{"schema":' + schema_json + b"," + rest[1:]
+    etag = '"' + hashlib.sha256(body).hexdigest()[:20] + '"'
+    snap.derived[key] = (body, etag)
+    return body, etag
+
+@app.get("/bootstrap")
+def bootstrap(request: Request, schema: bool = True):
+    """
+    Everything the UI needs on load in one response: schema, intent cards,
+    industries and server capabilities. ETagged, so a warm client gets a 304.
+    A client holding a cached schema passes `schema=false` and, if
+    capabilities.schemaVersion moved on, patches it via /schema?since=.
+    """
+    body, etag = _bootstrap_bytes(_snapshot(), with_schema=schema)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in [t.strip() for t in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+# --- Readiness / warm-up ---
+_WARMUP: Dict[str, Any] = {"ready": False, "running": False, "templates": 0, "samples": 0, "errors": []}
+_WARMUP_LOCK = threading.Lock()
+
+def _mark_ready() -> None:
+    with _WARMUP_LOCK:
+        _WARMUP["ready"] = True
+
+def warmup() -> Dict[str, Any]:
+    """
+    Pay first-request costs up front: compile every template named in the schema
+    (and its YAML subject), build the autodetect rules, render each intent's
+    tests.samples through /generate and precompute /bootstrap. /ready flips to
+    200 once this finishes; sample failures are reported, not fatal.
+    """
+    with _WARMUP_LOCK:
+        if _WARMUP["running"]:
+            return dict(_WARMUP)
+        _WARMUP["running"] = True
+    started = time.perf_counter()
+    errors: List[str] = []
+    templates = samples = 0
+    try:
+        snap = _snapshot()
+        env = _env()
+        for iid in snap.schema:
+            meta = snap.meta(iid)
+            if meta is None:
+                continue
+            try:
+                if meta.template.name:
+                    env.get_template(meta.template.name)
+                    templates += 1
+                if meta.template.subject:
+                    compile_string(meta.template.subject)
+            except Exception as e:
+                errors.append(f"{iid}: template: {e}")
+
+        _autodetect_rules()
+
+        for iid, rows in load_samples().items():
+            if iid not in snap:
+                continue
+            for fields in rows:
+                try:
+                    generate(GenerateReq(intent=iid, fields=fields))
+                    samples += 1
+                except Exception as e:
+                    errors.append(f"{iid}: sample: {getattr(e, 'detail', e)}")
+
+        _bootstrap_bytes(snap)
+    except Exception as e:
+        errors.append(f"warmup: {e}")
+    finally:
+        with _WARMUP_LOCK:
+            _WARMUP.update(
+                ready=True,
+                running=False,
+                templates=templates,
+                samples=samples,
+                errors=errors,
+                seconds=round(time.perf_counter() - started, 3),
+            )
+    return dict(_WARMUP)
+
+@app.get("/ready")
+def ready():
+    """Load-balancer readiness: 503 until warm-up has finished."""
+    with _WARMUP_LOCK:
+        state = dict(_WARMUP)
+    state.pop("running", None)
+    return JSONResponse(state, status_code=200 if state["ready"] else 503)
 
 @app.get("/health")
 def health():
     return {
         "ok": True,
         "intents": [x["id"] for x in _intents_list()],
-        "templates_dir": str(Path(__file__).resolve().parent.parent / "templates"),
-        "schema_keys": list(SCHEMA.keys()) if isinstance(SCHEMA, dict) else [],
+        "templates_dir": str(TEMPLATES_DIR),
+        "schema_keys": list(_snapshot().schema.keys()),
     }
 
+def _generate_from_user_template(req: GenerateReq) -> GenerateResp:
+    store = get_store()
+    rec = store.get(req.templateId or "")
+    if rec is None:
+        raise HTTPException(status_code=404, detail=f"Unknown template: {req.templateId}")
+    if req.templateVersion is not None and req.templateVersion != rec["version"]:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Template {rec['id']} is at version {rec['version']}, not {req.templateVersion}",
+        )
+
+    fields = dict(req.fields or {})
+    specs = [f for f in rec["fields"] if isinstance(f, dict) and f.get("name")]
+    for f in specs:
+        if str(f.get("type") or "").lower() == "date" and isinstance(fields.get(f["name"]), str):
+            fields[f["name"]] = _normalize_date(fields[f["name"]])
+    if "parts" in fields or any(f["name"] == "parts" for f in specs):
+        fields["parts"] = _coerce_parts(fields.get("parts", []))
+    missing = [f["name"] for f in specs if f.get("required") and _is_missing(fields.get(f["name"]))]
+
+    try:
+        body_tpl, subject_tpl = store.compiled(rec)
+        body = body_tpl.render(**fields)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Template render error for '{rec['id']}': {e}")
+
+    subject_value = None
+    if subject_tpl is not None:
+        try:
+            subject_value = subject_tpl.render(**fields)
+        except Exception:
+            subject_value = rec["subject"]
+
+    return GenerateResp(
+        subject=subject_value or rec["label"] or rec["id"],
+        body=_polish_body(body),
+        missing=missing,
+    )
+
 @app.post("/generate", response_model=GenerateResp)
 def generate(req: GenerateReq):
     intent = (req.intent or "").strip()
     if not intent:
         raise HTTPException(status_code=400, detail="Missing 'intent'.")
 
+    # Server-side user template: compiled once per version, no body in the payload
+    if req.templateId:
+        return _generate_from_user_template(req)
+
     # NEW: accept unknown intents if a local override is provided (e.g., user templates u:*)
     ov = getattr(req, "templateOverride", None)
     has_override = bool(
@@ -251,7 +479,9 @@ def generate(req: GenerateReq):
         )
     )
 
-    if intent not in SCHEMA and not has_override:
+    snap = _snapshot()
+    meta = snap.meta(intent)
+    if meta is None and not has_override:
         # allow auto_detect to return a safe stub
         if intent == "auto_detect":
             return GenerateResp(
@@ -262,43 +492,26 @@ def generate(req: GenerateReq):
         raise HTTPException(status_code=400, detail=f"Unknown intent: {intent}")
 
     fields = dict(req.fields or {})
-    meta = SCHEMA.get(intent, {}) if isinstance(SCHEMA, dict) else {}
-    required = meta.get("required", []) if isinstance(meta, dict) else []
-    field_types = meta.get("fieldTypes", {}) if isinstance(meta, dict) else []
+    if meta is None:
+        meta = IntentMeta.empty(intent)
 
     # Normalize date-like fields
-    for k, t in field_types.items():
-        if str(t).lower() == "date" and isinstance(fields.get(k), str):
+    for k in meta.date_fields:
+        if isinstance(fields.get(k), str):
             fields[k] = _normalize_date(fields.get(k) or "")
 
     # Normalize parts
-    if "parts" in (fields.keys() | field_types.keys()):
+    if "parts" in fields or "parts" in meta.field_types:
         fields["parts"] = _coerce_parts(fields.get("parts", []))
 
     # Compute missing required (treat empty list/dict/blank as missing)
-    def _is_missing(v: Any) -> bool:
-        if isinstance(v, list):
-            return len(v) == 0
-        if isinstance(v, dict):
-            return len(v) == 0
-        return str(v or "").strip() == ""
-
-    missing = [k for k in required if _is_missing(fields.get(k))]
+    missing = [k for k in meta.required if _is_missing(fields.get(k))]
 
     # Render template
     env = _env()
 
-    def _normalize_body_path(p: str) -> str:
-        """Strip leading 'templates/' so Jinja finds files under its root."""
-        if p and p.startswith("templates/"):
-            return p[len("templates/"):]
-        return p
-
     # Pull path (+subject) from schema if available; fallback to <intent>.j2
-    schema_entry = SCHEMA.get(intent, {})
-    tpl_info = schema_entry.get("template") or {}
-    body_path = tpl_info.get("bodyPath")
-    template_name = _normalize_body_path(body_path) if body_path else f"{intent}.j2"
+    template_name = meta.template.name or f"{intent}.j2"
 
     # === Local override support ===
     ov = getattr(req, "templateOverride", None)  # Optional[TemplateOverride]
@@ -307,6 +520,8 @@ def generate(req: GenerateReq):
     # Only load the file template if we don't have an override body
     tpl = None
     if not has_ov_body:
+        from jinja2 import TemplateNotFound
+
         try:
             tpl = env.get_template(template_name)
         except TemplateNotFound:
@@ -318,7 +533,7 @@ def generate(req: GenerateReq):
     # Render body: override first; else file
     try:
         if has_ov_body:
-            body = env.from_string(ov.body).render(**fields)
+            body = compile_string(ov.body).render(**fields)
         else:
             body = tpl.render(**fields)  # type: ignore[union-attr]
     except Exception as e:
@@ -336,15 +551,15 @@ def generate(req: GenerateReq):
 
     if ov and isinstance(ov.subject, str) and ov.subject.strip():
         try:
-            subject_value = env.from_string(ov.subject).render(**fields)
+            subject_value = compile_string(ov.subject).render(**fields)
         except Exception:
             subject_value = ov.subject
 
     if not subject_value:
-        yaml_subject = tpl_info.get("subject")
+        yaml_subject = meta.template.subject
         if yaml_subject:
             try:
-                subject_value = env.from_string(yaml_subject).render(**fields)
+                subject_value = compile_string(yaml_subject).render(**fields)
             except Exception:
                 subject_value = yaml_subject
 
@@ -355,34 +570,55 @@ def generate(req: GenerateReq):
                 s = line.strip()
                 if s.startswith("Subject:"):
                     subject_raw = s.split("Subject:", 1)[1].strip()
-                    subject_value = env.from_string(subject_raw).render(**fields)
+                    subject_value = compile_string(subject_raw).render(**fields)
                     break
         except Exception:
             pass
 
     if not subject_value:
-        subject_value = schema_entry.get("label") or intent
+        subject_value = meta.label or intent
 
-    # Clean up body & add polite closing if absent
-    body = _strip_subject_line(body)
-    low = body.lower()
-    if not any(k in low for k in ("thank you", "thanks", "appreciate")):
-        body = body.rstrip() + "\n\nThank you.\n"
+    body = _polish_body(body)
 
     # Final subject
     subject = subject_value or _label_for(intent)
 
     return GenerateResp(subject=subject, body=body, missing=missing)
+@lru_cache(maxsize=1)
+def _autodetect_rules() -> Tuple[Tuple[str, Tuple[str, ...], Tuple[Tuple[str, float], ...]], ...]:
+    """
+    AUTODETECT rules pre-normalized once: lowercased non-empty keywords and numeric
+    boosts, skipping the synthetic auto_detect intent.
+    """
+    rules = []
+    for intent_id, rule in (AUTODETECT or {}).items():
+        if intent_id == "auto_detect":
+            continue
+        rule = rule or {}
+        keywords = tuple(
+            kw.strip().lower() for kw in (rule.get("keywords") or []) if (kw or "").strip()
+        )
+        boosts = []
+        for feat, weight in (rule.get("boosts") or {}).items():
+            try:
+                boosts.append((feat, float(weight)))
+            except Exception:
+                continue
+        rules.append((intent_id, keywords, tuple(boosts)))
+    return tuple(rules)
+
 def _run_autodetect(req: AutoDetectReq) -> AutoDetectResp:
     """
     Simple keyword + boost based intent detection using AUTODETECT rules.
     Normalizes whatever fields the frontend sends (hint/text/body/body_hint/subject).
     """
-    # Combine all hint-like fields into one text blob
+    # Combine all hint-like fields into one text blob; pasted emails contribute
+    # only their authored top (quoted thread and signature cut)
     parts: List[str] = []
-    for v in [req.subject, req.hint, req.text, req.body, req.body_hint]:
+    fields = [(req.subject, False), (req.hint, False), (req.text, True), (req.body, True), (req.body_hint, False)]
+    for v, is_email in fields:
         if isinstance(v, str) and v.strip():
-            parts.append(v.strip())
+            parts.append(authored_text(v) if is_email else v.strip())
     text = " ".join(parts).strip()
 
     if not text:
@@ -398,35 +634,24 @@ def _run_autodetect(req: AutoDetectReq) -> AutoDetectResp:
     }
 
     candidates: List[Dict[str, Any]] = []
+    snap = _snapshot()
 
-    # Iterate over rules; skip the synthetic auto_detect intent
-    for intent_id, rule in (AUTODETECT or {}).items():
-        if intent_id == "auto_detect":
+    # Iterate over rules (auto_detect already excluded)
+    for intent_id, keywords, boosts in _autodetect_rules():
+        if intent_id not in snap:
             continue
-        if intent_id not in SCHEMA:
-            continue
-
-        rule = rule or {}
-        keywords = rule.get("keywords") or []
-        boosts = rule.get("boosts") or {}
 
         score = 0.0
 
         # Keyword hits
         for kw in keywords:
-            kw = (kw or "").strip()
-            if not kw:
-                continue
-            if kw.lower() in low_text:
+            if kw in low_text:
                 score += 0.25  # base weight per keyword hit
 
         # Feature boosts (e.g., containsPO, reply)
-        for feat, weight in boosts.items():
+        for feat, weight in boosts:
             if features.get(feat):
-                try:
-                    score += float(weight)
-                except Exception:
-                    continue
+                score += weight
 
         if score > 0.0:
             candidates.append({"intent": intent_id, "score": score})
@@ -475,19 +700,12 @@ def template_source(intent_id: str):
     """
     env = _env()
 
-    def _normalize_body_path(p: str) -> str:
-        if p and p.startswith("templates/"):
-            return p[len("templates/"):]
-        return p
-
-    schema_entry = SCHEMA.get(intent_id, {})
-    if not schema_entry:
+    meta = _snapshot().meta(intent_id)
+    if meta is None:
         raise HTTPException(status_code=404, detail=f"Unknown intent: {intent_id}")
 
-    tpl_info = schema_entry.get("template") or {}
-    subject_tpl = tpl_info.get("subject") or ""
-    body_path = tpl_info.get("bodyPath")
-    template_name = _normalize_body_path(body_path) if body_path else f"{intent_id}.j2"
+    subject_tpl = meta.template.subject
+    template_name = meta.template.name or f"{intent_id}.j2"
 
     try:
         src, _, _ = env.loader.get_source(env, template_name)
@@ -496,3 +714,44 @@ def template_source(intent_id: str):
 
     return {"intentId": intent_id, "subject": subject_tpl, "body": src}
 
+
+# --- User templates (server-side store) ---
+@app.get("/user_templates")
+def list_user_templates():
+    return get_store().list()
+
+@app.post("/user_templates", status_code=201)
+def create_user_template(payload: UserTemplateIn):
+    from jinja2 import TemplateSyntaxError
+
+    try:
+        return get_store().create(payload.model_dump(exclude={"version"}))
+    except TemplateSyntaxError as e:
+        raise HTTPException(status_code=400, detail=f"Template syntax error (line {e.lineno}): {e.message}")
+
+@app.get("/user_templates/{template_id}")
+def get_user_template(template_id: str):
+    rec = get_store().get(template_id)
+    if rec is None:
+        raise HTTPException(status_code=404, detail=f"Unknown template: {template_id}")
+    return rec
+
+@app.put("/user_templates/{template_id}")
+def update_user_template(template_id: str, payload: UserTemplateIn):
+    from jinja2 import TemplateSyntaxError
+
+    data = payload.model_dump(exclude={"id", "version"})
+    try:
+        return get_store().update(template_id, data, expected_version=payload.version)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown template: {template_id}")
+    except VersionConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except TemplateSyntaxError as e:
+        raise HTTPException(status_code=400, detail=f"Template syntax error (line {e.lineno}): {e.message}")
+
+@app.delete("/user_templates/{template_id}")
+def delete_user_template(template_id: str):
+    if not get_store().delete(template_id):
+        raise HTTPException(status_code=404, detail=f"Unknown template: {template_id}")
+    return {"ok": True, "id": template_id}
@@ -0,0 +1,104 @@
+# app/precompiled.py
+"""
+Ahead-of-time compiled Jinja templates.
+
+`scripts/regen_schemas.py` compiles everything in templates/ into the importable
+package app/templates_compiled/ (one `tmpl_<sha1(name)>.py` module per template,
+as Jinja's ModuleLoader expects) plus a manifest of source hashes, then
+byte-compiles it. At runtime `PrecompiledLoader` imports the module instead of
+parsing the source, and falls back to compiling from source for templates that
+were never compiled or whose source changed since.
+
+Imported lazily from app.templating, so jinja2 stays off the import path.
+"""
+from __future__ import annotations
+
+import compileall
+import hashlib
+import json
+import shutil
+from pathlib import Path
+from typing import Any, Dict, List, MutableMapping, Optional
+
+import jinja2
+from jinja2 import BaseLoader, Environment, FileSystemLoader, ModuleLoader, TemplateNotFound
+
+COMPILED_DIR = Path(__file__).resolve().parent / "templates_compiled"
+MANIFEST_PATH = COMPILED_DIR / "manifest.json"
+
+
+def source_digest(source: str) -> str:
+    return hashlib.sha1(source.encode("utf-8")).hexdigest()
+
+
+def load_manifest(path: Path = MANIFEST_PATH) -> Optional[Dict[str, str]]:
+    """{template name: source sha1}, or None if missing or built by another Jinja version."""
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    if data.get("jinja2") != jinja2.__version__:
+        return None
+    templates = data.get("templates")
+    return templates if isinstance(templates, dict) else None
+
+
+class PrecompiledLoader(BaseLoader):
+    """Serve templates from compiled modules when fresh, else compile from source."""
+
+    def __init__(self, source_loader: BaseLoader, compiled_dir: Path, manifest: Dict[str, str]):
+        self.source_loader = source_loader
+        self.modules = ModuleLoader(str(compiled_dir))
+        self.manifest = manifest
+
+    def get_source(self, environment: Environment, template: str):
+        return self.source_loader.get_source(environment, template)
+
+    def list_templates(self) -> List[str]:
+        return self.source_loader.list_templates()
+
+    def load(
+        self,
+        environment: Environment,
+        name: str,
+        globals: Optional[MutableMapping[str, Any]] = None,
+    ):
+        source, filename, uptodate = self.source_loader.get_source(environment, name)
+        if self.manifest.get(name) == source_digest(source):
+            try:
+                tpl = self.modules.load(environment, name, globals)
+                tpl._uptodate = uptodate  # keep auto_reload working for edited sources
+                return tpl
+            except TemplateNotFound:
+                pass
+        # missing or stale compiled module: same path as BaseLoader.load
+        code = environment.compile(source, name, filename)
+        return environment.template_class.from_code(environment, code, globals or {}, uptodate)
+
+
+def compile_templates(
+    templates_dir: Path,
+    env_options: Dict[str, Any],
+    target: Path = COMPILED_DIR,
+) -> int:
+    """Compile every template under templates_dir into `target`; returns how many were compiled."""
+    env = Environment(loader=FileSystemLoader(str(templates_dir)), **env_options)
+    if target.exists():
+        shutil.rmtree(target)
+    target.mkdir(parents=True)
+
+    manifest: Dict[str, str] = {}
+    names = env.list_templates()
+    env.compile_templates(str(target), zip=None, ignore_errors=False)
+    for name in names:
+        source, _, _ = env.loader.get_source(env, name)  # type: ignore[union-attr]
+        manifest[name] = source_digest(source)
+
+    (target / "__init__.py").write_text(
+        "# AUTO-GENERATED PACKAGE — precompiled Jinja templates (see app/precompiled.py).\n",
+        encoding="utf-8",
+    )
+    manifest_doc = {"jinja2": jinja2.__version__, "templates": dict(sorted(manifest.items()))}
+    (target / MANIFEST_PATH.name).write_text(json.dumps(manifest_doc, indent=2) + "\n", encoding="utf-8")
+    compileall.compile_dir(str(target), quiet=1)
+    return len(manifest)
@@ -1,12 +1,115 @@
 import re, html
-from typing import Tuple
+from typing import NamedTuple, Tuple
 
 SUBJ_PREFIX = re.compile(r"^(re|fwd|fw)\s*:\s*", re.I)
 
-# Split before common forward/quote headers
-FWD_SPLIT = re.compile(
-    r"(?im)^(?:[-_]{2,}\s*forwarded message\s*[-_]{2,}|from:\s|sent:\s|subject:\s|to:\s|cc:\s)"
+# Line boundaries of str.splitlines() and whitespace inside a line
+_LB = "\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+_WS = rf"[^\S{_LB}]"
+# First line of quoted history (the legacy per-line rule: a line of splitlines()
+# starting with '>' after optional blanks, a reply/forward header, or "Subject: ..."):
+# the top authored segment ends before it.
+_TOP_END = (
+    r"{ws}*>|on [^{lb}]+ wrote:|(?:from|sent|subject|to|cc|bcc):{ws}"
+    r"|-{{2,}}{ws}*(?:original|forwarded) message{ws}*-{{2,}}|forwarded message"
 )
+_TOP_END_RE = re.compile(r"(?i)(?:^|(?<=[%s]))(?:%s)" % (_LB, _TOP_END.format(ws=_WS, lb=_LB)))
+# same for bodies whose only line boundary is '\n' (most mail; '^' is much cheaper than a lookbehind)
+_TOP_END_NL_RE = re.compile(r"(?im)^(?:%s)" % _TOP_END.format(ws=r"[^\S\n]", lb=r"\n"))
+_OTHER_LB = _LB[1:]
+# One pass over a body finds the other lines that matter for segmentation:
+#   fwd    forwarded-message / header block: ends the newest block
+#   drop   '> ' line: dropped from the newest block
+#   sig    signature delimiter ("-- ") or a sign-off line ("Best regards,")
+_SEGMENT_RE = re.compile(
+    r"(?im)^(?:"
+    r"(?P<fwd>[-_]{2,}\s*forwarded message\s*[-_]{2,}|(?:from|sent|subject|to|cc):\s)"
+    r"|(?P<drop>\s*>(?:[^\S\n].*$|$))"
+    r"|(?P<sig>--[ \t]*\r?$|sent from my\b"
+    r"|(?:(?:best|kind|warm|warmest)\s+regards|regards|(?:many\s+)?thanks|thank you|cheers|sincerely)"
+    r"[ \t]*[,.!]?[ \t]*\r?$)"
+    r")"
+)
+_BLANK_RUNS = re.compile(r"\n{3,}")
+# a sign-off line only starts the signature if at most this many lines follow it
+SIG_MAX_LINES = 6
+
+
+class Segments(NamedTuple):
+    top: str  # authored text before the first quote/reply/forward marker, signature included
+    signature: str  # sign-off block at the end of `top` (from a "-- " line or a closing like "Regards,")
+    quoted: str  # everything from the first marker on
+    newest: str  # text before the first forwarded header with "> " lines removed (strip_quoted)
+
+
+_NO_SEGMENTS = Segments("", "", "", "")
+
+
+def _lines(text: str) -> str:
+    """Text with every splitlines() boundary turned into '\n', stripped."""
+    return "\n".join(text.splitlines()).strip()
+
+
+def _top_end(body: str):
+    """(offset where the top authored segment ends, function that tidies its lines)."""
+    other_lb = any(c in body for c in _OTHER_LB)  # a few memchr scans beat one character-class scan
+    m = (_TOP_END_RE if other_lb else _TOP_END_NL_RE).search(body)
+    return (m.start() if m else len(body)), (_lines if other_lb else str.strip)
+
+
+def top_segment(body: str) -> str:
+    """segment_body(body).top, without the scan for the other parts."""
+    if not body:
+        return ""
+    top_end, lines = _top_end(body)
+    return lines(body[:top_end])
+
+
+def segment_body(body: str) -> Segments:
+    """Split a plain-text body into its parts: one search for the top's end, one scan for the rest."""
+    if not body:
+        return _NO_SEGMENTS
+    n = len(body)
+    top_end, lines = _top_end(body)
+    fwd_end = n
+    sig_delim = sig_close = None
+    drops = []
+    for m in _SEGMENT_RE.finditer(body):
+        kind = m.lastgroup
+        if kind == "sig":
+            if m.start() < top_end:
+                if m.group(0).startswith("--"):
+                    sig_delim = m.start() if sig_delim is None else sig_delim
+                else:
+                    sig_close = m.start()
+            continue
+        if kind == "fwd":
+            fwd_end = m.start()
+            break
+        drops.append(m.span())
+
+    sig_start = sig_delim
+    if (
+        sig_start is None
+        and sig_close is not None
+        and body.count("\n", sig_close, top_end) <= SIG_MAX_LINES
+        and body[:sig_close].strip()  # a sign-off with nothing above it is the message itself
+    ):
+        sig_start = sig_close
+
+    pieces, pos = [], 0
+    for s, e in drops:
+        pieces.append(body[pos:s])
+        pos = e
+    pieces.append(body[pos:fwd_end])
+    newest = _BLANK_RUNS.sub("\n\n", "".join(pieces).replace("\r", "\n")).strip()
+
+    return Segments(
+        top=lines(body[:top_end]),
+        signature=lines(body[sig_start:top_end]) if sig_start is not None else "",
+        quoted=body[top_end:].strip(),
+        newest=newest,
+    )
 
 
 def normalize_subject(s: str) -> str:
@@ -19,29 +122,71 @@ def normalize_subject(s: str) -> str:
 
 
 def strip_quoted(body: str) -> str:
-    if not body:
-        return ""
-    txt = body
-    # keep only the newest block (before forwarded/quoted header)
-    parts = FWD_SPLIT.split(txt, maxsplit=1)
-    txt = parts[0]
-    # drop quoted lines
-    txt = re.sub(r"(?m)^\s*>\s.*$", "", txt)
-    # normalize whitespace
-    txt = re.sub(r"\r", "\n", txt)
-    txt = re.sub(r"\n{3,}", "\n\n", txt)
-    return txt.strip()
-
-
-def html_to_text(s: str) -> str:
+    """Newest block of a body: cut at the first forwarded header, "> " lines dropped."""
+    return segment_body(body).newest
+
+
+def authored_text(body: str) -> str:
+    """Top authored text without its signature (the body itself if that leaves nothing)."""
+    seg = segment_body(body)
+    top = seg.top[: len(seg.top) - len(seg.signature)].strip() if seg.signature else seg.top
+    return top or (body or "").strip()
+
+
+# HTML bodies longer than this are truncated before conversion (marketing mail
+# can carry megabytes of markup; the text that matters is near the top).
+HTML_MAX_CHARS = 1_000_000
+
+_SCRIPT_STYLE_OPEN = re.compile(r"<(script|style)")
+_BR = re.compile(r"(?i)<br\s*/?>")
+_P_CLOSE = re.compile(r"(?i)</p>")
+_TAG = re.compile(r"<[^>]*>")
+
+
+def _drop_script_style(s: str) -> str:
+    """Remove <script>/<style> ... </script>/</style> blocks with one forward scan."""
+    low = s.lower()
+    if "<script" not in low and "<style" not in low:
+        return s
+    out, pos, search_at = [], 0, 0
+    unclosed = set()  # no closing tag after some point -> none after any later opener either
+    while True:
+        m = _SCRIPT_STYLE_OPEN.search(low, search_at)
+        if not m:
+            break
+        name = m.group(1)
+        search_at = m.end()
+        if name in unclosed:
+            continue
+        gt = low.find(">", search_at)
+        end = low.find(f"</{name}>", gt + 1) if gt >= 0 else -1
+        if end < 0:
+            unclosed.add(name)
+            continue
+        out.append(s[pos:m.start()])
+        pos = search_at = end + len(name) + 3
+    out.append(s[pos:])
+    return "".join(out)
+
+
+def html_to_text(s: str, max_chars: int = HTML_MAX_CHARS) -> str:
+    """
+    Tags stripped, script/style dropped, <br> -> newline, </p> -> blank line,
+    entities unescaped. Linear time: script/style blocks are cut with str.find,
+    and tag stripping stops at the last '>' so an unclosed '<' can't make every
+    later '<' rescan to the end of the document.
+    """
     if not s:
         return ""
-    s = re.sub(r"(?is)<(script|style).*?>.*?(</\1>)", "", s)
-    s = re.sub(r"(?i)<br\s*/?>", "\n", s)
-    s = re.sub(r"(?i)</p>", "\n\n", s)
-    s = re.sub(r"(?s)<.*?>", "", s)
-    s = html.unescape(s)
-    return s.strip()
+    if max_chars and len(s) > max_chars:
+        s = s[:max_chars]
+    s = _drop_script_style(s)
+    last = s.rfind(">") + 1
+    head, tail = s[:last], s[last:]
+    head = _BR.sub("\n", head)
+    head = _P_CLOSE.sub("\n\n", head)
+    head = _TAG.sub("", head)
+    return html.unescape(head + tail).strip()
 
 
 def clean_subject_body(
@@ -0,0 +1,231 @@
+# app/schema_store.py
+"""
+Indexed, lazily decoded view over the generated schema.
+
+`scripts/regen_schemas.py` writes two artifacts next to `schema_generated.py`:
+
+  schema_generated.blob      one compact JSON object per intent, back to back
+  schema_generated.idx.json  {intent_id: [offset, length]} + precomputed /intents cards
+
+The blob is mmapped and an intent is only decoded the first time it is looked up,
+so import cost and resident size stay flat no matter how many intents exist.
+
+The index also carries a monotonically increasing schema `version` and, per intent,
+a content hash plus the versions it was added/last changed in (and tombstones for
+removed intents), which is what `/schema?since=<version>` answers from.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+APP_DIR = Path(__file__).resolve().parent
+INDEX_PATH = APP_DIR / "schema_generated.idx.json"
+BLOB_PATH = APP_DIR / "schema_generated.blob"
+SAMPLES_PATH = APP_DIR / "samples_generated.json"  # tests.samples per intent (warm-up input)
+
+INDEX_FORMAT = 1
+
+
+# --- /intents cards (shared by regen and the runtime fallback) ---
+def intent_card(iid: str, meta: Any) -> Dict[str, str]:
+    """Compact card for one intent: id + label + description + industry ("name" aliases id)."""
+    if not isinstance(meta, dict):
+        meta = {}
+    label = (meta.get("label") or iid) if isinstance(meta.get("label"), str) else iid
+    return {
+        "id": iid,
+        "name": iid,               # alias for convenience on the UI
+        "label": label or iid,
+        "description": meta.get("description") or "",
+        "industry": meta.get("industry") or "Registry",
+    }
+
+
+def build_cards(schema: Mapping) -> List[Dict[str, str]]:
+    """Cards for every intent; Auto Detect first, then alphabetical by label."""
+    items = [intent_card(iid, meta) for iid, meta in schema.items()]
+    items.sort(key=lambda x: (0 if x["id"] == "auto_detect" else 1, (x.get("label") or "").lower()))
+    return items
+
+
+# --- Writer (used by regen) ---
+def content_hash(raw: bytes) -> str:
+    return hashlib.sha256(raw).hexdigest()[:16]
+
+
+def _read_previous_index(index_path: Path) -> Dict[str, Any]:
+    try:
+        return json.loads(index_path.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+
+
+def write_indexed_schema(
+    schema: Dict[str, Dict],
+    index_path: Path = INDEX_PATH,
+    blob_path: Path = BLOB_PATH,
+) -> int:
+    """Write blob + index; returns the schema version (bumped only when content changed)."""
+    offsets: Dict[str, List[int]] = {}
+    hashes: Dict[str, str] = {}
+    chunks: List[bytes] = []
+    pos = 0
+    for iid in sorted(schema):
+        raw = json.dumps(schema[iid], sort_keys=True, separators=(",", ":")).encode("utf-8")
+        offsets[iid] = [pos, len(raw)]
+        hashes[iid] = content_hash(raw)
+        chunks.append(raw)
+        chunks.append(b"\n")
+        pos += len(raw) + 1
+
+    prev = _read_previous_index(index_path)
+    prev_version = int(prev.get("version") or 0)
+    prev_meta: Dict[str, Dict[str, Any]] = prev.get("hashes") or {}
+    removed: Dict[str, int] = dict(prev.get("removed") or {})
+
+    dirty = prev_version == 0 or set(prev_meta) != set(hashes) or any(
+        prev_meta[iid].get("hash") != h for iid, h in hashes.items()
+    )
+    version = prev_version + 1 if dirty else prev_version
+
+    meta: Dict[str, Dict[str, Any]] = {}
+    for iid, h in hashes.items():
+        old = prev_meta.get(iid)
+        if old is None:
+            meta[iid] = {"hash": h, "added": version, "changed": version}
+        elif old.get("hash") != h:
+            meta[iid] = {"hash": h, "added": int(old.get("added") or version), "changed": version}
+        else:
+            meta[iid] = {"hash": h, "added": int(old.get("added") or 0), "changed": int(old.get("changed") or 0)}
+        removed.pop(iid, None)
+    for iid in prev_meta:
+        if iid not in hashes:
+            removed[iid] = version
+
+    index = {
+        "format": INDEX_FORMAT,
+        "version": version,
+        "offsets": offsets,
+        "hashes": meta,
+        "removed": dict(sorted(removed.items())),
+        "intents": build_cards(schema),
+    }
+    blob_path.parent.mkdir(parents=True, exist_ok=True)
+    # Blob first, then the index that points into it; readers holding the old blob mmapped keep their inode.
+    _replace_file(blob_path, b"".join(chunks))
+    _replace_file(index_path, (json.dumps(index, indent=2) + "\n").encode("utf-8"))
+    return version
+
+
+def _replace_file(path: Path, data: bytes) -> None:
+    """Write to a temp file next to `path` and rename it over `path` (atomic on POSIX)."""
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+# --- Reader ---
+class LazySchema(Mapping):
+    """
+    Read-only mapping of intent id -> schema entry backed by the mmapped blob.
+    Entries are decoded on first access and cached; iteration never decodes.
+    """
+
+    def __init__(self, index_path: Path = INDEX_PATH, blob_path: Path = BLOB_PATH):
+        index = json.loads(index_path.read_text(encoding="utf-8"))
+        if index.get("format") != INDEX_FORMAT:
+            raise ValueError(f"Unsupported schema index format: {index.get('format')!r}")
+        self._offsets: Dict[str, Tuple[int, int]] = {
+            iid: (int(off), int(size)) for iid, (off, size) in index["offsets"].items()
+        }
+        self.cards: List[Dict[str, str]] = index.get("intents") or []
+        self.version: int = int(index.get("version") or 0)
+        self.hashes: Dict[str, Dict[str, Any]] = index.get("hashes") or {}
+        self.removed: Dict[str, int] = index.get("removed") or {}
+        self._cache: Dict[str, Any] = {}
+        self._mm: Optional[mmap.mmap] = None
+        with blob_path.open("rb") as fh:
+            if blob_path.stat().st_size:
+                self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def raw(self, iid: str) -> bytes:
+        """Undecoded JSON bytes for one intent."""
+        off, size = self._offsets[iid]
+        return self._mm[off:off + size] if self._mm is not None else b"{}"
+
+    def __getitem__(self, iid: str) -> Any:
+        try:
+            return self._cache[iid]
+        except KeyError:
+            pass
+        val = json.loads(self.raw(iid))
+        self._cache[iid] = val
+        return val
+
+    def __contains__(self, iid: object) -> bool:
+        return iid in self._offsets
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._offsets)
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def to_json_bytes(self) -> bytes:
+        """Full schema as a JSON object, stitched from the blob without decoding entries."""
+        parts = [json.dumps(iid).encode("utf-8") + b":" + self.raw(iid) for iid in self._offsets]
+        return b"{" + b",".join(parts) + b"}"
+
+    def delta(self, since: int) -> Dict[str, Any]:
+        """
+        Intents added, changed or removed after `since`. A client whose version is
+        unknown to this build (ahead of it, or pre-versioning) gets everything with
+        `full: true` and should replace its cache.
+        """
+        full = since <= 0 or since > self.version
+        added: Dict[str, Any] = {}
+        changed: Dict[str, Any] = {}
+        for iid in self._offsets:
+            meta = self.hashes.get(iid) or {}
+            if full or int(meta.get("added") or 0) > since:
+                added[iid] = self[iid]
+            elif int(meta.get("changed") or 0) > since:
+                changed[iid] = self[iid]
+        removed = [] if full else sorted(iid for iid, v in self.removed.items() if v > since)
+        return {
+            "version": self.version,
+            "since": since,
+            "full": full,
+            "added": added,
+            "changed": changed,
+            "removed": removed,
+            "hashes": {iid: (self.hashes.get(iid) or {}).get("hash", "") for iid in (*added, *changed)},
+        }
+
+
+def load_samples() -> Dict[str, List[Dict[str, Any]]]:
+    """{intent_id: [fields, ...]} from the intents' `tests.samples`; {} when missing."""
+    try:
+        data = json.loads(SAMPLES_PATH.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def load_indexed_schema() -> Optional[LazySchema]:
+    """Return the indexed schema, or None when the artifacts are missing/unreadable."""
+    if not (INDEX_PATH.exists() and BLOB_PATH.exists()):
+        return None
+    try:
+        return LazySchema()
+    except Exception:
+        return None
@@ -0,0 +1 @@
+# AUTO-GENERATED PACKAGE — precompiled Jinja templates (see app/precompiled.py).
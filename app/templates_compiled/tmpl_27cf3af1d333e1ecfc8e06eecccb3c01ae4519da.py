@@ -0,0 +1,30 @@
+from jinja2.runtime import LoopContext, Macro, Markup, Namespace, TemplateNotFound, TemplateReference, TemplateRuntimeError, Undefined, escape, identity, internalcode, markup_join, missing, str_join
+name = 'shipment_update.j2'
+
+def root(context, missing=missing):
+    resolve = context.resolve_or_missing
+    undefined = environment.undefined
+    concat = environment.concat
+    cond_expr_undefined = Undefined
+    if 0: yield None
+    l_0_poNumber = resolve('poNumber')
+    l_0_items = resolve('items')
+    l_0_carrierOther = resolve('carrierOther')
+    l_0_carrier = resolve('carrier')
+    l_0_trackingNumber = resolve('trackingNumber')
+    l_0_shipDate = resolve('shipDate')
+    pass
+    yield 'Good news, your order has shipped! Details are below for quick reference:\n\n• PO: '
+    yield str((undefined(name='poNumber') if l_0_poNumber is missing else l_0_poNumber))
+    yield '\n• Items: '
+    yield str((undefined(name='items') if l_0_items is missing else l_0_items))
+    yield '\n• Carrier: '
+    yield str(((undefined(name='carrierOther') if l_0_carrierOther is missing else l_0_carrierOther) or (undefined(name='carrier') if l_0_carrier is missing else l_0_carrier)))
+    yield '\n• Tracking: '
+    yield str((undefined(name='trackingNumber') if l_0_trackingNumber is missing else l_0_trackingNumber))
+    yield '\n• Ship date: '
+    yield str((undefined(name='shipDate') if l_0_shipDate is missing else l_0_shipDate))
+    yield '\n\nIf you’d like the packing slip, invoice, or any other documents, I’m happy to send them. \nPlease let me know if you prefer a particular delivery window or if there’s anything else I can coordinate on your end.\n\nThanks again,'
+
+blocks = {}
+debug_info = '3=18&4=20&5=22&6=24&7=26'
\ No newline at end of file
@@ -0,0 +1,25 @@
+from jinja2.runtime import LoopContext, Macro, Markup, Namespace, TemplateNotFound, TemplateReference, TemplateRuntimeError, Undefined, escape, identity, internalcode, markup_join, missing, str_join
+name = 'invoice_po_followup.j2'
+
+def root(context, missing=missing):
+    resolve = context.resolve_or_missing
+    undefined = environment.undefined
+    concat = environment.concat
+    cond_expr_undefined = Undefined
+    if 0: yield None
+    l_0_invoiceNumber = resolve('invoiceNumber')
+    l_0_poNumber = resolve('poNumber')
+    l_0_dueDate = resolve('dueDate')
+    pass
+    yield 'Just a quick follow-up regarding Invoice '
+    yield str((undefined(name='invoiceNumber') if l_0_invoiceNumber is missing else l_0_invoiceNumber))
+    yield ' for PO '
+    yield str((undefined(name='poNumber') if l_0_poNumber is missing else l_0_poNumber))
+    yield ', due on '
+    yield str((undefined(name='dueDate') if l_0_dueDate is missing else l_0_dueDate))
+    yield ".\n\nI've attached the invoice and packing slip for reference.\n\nCan you confirm:\n• Has the PO been received in full?\n• Were any discrepancies noted?\n• Is payment still on track by "
+    yield str((undefined(name='dueDate') if l_0_dueDate is missing else l_0_dueDate))
+    yield '?\n\nPlease let me know if anything is needed to complete processing.\nThank you,'
+
+blocks = {}
+debug_info = '1=15&8=21'
\ No newline at end of file
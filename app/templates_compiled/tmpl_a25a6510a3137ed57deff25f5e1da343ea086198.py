@@ -0,0 +1,23 @@
+from jinja2.runtime import LoopContext, Macro, Markup, Namespace, TemplateNotFound, TemplateReference, TemplateRuntimeError, Undefined, escape, identity, internalcode, markup_join, missing, str_join
+name = 'quote_request.j2'
+
+def root(context, missing=missing):
+    resolve = context.resolve_or_missing
+    undefined = environment.undefined
+    concat = environment.concat
+    cond_expr_undefined = Undefined
+    if 0: yield None
+    l_0_partNumber = resolve('partNumber')
+    l_0_quantity = resolve('quantity')
+    l_0_needByDate = resolve('needByDate')
+    pass
+    yield 'I hope you’re doing well. Could you please provide pricing and lead time for '
+    yield str((undefined(name='partNumber') if l_0_partNumber is missing else l_0_partNumber))
+    yield ' (quantity '
+    yield str((undefined(name='quantity') if l_0_quantity is missing else l_0_quantity))
+    yield ')? \nIf helpful, we’re targeting '
+    yield str(((undefined(name='needByDate') if l_0_needByDate is missing else l_0_needByDate) or 'an upcoming date'))
+    yield '.\n\nWhen you reply, a brief note on MOQs, current availability, and shipping terms would be appreciated.\n\nThank you for your time and help.\nBest regards,'
+
+blocks = {}
+debug_info = '1=15&2=19'
\ No newline at end of file
@@ -0,0 +1,26 @@
+from jinja2.runtime import LoopContext, Macro, Markup, Namespace, TemplateNotFound, TemplateReference, TemplateRuntimeError, Undefined, escape, identity, internalcode, markup_join, missing, str_join
+name = 'invoice_payment.j2'
+
+def root(context, missing=missing):
+    resolve = context.resolve_or_missing
+    undefined = environment.undefined
+    concat = environment.concat
+    cond_expr_undefined = Undefined
+    if 0: yield None
+    l_0_invoiceNumber = resolve('invoiceNumber')
+    l_0_amount = resolve('amount')
+    l_0_paymentMethod = resolve('paymentMethod')
+    l_0_paymentDate = resolve('paymentDate')
+    pass
+    yield 'I wanted to let you know that payment has been issued for Invoice '
+    yield str((undefined(name='invoiceNumber') if l_0_invoiceNumber is missing else l_0_invoiceNumber))
+    yield ':\n\n• Amount: '
+    yield str((undefined(name='amount') if l_0_amount is missing else l_0_amount))
+    yield '\n• Method: '
+    yield str((undefined(name='paymentMethod') if l_0_paymentMethod is missing else l_0_paymentMethod))
+    yield '\n• Payment date: '
+    yield str((undefined(name='paymentDate') if l_0_paymentDate is missing else l_0_paymentDate))
+    yield '\n\nIf you need the remittance advice or any additional documentation, I’m glad to share it.\nPlease confirm once received, and let me know if there’s anything else you need.\nThank you. '
+
+blocks = {}
+debug_info = '1=16&3=18&4=20&5=22'
\ No newline at end of file
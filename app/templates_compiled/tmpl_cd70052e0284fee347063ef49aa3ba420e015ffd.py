@@ -0,0 +1,143 @@
+from jinja2.runtime import LoopContext, Macro, Markup, Namespace, TemplateNotFound, TemplateReference, TemplateRuntimeError, Undefined, escape, identity, internalcode, markup_join, missing, str_join
+name = 'order_request.j2'
+
+def root(context, missing=missing):
+    resolve = context.resolve_or_missing
+    undefined = environment.undefined
+    concat = environment.concat
+    cond_expr_undefined = Undefined
+    if 0: yield None
+    l_0_parts = resolve('parts')
+    l_0_fedexAccount = resolve('fedexAccount')
+    l_0_shipAddress = resolve('shipAddress')
+    l_0_notes = resolve('notes')
+    try:
+        t_1 = environment.filters['length']
+    except KeyError:
+        @internalcode
+        def t_1(*unused):
+            raise TemplateRuntimeError("No filter named 'length' found.")
+    try:
+        t_2 = environment.filters['string']
+    except KeyError:
+        @internalcode
+        def t_2(*unused):
+            raise TemplateRuntimeError("No filter named 'string' found.")
+    try:
+        t_3 = environment.filters['trim']
+    except KeyError:
+        @internalcode
+        def t_3(*unused):
+            raise TemplateRuntimeError("No filter named 'trim' found.")
+    try:
+        t_4 = environment.tests['sequence']
+    except KeyError:
+        @internalcode
+        def t_4(*unused):
+            raise TemplateRuntimeError("No test named 'sequence' found.")
+    try:
+        t_5 = environment.tests['string']
+    except KeyError:
+        @internalcode
+        def t_5(*unused):
+            raise TemplateRuntimeError("No test named 'string' found.")
+    pass
+    yield 'Can you please process the following order for me and let me know when it will ship?\n\n'
+    if (undefined(name='parts') if l_0_parts is missing else l_0_parts):
+        pass
+        if (t_4((undefined(name='parts') if l_0_parts is missing else l_0_parts)) and (not t_5((undefined(name='parts') if l_0_parts is missing else l_0_parts)))):
+            pass
+            def t_6(fiter):
+                for l_1_p in fiter:
+                    if l_1_p:
+                        yield l_1_p
+            for l_1_p in t_6((undefined(name='parts') if l_0_parts is missing else l_0_parts)):
+                l_1_base = resolve('base')
+                l_1_qty_str = resolve('qty_str')
+                l_1_raw = l_1_qty_raw = l_1_segs = missing
+                _loop_vars = {}
+                pass
+                l_1_raw = t_3(((environment.getattr(l_1_p, 'partNumber') or environment.getattr(l_1_p, 'name')) or t_2(l_1_p)))
+                _loop_vars['raw'] = l_1_raw
+                l_1_qty_raw = t_3(t_2(((environment.getattr(l_1_p, 'quantity') or environment.getattr(l_1_p, 'qty')) or '')))
+                _loop_vars['qty_raw'] = l_1_qty_raw
+                l_1_segs = context.call(environment.getattr((undefined(name='raw') if l_1_raw is missing else l_1_raw), 'rsplit'), 'x', 1, _loop_vars=_loop_vars)
+                _loop_vars['segs'] = l_1_segs
+                if ((t_1((undefined(name='segs') if l_1_segs is missing else l_1_segs)) == 2) and context.call(environment.getattr(context.call(environment.getattr(environment.getitem((undefined(name='segs') if l_1_segs is missing else l_1_segs), 1), 'strip'), _loop_vars=_loop_vars), 'isdigit'), _loop_vars=_loop_vars)):
+                    pass
+                    l_1_base = context.call(environment.getattr(environment.getitem((undefined(name='segs') if l_1_segs is missing else l_1_segs), 0), 'strip'), _loop_vars=_loop_vars)
+                    _loop_vars['base'] = l_1_base
+                    l_1_qty_str = context.call(environment.getattr(environment.getitem((undefined(name='segs') if l_1_segs is missing else l_1_segs), 1), 'strip'), _loop_vars=_loop_vars)
+                    _loop_vars['qty_str'] = l_1_qty_str
+                elif context.call(environment.getattr((undefined(name='qty_raw') if l_1_qty_raw is missing else l_1_qty_raw), 'isdigit'), _loop_vars=_loop_vars):
+                    pass
+                    l_1_base = (undefined(name='raw') if l_1_raw is missing else l_1_raw)
+                    _loop_vars['base'] = l_1_base
+                    l_1_qty_str = (undefined(name='qty_raw') if l_1_qty_raw is missing else l_1_qty_raw)
+                    _loop_vars['qty_str'] = l_1_qty_str
+                else:
+                    pass
+                    l_1_base = (undefined(name='raw') if l_1_raw is missing else l_1_raw)
+                    _loop_vars['base'] = l_1_base
+                    l_1_qty_str = ''
+                    _loop_vars['qty_str'] = l_1_qty_str
+                if (undefined(name='qty_str') if l_1_qty_str is missing else l_1_qty_str):
+                    pass
+                    yield '• Part Number: '
+                    yield str((undefined(name='base') if l_1_base is missing else l_1_base))
+                    yield ' | Quantity: '
+                    yield str((undefined(name='qty_str') if l_1_qty_str is missing else l_1_qty_str))
+                    yield '\n'
+                else:
+                    pass
+                    yield '• '
+                    yield str((undefined(name='raw') if l_1_raw is missing else l_1_raw))
+                    yield '\n'
+            l_1_p = l_1_raw = l_1_qty_raw = l_1_segs = l_1_base = l_1_qty_str = missing
+        else:
+            pass
+            def t_7(fiter):
+                for l_1_line in fiter:
+                    if context.call(environment.getattr(l_1_line, 'strip')):
+                        yield l_1_line
+            for l_1_line in t_7(context.call(environment.getattr(t_2((undefined(name='parts') if l_0_parts is missing else l_0_parts)), 'split'), '\n')):
+                l_1_base = resolve('base')
+                l_1_qty_str = resolve('qty_str')
+                l_1_raw = l_1_segs = missing
+                _loop_vars = {}
+                pass
+                l_1_raw = context.call(environment.getattr(l_1_line, 'strip'), _loop_vars=_loop_vars)
+                _loop_vars['raw'] = l_1_raw
+                l_1_segs = context.call(environment.getattr((undefined(name='raw') if l_1_raw is missing else l_1_raw), 'rsplit'), 'x', 1, _loop_vars=_loop_vars)
+                _loop_vars['segs'] = l_1_segs
+                if ((t_1((undefined(name='segs') if l_1_segs is missing else l_1_segs)) == 2) and context.call(environment.getattr(context.call(environment.getattr(environment.getitem((undefined(name='segs') if l_1_segs is missing else l_1_segs), 1), 'strip'), _loop_vars=_loop_vars), 'isdigit'), _loop_vars=_loop_vars)):
+                    pass
+                    l_1_base = context.call(environment.getattr(environment.getitem((undefined(name='segs') if l_1_segs is missing else l_1_segs), 0), 'strip'), _loop_vars=_loop_vars)
+                    _loop_vars['base'] = l_1_base
+                    l_1_qty_str = context.call(environment.getattr(environment.getitem((undefined(name='segs') if l_1_segs is missing else l_1_segs), 1), 'strip'), _loop_vars=_loop_vars)
+                    _loop_vars['qty_str'] = l_1_qty_str
+                    yield '• Part Number: '
+                    yield str((undefined(name='base') if l_1_base is missing else l_1_base))
+                    yield ' | Quantity: '
+                    yield str((undefined(name='qty_str') if l_1_qty_str is missing else l_1_qty_str))
+                    yield '\n'
+                else:
+                    pass
+                    yield '• '
+                    yield str((undefined(name='raw') if l_1_raw is missing else l_1_raw))
+                    yield '\n'
+            l_1_line = l_1_raw = l_1_segs = l_1_base = l_1_qty_str = missing
+    yield '\nPlease ship on FedEx account '
+    yield str((undefined(name='fedexAccount') if l_0_fedexAccount is missing else l_0_fedexAccount))
+    yield '.\nShipping address: '
+    yield str((undefined(name='shipAddress') if l_0_shipAddress is missing else l_0_shipAddress))
+    yield '\n\n'
+    if (undefined(name='notes') if l_0_notes is missing else l_0_notes):
+        pass
+        yield 'Additional notes: '
+        yield str((undefined(name='notes') if l_0_notes is missing else l_0_notes))
+        yield '\n'
+    yield '\nThank you very much for your help,\nBest regards,\n'
+
+blocks = {}
+debug_info = '3=46&5=48&6=50&8=60&9=62&11=64&12=66&13=68&14=70&15=72&17=74&18=76&20=80&21=82&23=84&24=87&26=94&31=99&32=109&33=111&34=113&35=115&36=117&37=120&39=127&45=131&46=133&48=135&49=138'
\ No newline at end of file
@@ -0,0 +1,29 @@
+from jinja2.runtime import LoopContext, Macro, Markup, Namespace, TemplateNotFound, TemplateReference, TemplateRuntimeError, Undefined, escape, identity, internalcode, markup_join, missing, str_join
+name = 'delay_notice.j2'
+
+def root(context, missing=missing):
+    resolve = context.resolve_or_missing
+    undefined = environment.undefined
+    concat = environment.concat
+    cond_expr_undefined = Undefined
+    if 0: yield None
+    l_0_poNumber = resolve('poNumber')
+    l_0_partNumber = resolve('partNumber')
+    l_0_reason = resolve('reason')
+    l_0_previousShip = resolve('previousShip')
+    l_0_newShip = resolve('newShip')
+    pass
+    yield 'I want to share a quick schedule update for PO '
+    yield str((undefined(name='poNumber') if l_0_poNumber is missing else l_0_poNumber))
+    yield ' ('
+    yield str((undefined(name='partNumber') if l_0_partNumber is missing else l_0_partNumber))
+    yield '). \nDue to '
+    yield str((undefined(name='reason') if l_0_reason is missing else l_0_reason))
+    yield ', the ship date has shifted:\n\n• Previous ship date: '
+    yield str((undefined(name='previousShip') if l_0_previousShip is missing else l_0_previousShip))
+    yield '\n• New ship date: '
+    yield str((undefined(name='newShip') if l_0_newShip is missing else l_0_newShip))
+    yield '\n\nI’m sorry for the inconvenience this may cause. If it helps, we can discuss options such as partial shipments, \nexpedited freight, or alternatives. Please let me know your priorities and I’ll align the plan accordingly.\n\nThank you for your understanding,'
+
+blocks = {}
+debug_info = '1=17&2=21&4=23&5=25'
\ No newline at end of file
@@ -0,0 +1,20 @@
+from jinja2.runtime import LoopContext, Macro, Markup, Namespace, TemplateNotFound, TemplateReference, TemplateRuntimeError, Undefined, escape, identity, internalcode, markup_join, missing, str_join
+name = 'followup.j2'
+
+def root(context, missing=missing):
+    resolve = context.resolve_or_missing
+    undefined = environment.undefined
+    concat = environment.concat
+    cond_expr_undefined = Undefined
+    if 0: yield None
+    l_0_context = resolve('context')
+    l_0_ask = resolve('ask')
+    pass
+    yield 'I’m checking in on '
+    yield str((undefined(name='context') if l_0_context is missing else l_0_context))
+    yield '. '
+    yield str((undefined(name='ask') if l_0_ask is missing else l_0_ask))
+    yield '\n\nIf there’s an update or a different timeline that works better for you, I’m happy to adjust—just let me know.\n\nThanks in advance,'
+
+blocks = {}
+debug_info = '1=14'
\ No newline at end of file
@@ -0,0 +1,23 @@
+from jinja2.runtime import LoopContext, Macro, Markup, Namespace, TemplateNotFound, TemplateReference, TemplateRuntimeError, Undefined, escape, identity, internalcode, markup_join, missing, str_join
+name = 'order_confirmation.j2'
+
+def root(context, missing=missing):
+    resolve = context.resolve_or_missing
+    undefined = environment.undefined
+    concat = environment.concat
+    cond_expr_undefined = Undefined
+    if 0: yield None
+    l_0_poNumber = resolve('poNumber')
+    l_0_itemsSummary = resolve('itemsSummary')
+    l_0_promisedShip = resolve('promisedShip')
+    pass
+    yield 'Thank you for the order. We’ve entered PO '
+    yield str((undefined(name='poNumber') if l_0_poNumber is missing else l_0_poNumber))
+    yield ' with the following details:\n\n• Items: '
+    yield str((undefined(name='itemsSummary') if l_0_itemsSummary is missing else l_0_itemsSummary))
+    yield '\n• Promised ship date: '
+    yield str((undefined(name='promisedShip') if l_0_promisedShip is missing else l_0_promisedShip))
+    yield '\n\nPlease review and let me know if any adjustments are needed. Otherwise, we’ll proceed as scheduled.\n\nAppreciate the opportunity to support your team.\nBest regards,'
+
+blocks = {}
+debug_info = '1=15&3=17&4=19'
\ No newline at end of file
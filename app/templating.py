@@ -0,0 +1,52 @@
+# app/templating.py
+"""
+Jinja environment for templates/.
+
+jinja2 is imported and the Environment is built on first use (then reused),
+so `import app.main` does not pay for it and requests don't rebuild it.
+When regen has precompiled templates/ (app/templates_compiled/), templates are
+loaded from those modules instead of being parsed; see app/precompiled.py.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict
+
+if TYPE_CHECKING:  # pragma: no cover
+    from jinja2 import Environment
+
+TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
+
+# Lexer/rendering options; anything that compiles templates must use the same ones.
+ENV_OPTIONS: Dict[str, Any] = {
+    "autoescape": False,
+    "trim_blocks": True,
+    "lstrip_blocks": True,
+}
+
+
+@lru_cache(maxsize=1)
+def get_env() -> "Environment":
+    # templates/ should contain one file per intent, e.g., order_request.j2
+    from jinja2 import Environment, FileSystemLoader, Undefined
+
+    from app.precompiled import COMPILED_DIR, PrecompiledLoader, load_manifest
+
+    loader = FileSystemLoader(str(TEMPLATES_DIR))
+    manifest = load_manifest()
+    if manifest:
+        loader = PrecompiledLoader(loader, COMPILED_DIR, manifest)
+
+    return Environment(
+        loader=loader,
+        undefined=Undefined,   # missing optionals render as empty
+        cache_size=-1,         # keep every compiled template (warm-up compiles them all)
+        **ENV_OPTIONS,
+    )
+
+
+@lru_cache(maxsize=1024)
+def compile_string(source: str):
+    """Compile an inline template (overrides, YAML subjects) once per distinct source."""
+    return get_env().from_string(source)
@@ -0,0 +1,203 @@
+# app/user_templates.py
+"""
+Server-side store for user templates (the `u:*` intents the UI keeps in localStorage).
+
+SQLite file, no external service. Every write bumps the template's `version`;
+compiled Jinja templates are cached by (id, version), so a template is parsed
+once per edit instead of once per /generate call.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from app.templating import get_env
+
+if TYPE_CHECKING:  # pragma: no cover
+    from jinja2 import Template
+
+ROOT = Path(__file__).resolve().parent.parent
+DB_PATH = Path(os.environ.get("SMART_MAIL_USER_TEMPLATES_DB", ROOT / "data" / "user_templates.db"))
+
+_COMPILED_MAX = 512
+
+_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS user_templates (
+    id          TEXT PRIMARY KEY,
+    version     INTEGER NOT NULL,
+    label       TEXT NOT NULL DEFAULT '',
+    description TEXT NOT NULL DEFAULT '',
+    subject     TEXT NOT NULL DEFAULT '',
+    body        TEXT NOT NULL DEFAULT '',
+    fields      TEXT NOT NULL DEFAULT '[]',
+    updated_at  REAL NOT NULL
+)
+"""
+
+_COLUMNS = ("id", "version", "label", "description", "subject", "body", "fields", "updated_at")
+
+
+class VersionConflict(Exception):
+    """Raised when an update names a version that is no longer current."""
+
+    def __init__(self, tid: str, expected: int, current: int):
+        super().__init__(f"Template {tid} is at version {current}, not {expected}")
+        self.tid, self.expected, self.current = tid, expected, current
+
+
+def _slug(label: str) -> str:
+    s = re.sub(r"[^a-z0-9]+", "_", (label or "").lower()).strip("_")
+    return s or "tpl"
+
+
+def _row_to_dict(row: Tuple) -> Dict[str, Any]:
+    rec = dict(zip(_COLUMNS, row))
+    try:
+        rec["fields"] = json.loads(rec["fields"] or "[]")
+    except Exception:
+        rec["fields"] = []
+    return rec
+
+
+def check_syntax(data: Dict[str, Any]) -> None:
+    """Parse a record's subject and body; raises jinja2.TemplateSyntaxError so bad templates are never stored."""
+    env = get_env()
+    for key in ("subject", "body"):
+        if data.get(key):
+            env.parse(str(data[key]))
+
+
+class UserTemplateStore:
+    def __init__(self, path: Path = DB_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA_SQL)
+        self._conn.commit()
+        self._compiled: Dict[Tuple[str, int], Tuple["Template", Optional["Template"]]] = {}
+
+    # --- CRUD ---
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM user_templates ORDER BY updated_at DESC"
+            ).fetchall()
+        return [_row_to_dict(r) for r in rows]
+
+    def get(self, tid: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM user_templates WHERE id = ?", (tid,)
+            ).fetchone()
+        return _row_to_dict(row) if row else None
+
+    def create(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        label = str(data.get("label") or "")
+        tid = str(data.get("id") or "").strip() or f"u:{_slug(label)}"
+        if not tid.startswith("u:"):
+            tid = f"u:{tid}"
+        check_syntax(data)
+        with self._lock:
+            base, n = tid, 1
+            while self._conn.execute("SELECT 1 FROM user_templates WHERE id = ?", (tid,)).fetchone():
+                n += 1
+                tid = f"{base}_{n}"
+            self._conn.execute(
+                "INSERT INTO user_templates (id, version, label, description, subject, body, fields, updated_at)"
+                " VALUES (?, 1, ?, ?, ?, ?, ?, ?)",
+                (
+                    tid,
+                    label or tid,
+                    str(data.get("description") or ""),
+                    str(data.get("subject") or ""),
+                    str(data.get("body") or ""),
+                    json.dumps(data.get("fields") or []),
+                    time.time(),
+                ),
+            )
+            self._conn.commit()
+        return self.get(tid)  # type: ignore[return-value]
+
+    def update(self, tid: str, data: Dict[str, Any], expected_version: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Apply a partial update; raises KeyError if missing, VersionConflict on a stale
+        version, jinja2.TemplateSyntaxError if the new subject/body does not parse.
+        """
+        check_syntax(data)
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM user_templates WHERE id = ?", (tid,)
+            ).fetchone()
+            if not row:
+                raise KeyError(tid)
+            cur = _row_to_dict(row)
+            if expected_version is not None and expected_version != cur["version"]:
+                raise VersionConflict(tid, expected_version, cur["version"])
+            for key in ("label", "description", "subject", "body", "fields"):
+                if data.get(key) is not None:
+                    cur[key] = data[key]
+            self._conn.execute(
+                "UPDATE user_templates SET version = ?, label = ?, description = ?, subject = ?,"
+                " body = ?, fields = ?, updated_at = ? WHERE id = ?",
+                (
+                    cur["version"] + 1,
+                    str(cur["label"] or ""),
+                    str(cur["description"] or ""),
+                    str(cur["subject"] or ""),
+                    str(cur["body"] or ""),
+                    json.dumps(cur["fields"] or []),
+                    time.time(),
+                    tid,
+                ),
+            )
+            self._conn.commit()
+        return self.get(tid)  # type: ignore[return-value]
+
+    def delete(self, tid: str) -> bool:
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM user_templates WHERE id = ?", (tid,))
+            self._conn.commit()
+            for key in [k for k in self._compiled if k[0] == tid]:
+                self._compiled.pop(key, None)
+        return cur.rowcount > 0
+
+    # --- Compiled cache ---
+    def compiled(self, rec: Dict[str, Any]) -> Tuple["Template", Optional["Template"]]:
+        """(body, subject) templates for a record, compiled once per (id, version)."""
+        key = (rec["id"], int(rec["version"]))
+        hit = self._compiled.get(key)
+        if hit is not None:
+            return hit
+        env = get_env()
+        body_tpl = env.from_string(rec.get("body") or "")
+        subject_tpl = env.from_string(rec["subject"]) if rec.get("subject") else None
+        with self._lock:
+            # drop older versions of this template, then bound the cache
+            for stale in [k for k in self._compiled if k[0] == key[0]]:
+                self._compiled.pop(stale, None)
+            if len(self._compiled) >= _COMPILED_MAX:
+                self._compiled.pop(next(iter(self._compiled)))
+            self._compiled[key] = (body_tpl, subject_tpl)
+        return body_tpl, subject_tpl
+
+
+_STORE: Optional[UserTemplateStore] = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_store() -> UserTemplateStore:
+    """Process-wide store, opened on first use so importing the app never touches disk."""
+    global _STORE
+    if _STORE is None:
+        with _STORE_LOCK:
+            if _STORE is None:
+                _STORE = UserTemplateStore()
+    return _STORE
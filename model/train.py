@@ -7,6 +7,9 @@ ROOT = os.path.dirname(os.path.dirname(__file__))
 DATA = os.path.join(ROOT, "data", "emails.labeled.train.csv")  # <-- labeled file
 OUT = os.path.join(ROOT, "model_artifacts")
 os.makedirs(OUT, exist_ok=True)
+sys.path.insert(0, os.path.abspath(ROOT))
+
+from app.preprocess import authored_text  # noqa: E402
 
 
 def hash_canon(subj, body):
@@ -39,8 +42,8 @@ def main():
     )
     df = df.drop_duplicates("canon").drop(columns=["canon"])
 
-    # build text and drop empties
-    df["text"] = (df.get("subject", "") + " || " + df.get("body", "")).str.lower()
+    # build text (authored top of the body, quotes/signature cut) and drop empties
+    df["text"] = (df.get("subject", "") + " || " + df.get("body", "").map(authored_text)).str.lower()
     df["text"] = df["text"].str.replace(r"\s+", " ", regex=True).str.strip()
     df = df[df["text"].str.len() > 0]
 
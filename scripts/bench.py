@@ -0,0 +1,410 @@
+# scripts/bench.py
+"""
+Micro-benchmarks for the ingest/preprocess hot paths, each against the
+implementation it replaced (kept here as the reference).
+
+usage:
+  python scripts/bench.py html [SOURCE ...] [--synthetic N] [--repeat R]
+      SOURCE: mbox / Maildir / .eml dir / .html files; HTML bodies are extracted
+  python scripts/bench.py segment [SOURCE ...] [--synthetic N] [--repeat R]
+      quote/signature segmentation vs strip_quoted + top_authored_segment
+  python scripts/bench.py filter [CSV ...] [--synthetic N] [--rows N] [--repeat R]
+      filter_csv.compute_keep (column-wise) vs the per-row apply version
+  python scripts/bench.py keywords [CSV ...] [--synthetic N] [--sizes 10,100,1000,5000] [--repeat R]
+      KeywordMatcher vs `any(k in text ...)` for block lists of each size
+"""
+import argparse
+import html
+import os
+import random
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.preprocess import html_to_text, segment_body  # noqa: E402
+
+# ------------------------------------------------------------
+# Reference implementations
+# ------------------------------------------------------------
+
+
+def legacy_html_to_text(s: str) -> str:
+    if not s:
+        return ""
+    s = re.sub(r"(?is)<(script|style).*?>.*?(</\1>)", "", s)
+    s = re.sub(r"(?i)<br\s*/?>", "\n", s)
+    s = re.sub(r"(?i)</p>", "\n\n", s)
+    s = re.sub(r"(?s)<.*?>", "", s)
+    s = html.unescape(s)
+    return s.strip()
+
+
+FWD_SPLIT = re.compile(
+    r"(?im)^(?:[-_]{2,}\s*forwarded message\s*[-_]{2,}|from:\s|sent:\s|subject:\s|to:\s|cc:\s)"
+)
+
+QUOTE_START = re.compile(
+    r"(?im)^(?:"
+    r">+|"
+    r"on .+ wrote:|"
+    r"from:\s|"
+    r"sent:\s|"
+    r"subject:\s|"
+    r"to:\s|"
+    r"cc:\s|"
+    r"bcc:\s|"
+    r"-{2,}\s*original message\s*-{2,}|"
+    r"-{2,}\s*forwarded message\s*-{2,}|"
+    r"forwarded message"
+    r")"
+)
+
+
+def legacy_strip_quoted(body: str) -> str:
+    if not body:
+        return ""
+    txt = body
+    parts = FWD_SPLIT.split(txt, maxsplit=1)
+    txt = parts[0]
+    txt = re.sub(r"(?m)^\s*>\s.*$", "", txt)
+    txt = re.sub(r"\r", "\n", txt)
+    txt = re.sub(r"\n{3,}", "\n\n", txt)
+    return txt.strip()
+
+
+def legacy_top_authored_segment(text: str) -> str:
+    if not text:
+        return ""
+    lines = text.splitlines()
+    out = []
+    for ln in lines:
+        if QUOTE_START.match(ln):
+            break
+        if re.match(r"^\s*>+", ln):
+            break
+        out.append(ln)
+    while out and not out[-1].strip():
+        out.pop()
+    return "\n".join(out).strip()
+
+
+def legacy_compute_keep(df, rules):
+    """The keep mask of filter_csv.main at 077a5dd: per-row apply over the helper predicates."""
+    from filter_csv import AUTO_KWS, COURTESY_KWS, SIG_KWS, domain_of
+
+    import pandas as pd
+
+    def any_keyword(text, keywords):
+        t = (text or "").lower()
+        return any(k in t for k in keywords)
+
+    def token_count(text):
+        return len(set(re.findall(r"[a-z]{3,}", (text or "").lower())))
+
+    def is_courtesy_top(subj, body, max_len_words=20):
+        top = (legacy_top_authored_segment(body) or "").lower()
+        text = f"{subj or ''} {top}".lower()
+        return len(top.split()) <= max_len_words and any(k in text for k in COURTESY_KWS)
+
+    def is_signature_only_top(body, max_len_words=12):
+        top = (legacy_top_authored_segment(body) or "").lower()
+        return len(re.findall(r"\w+", top)) <= max_len_words and any(k in top for k in SIG_KWS)
+
+    def is_short_or_filler_subject(subj):
+        s = (subj or "").lower().strip()
+        return len(s) < 6 or s in {"-", "//", "re:", "fwd:"}
+
+    def is_forward_without_new_content(body, min_top_words=20):
+        t = (body or "").lower()
+        if "forwarded message" in t or QUOTE_START.search(t):
+            return len(legacy_top_authored_segment(body).split()) < min_top_words
+        return False
+
+    keep = pd.Series(True, index=df.index)
+    df["top_authored"] = df["body"].apply(legacy_top_authored_segment)
+    keep &= ~(
+        df.apply(lambda r: is_courtesy_top(r["subject"], r["body"]), axis=1)
+        | df["body"].apply(is_signature_only_top)
+        | (df["top_authored"].str.split().apply(len) < 12)
+        | df["subject"].apply(is_short_or_filler_subject)
+        | df["body"].apply(lambda b: any_keyword(b, AUTO_KWS))
+        | df["body"].apply(is_forward_without_new_content)
+    )
+    if rules.get("block_subject_keywords"):
+        keep &= ~df["subject"].apply(lambda s: any_keyword(s, rules["block_subject_keywords"]))
+    if rules.get("block_body_keywords"):
+        keep &= ~df["body"].apply(lambda s: any_keyword(s, rules["block_body_keywords"]))
+    if "block_domains" in rules:
+        df["to_domain"] = df.get("to_domain", "")
+        if "to_domain" not in df.columns or df["to_domain"].eq("").all():
+            df["to_domain"] = df["to"].apply(domain_of)
+        for dom in rules["block_domains"]:
+            keep &= ~df["to_domain"].str.contains(dom, case=False, na=False)
+    keep &= df["top_authored"].str.split().apply(len) >= 6
+    if "min_body_chars" in rules:
+        keep &= df["body"].str.len() >= rules["min_body_chars"]
+    if "min_unique_words" in rules:
+        keep &= df["body"].apply(token_count) >= rules["min_unique_words"]
+    return keep
+
+
+# ------------------------------------------------------------
+# Helpers
+# ------------------------------------------------------------
+
+
+def _timed(fn, items, repeat):
+    best = float("inf")
+    out = None
+    for _ in range(repeat):
+        t = time.perf_counter()
+        out = [fn(x) for x in items]
+        best = min(best, time.perf_counter() - t)
+    return best, out
+
+
+def _norm(s):
+    return " ".join(s.split())
+
+
+def _report(name, nbytes, base, new, same, total, what="output (whitespace-normalized)"):
+    mb = nbytes / 1e6
+    print(f"[bench:{name}] {total} docs, {mb:.1f} MB")
+    print(f"  legacy  {base:8.3f}s  {mb / max(base, 1e-9):8.1f} MB/s")
+    print(f"  current {new:8.3f}s  {mb / max(new, 1e-9):8.1f} MB/s  ({base / max(new, 1e-9):.1f}x)")
+    print(f"  identical {what}: {same}/{total}")
+
+
+def synthetic_html(n, seed=0):
+    """Marketing-style mail: nested tables, inline styles, tracking pixels, scripts, entities."""
+    rng = random.Random(seed)
+    docs = []
+    for i in range(n):
+        cells = "".join(
+            f'<td style="padding:4px;font-family:Arial">Item {j} &amp; more &nbsp;<a href="https://x.example/{j}">'
+            f"buy</a></td>"
+            for j in range(rng.randint(20, 200))
+        )
+        docs.append(
+            "<html><head><style>td{color:red}</style><script>var a = '<p>' + 1;</script></head><body>"
+            f"<p>Hello customer {i},<br/>our spring sale is on.</p>"
+            f"<table><tr>{cells}</tr></table>"
+            + '<img src="https://t.example/p.gif" width="1" height="1">' * rng.randint(1, 50)
+            + "<p>Unsubscribe &raquo;</p></body></html>"
+        )
+    # pathological: style blocks the legacy regex can't close ('</style >'), then a '<' run
+    # with no '>' after it -- each opener makes the lazy regexes rescan to the end
+    docs.append("<p>Hi</p>" + "<style>a{color:red}</style ><td>x</td>" * 60 + "< 1 <" * 2000)
+    return docs
+
+
+def synthetic_bodies(n, seed=0):
+    """Reply/forward threads: '>' quoting, Outlook header blocks, sign-offs, CRLF and stray whitespace."""
+    rng = random.Random(seed)
+    authored = [
+        "Please confirm the delivery date for PO {i}.",
+        "Can you send an updated quote for {i} valves?",
+        "Thanks, got it.",
+        "We need {i} more units by Friday; the last batch had 3 defects.",
+        "Attached is the revised drawing, rev {i}.",
+    ]
+    signoffs = [
+        "Best regards,\nAnn Lee\nPurchasing",
+        "Thanks,\nBob",
+        "-- \nCarol | Acme Corp\n+1 555 0100",
+        "Sent from my iPhone",
+        "",
+    ]
+    headers = [
+        "On Mon, Jan 1, 2024 at 9:00 AM Dan <dan@x.example> wrote:",
+        "-----Original Message-----\nFrom: Dan <dan@x.example>\nSent: Monday\nTo: Ann\nSubject: RE: PO {i}",
+        "---------- Forwarded message ---------\nFrom: Eve <eve@y.example>\nDate: Mon\nSubject: PO {i}",
+        "From: Dan <dan@x.example>\nSent: Monday, January 1\nTo: Ann",
+        "",
+    ]
+    docs = []
+    for i in range(n):
+        top = "\n".join(rng.choice(authored).format(i=i) for _ in range(rng.randint(1, 6)))
+        parts = ["Hi team,", "", top, "", rng.choice(signoffs)]
+        for depth in range(rng.randint(0, 3)):
+            hdr = rng.choice(headers).format(i=i)
+            quoted = "\n".join(
+                rng.choice(["> ", ">> ", ">", "  > ", "> > ", ""]) + rng.choice(authored).format(i=i + depth)
+                for _ in range(rng.randint(1, 15))
+            )
+            parts += ["", " " * rng.randint(0, 2), hdr, quoted]
+        doc = "\n".join(parts)
+        if rng.random() < 0.2:
+            doc = doc.replace("\n", "\r\n")
+        docs.append(doc)
+    return docs
+
+
+def body_sources(paths):
+    from readers import detect_reader, extract_text
+
+    from app.preprocess import html_to_text
+
+    docs = []
+    for path in paths:
+        for msg in detect_reader(path).messages(path):
+            body, is_html = extract_text(msg)
+            docs.append(html_to_text(body) if is_html else body)
+    return docs
+
+
+def html_sources(paths):
+    docs = []
+    for path in paths:
+        if os.path.isfile(path) and path.lower().endswith((".html", ".htm")):
+            with open(path, encoding="utf-8", errors="ignore") as f:
+                docs.append(f.read())
+            continue
+        from readers import detect_reader, extract_text
+
+        for msg in detect_reader(path).messages(path):
+            body, is_html = extract_text(msg)
+            if is_html and body:
+                docs.append(body)
+    return docs
+
+
+# ------------------------------------------------------------
+# Subcommands
+# ------------------------------------------------------------
+
+
+def bench_html(args):
+    docs = html_sources(args.sources) if args.sources else []
+    if args.synthetic or not docs:
+        docs += synthetic_html(args.synthetic or 2000)
+    nbytes = sum(len(d.encode("utf-8", "ignore")) for d in docs)
+    base, old = _timed(legacy_html_to_text, docs, args.repeat)
+    new, cur = _timed(html_to_text, docs, args.repeat)
+    same = sum(_norm(a) == _norm(b) for a, b in zip(old, cur))
+    _report("html", nbytes, base, new, same, len(docs))
+
+
+def _legacy_segments(body):
+    return legacy_strip_quoted(body), legacy_top_authored_segment(body)
+
+
+def bench_segment(args):
+    docs = body_sources(args.sources) if args.sources else []
+    if args.synthetic or not docs:
+        docs += synthetic_bodies(args.synthetic or 20000)
+    nbytes = sum(len(d.encode("utf-8", "ignore")) for d in docs)
+    base, old = _timed(_legacy_segments, docs, args.repeat)
+    new, cur = _timed(segment_body, docs, args.repeat)
+    same_newest = sum(a[0] == b.newest for a, b in zip(old, cur))
+    same_top = sum(a[1] == b.top for a, b in zip(old, cur))
+    _report("segment", nbytes, base, new, same_newest, len(docs), what="strip_quoted output")
+    print(f"  identical top segment: {same_top}/{len(docs)}; with signature: {sum(bool(b.signature) for b in cur)}")
+
+
+def synthetic_frame(n, seed=0):
+    """emails.csv-shaped frame around synthetic_bodies(): subjects, recipients, some auto mail."""
+    import pandas as pd
+
+    rng = random.Random(seed)
+    subjects = ["RE: PO {i} delivery", "Fwd: quote", "re:", "Invoice {i}", "Order confirmation {i}", "-"]
+    bodies = synthetic_bodies(n, seed)
+    for i in range(0, n, 17):
+        bodies[i] += "\n\nYou received this notification because you opted in. Unsubscribe here."
+    return pd.DataFrame(
+        {
+            "to": [f"buyer{i % 50}@{rng.choice(['acme.example', 'x.example', ''])}" for i in range(n)],
+            "to_domain": "",
+            "subject": [rng.choice(subjects).format(i=i) for i in range(n)],
+            "body": bodies,
+            "intent": "",
+        }
+    )
+
+
+def bench_filter(args):
+    import pandas as pd
+    from filter_csv import compute_keep, load_rules, RULES_PATH
+
+    frames = [pd.read_csv(path).fillna("") for path in args.sources]
+    if args.synthetic or not frames:
+        frames.append(synthetic_frame(args.synthetic or 20000))
+    df = pd.concat(frames, ignore_index=True)
+    if args.rows > len(df):
+        df = pd.concat([df] * -(-args.rows // len(df)), ignore_index=True).head(args.rows)
+    rules = load_rules(RULES_PATH)
+    nbytes = int(df["body"].str.len().sum() + df["subject"].str.len().sum())
+    base, (old,) = _timed(lambda d: legacy_compute_keep(d.copy(), rules), [df], args.repeat)
+    new, (cur,) = _timed(lambda d: compute_keep(d.copy(), rules), [df], args.repeat)
+    _report("filter", nbytes, base, new, int((old == cur).sum()), len(df), what="keep flags")
+    print(f"  kept {int(cur.sum())}/{len(df)}")
+
+
+def block_phrases(texts, n, seed=0):
+    """n blocked-phrase-like keywords: word pairs, plus a few 4-word runs taken from the texts (hits)."""
+    rng = random.Random(seed)
+    words = sorted({w for t in texts[:2000] for w in re.findall(r"[a-z]{3,}", t)}) or ["order"]
+    phrases = []
+    for i in range(n):
+        if i % 50 == 0:
+            seen = rng.choice(texts).split()
+            at = rng.randrange(max(len(seen) - 3, 1))
+            phrases.append(" ".join(seen[at:at + 4]))
+        else:
+            phrases.append(f"{rng.choice(words)} {rng.choice(words)}{rng.choice('sxz')}")
+    return phrases
+
+
+def bench_keywords(args):
+    import pandas as pd
+    from keyword_matcher import KeywordMatcher
+
+    frames = [pd.read_csv(path).fillna("") for path in args.sources]
+    texts = [b for f in frames for b in f["body"]]
+    if args.synthetic or not texts:
+        texts += synthetic_bodies(args.synthetic or 20000)
+    lowered = pd.Series(texts, dtype=object).str.lower()
+    nbytes = sum(len(t) for t in lowered)
+    for size in (int(x) for x in args.sizes.split(",")):
+        phrases = block_phrases(list(lowered), size)
+        base, (old,) = _timed(lambda col: [any(k in t for k in phrases) for t in col], [lowered], args.repeat)
+        matcher = KeywordMatcher(phrases)
+        new, (cur,) = _timed(matcher.contains, [lowered], args.repeat)
+        _report(f"keywords:{size}", nbytes, base, new, sum(a == b for a, b in zip(old, cur)), len(texts), what="flags")
+        print(f"  matched {sum(old)}/{len(texts)}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Preprocessing benchmarks (current vs legacy).")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("html", help="html_to_text throughput")
+    p.add_argument("sources", nargs="*")
+    p.add_argument("--synthetic", type=int, default=0, help="add N generated marketing-style documents")
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(fn=bench_html)
+    p = sub.add_parser("segment", help="quote/signature segmentation throughput")
+    p.add_argument("sources", nargs="*")
+    p.add_argument("--synthetic", type=int, default=0, help="add N generated reply/forward threads")
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(fn=bench_segment)
+    p = sub.add_parser("filter", help="filter_csv keep-mask computation")
+    p.add_argument("sources", nargs="*", help="CSVs shaped like data/emails.csv")
+    p.add_argument("--synthetic", type=int, default=0, help="add N generated rows")
+    p.add_argument("--rows", type=int, default=0, help="repeat the input up to N rows (e.g. 78000, a full export)")
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(fn=bench_filter)
+    p = sub.add_parser("keywords", help="keyword-list matching over a body column")
+    p.add_argument("sources", nargs="*", help="CSVs shaped like data/emails.csv")
+    p.add_argument("--synthetic", type=int, default=0, help="add N generated bodies")
+    p.add_argument("--sizes", default="10,100,1000,5000", help="comma-separated keyword-list sizes")
+    p.add_argument("--repeat", type=int, default=1)
+    p.set_defaults(fn=bench_keywords)
+    args = ap.parse_args(argv)
+    args.fn(args)
+
+
+if __name__ == "__main__":
+    main()
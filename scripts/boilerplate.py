@@ -0,0 +1,246 @@
+# scripts/boilerplate.py
+"""
+Corpus-wide boilerplate line index (signatures, legal disclaimers, footers).
+
+`build` makes one pass over a CSV's bodies and counts, per normalized line
+(lowercased, digits masked, whitespace collapsed, '>' quote prefix dropped),
+how many messages contain it. Lines are counted by 64-bit hash in numpy
+arrays merged every COUNT_BATCH hashes, so memory is ~16 bytes per distinct
+line. Lines found in
+at least max(--min-count, --min-frac * messages) messages form the index,
+saved as a sorted uint64 array (.npy).
+
+The index is applied at ingest (mbox_to_csv.py --boilerplate) or to an
+existing CSV (`strip`); `report` shows corpus size and TF-IDF fit time with
+and without the boilerplate.
+
+usage:
+  python scripts/boilerplate.py build data/emails.csv [--out data/boilerplate.npy]
+  python scripts/boilerplate.py strip data/emails.csv [--index data/boilerplate.npy] [--out data/emails.stripped.csv]
+  python scripts/boilerplate.py report data/emails.csv [--index data/boilerplate.npy]
+"""
+import argparse
+import csv
+import hashlib
+import math
+import os
+import re
+import sys
+import time
+
+import numpy as np
+
+from dedupe import digest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.preprocess import canon_text  # noqa: E402
+
+INDEX_PATH = os.path.join(ROOT, "data", "boilerplate.npy")
+MIN_COUNT = 20
+MIN_FRAC = 0.002
+# shorter lines ("Thanks,", "Hi team,") are left alone: too generic to call boilerplate
+MIN_LINE_CHARS = 12
+COUNT_BATCH = 1_000_000
+
+_DIGIT_RE = re.compile(r"\d")
+_BLANK_RUNS = re.compile(r"\n{3,}")
+
+csv.field_size_limit(sys.maxsize)
+
+
+def line_hash(line):
+    """64-bit hash of a normalized line, or None for lines too short to index."""
+    norm = " ".join(_DIGIT_RE.sub("0", line.lower()).split()).lstrip("> ")
+    if len(norm) < MIN_LINE_CHARS:
+        return None
+    return int.from_bytes(hashlib.blake2b(norm.encode("utf-8", "surrogatepass"), digest_size=8).digest(), "little")
+
+
+def body_hashes(body):
+    """Distinct line hashes of a body."""
+    return {h for h in map(line_hash, (body or "").splitlines()) if h is not None}
+
+
+class LineCounter:
+    """Per-line message counts kept as sorted (hash, count) numpy arrays."""
+
+    def __init__(self, batch=COUNT_BATCH):
+        self.batch = batch
+        self.docs = 0
+        self._keys = np.empty(0, dtype=np.uint64)
+        self._counts = np.empty(0, dtype=np.int64)
+        self._pending = []
+
+    def add(self, body):
+        self.docs += 1
+        self._pending.extend(body_hashes(body))
+        if len(self._pending) >= self.batch:
+            self._merge()
+
+    def _merge(self):
+        if not self._pending:
+            return
+        keys = np.concatenate([self._keys, np.array(self._pending, dtype=np.uint64)])
+        counts = np.concatenate([self._counts, np.ones(len(self._pending), dtype=np.int64)])
+        self._keys, inverse = np.unique(keys, return_inverse=True)
+        self._counts = np.bincount(inverse, weights=counts).astype(np.int64)
+        self._pending = []
+
+    def frequent(self, min_count):
+        self._merge()
+        return self._keys[self._counts >= min_count]
+
+    def __len__(self):
+        self._merge()
+        return len(self._keys)
+
+
+class BoilerplateIndex:
+    def __init__(self, hashes):
+        self.hashes = frozenset(int(h) for h in hashes)
+
+    @classmethod
+    def load(cls, path=INDEX_PATH):
+        return cls(np.load(path))
+
+    def save(self, path=INDEX_PATH):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        np.save(path, np.array(sorted(self.hashes), dtype=np.uint64))
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def strip(self, body):
+        """Body without its boilerplate lines (blank-line runs collapsed like strip_quoted)."""
+        if not body or not self.hashes:
+            return body
+        lines = body.splitlines()
+        kept = [ln for ln in lines if line_hash(ln) not in self.hashes]
+        if len(kept) == len(lines):
+            return body
+        return _BLANK_RUNS.sub("\n\n", "\n".join(kept)).strip()
+
+
+def strip_item(item, index):
+    """A parsed (row, digest, ...) item with boilerplate removed from the body; None if nothing is left."""
+    if item is None:
+        return None
+    row, _, *rest = item
+    body = index.strip(row[3])
+    if body == row[3]:
+        return item
+    if not (row[2] or body):
+        return None
+    row = [*row[:3], body, *row[4:]]
+    return (row, digest(canon_text(row[2], body)), *rest)
+
+
+_LOADED = {}
+
+
+def load_cached(path):
+    """Index for a path, loaded once per process (ingest workers)."""
+    if path not in _LOADED:
+        _LOADED[path] = BoilerplateIndex.load(path)
+    return _LOADED[path]
+
+
+# ------------------------------------------------------------
+# CLI
+# ------------------------------------------------------------
+
+
+def _bodies(path):
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            yield row.get("body") or ""
+
+
+def build(args):
+    started = time.perf_counter()
+    counter = LineCounter()
+    for body in _bodies(args.csv):
+        counter.add(body)
+    min_count = max(args.min_count, math.ceil(args.min_frac * counter.docs))
+    index = BoilerplateIndex(counter.frequent(min_count))
+    index.save(args.out)
+    print(
+        f"[boilerplate] {counter.docs} messages, {len(counter)} distinct lines; "
+        f"{len(index)} lines in >= {min_count} messages -> {args.out} ({time.perf_counter() - started:.1f}s)"
+    )
+
+
+def strip(args):
+    index = BoilerplateIndex.load(args.index)
+    out_path = args.out or args.csv
+    tmp_path = out_path + ".tmp"
+    n = before = after = 0
+    with open(args.csv, newline="") as f, open(tmp_path, "w", newline="") as out:
+        reader = csv.DictReader(f)
+        w = csv.DictWriter(out, fieldnames=reader.fieldnames)
+        w.writeheader()
+        for row in reader:
+            body = row.get("body") or ""
+            row["body"] = index.strip(body)
+            n += 1
+            before += len(body)
+            after += len(row["body"])
+            w.writerow(row)
+    os.replace(tmp_path, out_path)
+    print(
+        f"[boilerplate] {n} rows, body chars {before} -> {after} "
+        f"({1 - after / max(before, 1):.1%} removed) -> {out_path}"
+    )
+
+
+def _tfidf_fit_seconds(texts):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    # same settings as model/train.py
+    vec = TfidfVectorizer(
+        ngram_range=(1, 2), min_df=1, max_df=0.99, token_pattern=r"(?u)\b\w\w+\b", strip_accents="unicode"
+    )
+    started = time.perf_counter()
+    vec.fit(texts)
+    return time.perf_counter() - started, len(vec.vocabulary_)
+
+
+def report(args):
+    index = BoilerplateIndex.load(args.index)
+    with open(args.csv, newline="") as f:
+        rows = [(r.get("subject") or "", r.get("body") or "") for r in csv.DictReader(f)]
+    raw = [f"{s} || {b}".lower() for s, b in rows]
+    stripped = [f"{s} || {index.strip(b)}".lower() for s, b in rows]
+    print(f"[boilerplate] {len(rows)} messages, {len(index)} boilerplate lines")
+    for name, texts in (("original", raw), ("stripped", stripped)):
+        secs, vocab = _tfidf_fit_seconds(texts)
+        mb = sum(len(t) for t in texts) / 1e6
+        print(f"  {name:<9} {mb:8.1f} M chars  tf-idf fit {secs:6.1f}s  vocabulary {vocab}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Corpus-wide boilerplate line index.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("build", help="count lines across a CSV and save the frequent ones")
+    p.add_argument("csv")
+    p.add_argument("--out", default=INDEX_PATH)
+    p.add_argument("--min-count", type=int, default=MIN_COUNT, help="messages a line must appear in")
+    p.add_argument("--min-frac", type=float, default=MIN_FRAC, help="... or this fraction of messages, if larger")
+    p.set_defaults(fn=build)
+    p = sub.add_parser("strip", help="remove boilerplate lines from a CSV's bodies")
+    p.add_argument("csv")
+    p.add_argument("--index", default=INDEX_PATH)
+    p.add_argument("--out", help="output CSV (default: rewrite csv)")
+    p.set_defaults(fn=strip)
+    p = sub.add_parser("report", help="corpus size and TF-IDF fit time with and without boilerplate")
+    p.add_argument("csv")
+    p.add_argument("--index", default=INDEX_PATH)
+    p.set_defaults(fn=report)
+    args = ap.parse_args(argv)
+    args.fn(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+# scripts/corpus_db.py
+"""
+SQLite corpus store: one row per distinct email, keyed by the content hash used
+for ingest dedupe (blake2b-128 of canon_text(subject, body), hex).
+
+Pipeline stages update columns in place instead of rewriting CSVs:
+  keep                  filter_csv.py --db         (NULL = not filtered yet)
+  intent                import of a labeled CSV (label column)
+  split                 split_train_val.py --db    ('train' / 'val')
+  pred_intent/pred_conf mine_low_confidence.py --db
+
+`export` writes any stage back out in the usual CSV layout for scripts that
+still read files (e.g. model/train.py). subject/body are indexed with FTS5
+when the SQLite build has it.
+
+usage:
+  python scripts/corpus_db.py import data/emails.csv [--db data/corpus.db]
+  python scripts/corpus_db.py export data/emails.labeled.train.csv --stage train
+  python scripts/corpus_db.py search "invoice AND address"
+  python scripts/corpus_db.py stats
+"""
+import argparse
+import csv
+import os
+import sqlite3
+import sys
+
+from dedupe import digest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.preprocess import canon_text  # noqa: E402
+
+DB_PATH = os.path.join(ROOT, "data", "corpus.db")
+COLUMNS = ("to", "to_domain", "subject", "body", "intent")
+# columns a stage may set through set_column()
+STAGE_COLUMNS = ("keep", "intent", "split", "pred_intent", "pred_conf", "cluster_id", "near_dup")
+
+STAGES = {
+    "raw": "1",
+    "filtered": "keep = 1",
+    "labeled": "keep IS NOT 0 AND intent != ''",
+    "unlabeled": "keep = 1 AND intent = ''",
+    "train": "split = 'train'",
+    "val": "split = 'val'",
+}
+
+_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS emails (
+    id          INTEGER PRIMARY KEY,
+    hash        TEXT NOT NULL UNIQUE,
+    "to"        TEXT NOT NULL DEFAULT '',
+    to_domain   TEXT NOT NULL DEFAULT '',
+    subject     TEXT NOT NULL DEFAULT '',
+    body        TEXT NOT NULL DEFAULT '',
+    intent      TEXT NOT NULL DEFAULT '',
+    keep        INTEGER,
+    split       TEXT,
+    pred_intent TEXT,
+    pred_conf   REAL,
+    cluster_id  INTEGER,
+    near_dup    INTEGER
+);
+CREATE INDEX IF NOT EXISTS emails_split ON emails (split);
+"""
+
+_FTS_SQL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS emails_fts USING fts5(subject, body, content='emails', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS emails_fts_ai AFTER INSERT ON emails BEGIN
+    INSERT INTO emails_fts (rowid, subject, body) VALUES (new.id, new.subject, new.body);
+END;
+CREATE TRIGGER IF NOT EXISTS emails_fts_ad AFTER DELETE ON emails BEGIN
+    INSERT INTO emails_fts (emails_fts, rowid, subject, body) VALUES ('delete', old.id, old.subject, old.body);
+END;
+CREATE TRIGGER IF NOT EXISTS emails_fts_au AFTER UPDATE OF subject, body ON emails BEGIN
+    INSERT INTO emails_fts (emails_fts, rowid, subject, body) VALUES ('delete', old.id, old.subject, old.body);
+    INSERT INTO emails_fts (rowid, subject, body) VALUES (new.id, new.subject, new.body);
+END;
+"""
+
+csv.field_size_limit(sys.maxsize)
+
+
+def row_hash(subject, body):
+    return digest(canon_text(subject or "", body or "")).hex()
+
+
+def _int_or_none(v):
+    return int(v) if v not in (None, "") else None
+
+
+class CorpusDB:
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA_SQL)
+        try:
+            self.conn.executescript(_FTS_SQL)
+            self.fts = True
+        except sqlite3.OperationalError:  # SQLite built without FTS5
+            self.fts = False
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    # --- writes ---
+    def add(self, rows):
+        """
+        Insert rows (dicts with COLUMNS, optional hash/cluster_id/near_dup). For rows
+        already present, a non-empty intent and any cluster columns overwrite the stored ones.
+        """
+        cur = self.conn.executemany(
+            'INSERT INTO emails (hash, "to", to_domain, subject, body, intent, cluster_id, near_dup)'
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (hash) DO UPDATE SET"
+            " intent = CASE WHEN excluded.intent != '' THEN excluded.intent ELSE intent END,"
+            " cluster_id = COALESCE(excluded.cluster_id, cluster_id),"
+            " near_dup = COALESCE(excluded.near_dup, near_dup)",
+            (
+                (
+                    r.get("hash") or row_hash(r.get("subject"), r.get("body")),
+                    r.get("to") or "",
+                    r.get("to_domain") or "",
+                    r.get("subject") or "",
+                    r.get("body") or "",
+                    (r.get("intent") or "").strip(),
+                    _int_or_none(r.get("cluster_id")),
+                    _int_or_none(r.get("near_dup")),
+                )
+                for r in rows
+            ),
+        )
+        self.conn.commit()
+        return cur.rowcount
+
+    def set_column(self, column, values):
+        """values: iterable of (value, hash)."""
+        if column not in STAGE_COLUMNS:
+            raise ValueError(f"not a stage column: {column}")
+        self.conn.executemany(f"UPDATE emails SET {column} = ? WHERE hash = ?", values)
+        self.conn.commit()
+
+    def set_predictions(self, values):
+        """values: iterable of (pred_intent, pred_conf, hash)."""
+        self.conn.executemany("UPDATE emails SET pred_intent = ?, pred_conf = ? WHERE hash = ?", values)
+        self.conn.commit()
+
+    def clear_column(self, column):
+        if column not in STAGE_COLUMNS:
+            raise ValueError(f"not a stage column: {column}")
+        self.conn.execute(f"UPDATE emails SET {column} = NULL")
+        self.conn.commit()
+
+    # --- reads ---
+    def rows(self, stage="raw"):
+        """Rows of a stage as dicts (COLUMNS + hash + cluster_id), in insertion order."""
+        cur = self.conn.execute(
+            f'SELECT hash, "to", to_domain, subject, body, intent, cluster_id FROM emails'
+            f" WHERE {STAGES[stage]} ORDER BY id"
+        )
+        return [{k: ("" if r[k] is None else r[k]) for k in r.keys()} for r in cur]
+
+    def frame(self, stage="raw"):
+        """Same as rows() as a pandas DataFrame."""
+        import pandas as pd
+
+        return pd.DataFrame(self.rows(stage), columns=["hash", *COLUMNS, "cluster_id"])
+
+    def search(self, query, limit=20):
+        if not self.fts:
+            raise RuntimeError("this SQLite build has no FTS5")
+        return self.conn.execute(
+            "SELECT e.hash, e.subject, e.intent, e.split FROM emails_fts f JOIN emails e ON e.id = f.rowid"
+            " WHERE emails_fts MATCH ? ORDER BY bm25(emails_fts) LIMIT ?",
+            (query, limit),
+        ).fetchall()
+
+    def stats(self):
+        q = lambda where: self.conn.execute(f"SELECT COUNT(*) FROM emails WHERE {where}").fetchone()[0]  # noqa: E731
+        out = {stage: q(where) for stage, where in STAGES.items()}
+        out["predicted"] = q("pred_intent IS NOT NULL")
+        return out
+
+    # --- CSV bridge ---
+    def import_csv(self, path):
+        with open(path, newline="") as f:
+            return self.add(csv.DictReader(f))
+
+    def export_csv(self, path, stage="raw"):
+        rows = self.rows(stage)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(COLUMNS)
+            w.writerows([r[c] for c in COLUMNS] for r in rows)
+        return len(rows)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Local SQLite corpus store.")
+    ap.add_argument("--db", default=DB_PATH)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("import", help="add rows (and labels) from a CSV")
+    p.add_argument("csv")
+    p = sub.add_parser("export", help="write a stage as CSV")
+    p.add_argument("csv")
+    p.add_argument("--stage", choices=sorted(STAGES), default="raw")
+    p = sub.add_parser("search", help="full-text search over subject/body")
+    p.add_argument("query")
+    p.add_argument("--limit", type=int, default=20)
+    sub.add_parser("stats", help="row counts per stage")
+    args = ap.parse_args(argv)
+
+    db = CorpusDB(args.db)
+    if args.cmd == "import":
+        n = db.import_csv(args.csv)
+        print(f"[corpus] {n} rows inserted/updated from {args.csv} -> {args.db}")
+    elif args.cmd == "export":
+        n = db.export_csv(args.csv, args.stage)
+        print(f"[corpus] wrote {n} {args.stage} rows -> {args.csv}")
+    elif args.cmd == "search":
+        for r in db.search(args.query, args.limit):
+            print(f"{r['hash'][:12]}  {r['intent'] or '-':<20} {r['split'] or '-':<5}  {r['subject']}")
+    else:
+        for stage, n in db.stats().items():
+            print(f"{stage:<10} {n}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# scripts/dedupe.py
+"""
+Seen-sets for ingestion dedupe, keyed on 128-bit digests of `canon_text`.
+
+- memory: Python set of 16-byte digests (fixed size per message, not per text)
+- disk:   SQLite table of digests, for archives whose digest set outgrows RAM
+- bloom:  fixed-size bit array; never misses a duplicate, but a false positive
+          (rate ~error_rate) drops a unique message
+"""
+import hashlib
+import math
+import os
+import sqlite3
+
+DIGEST_BYTES = 16
+MODES = ("memory", "disk", "bloom")
+
+
+def digest(key: str) -> bytes:
+    return hashlib.blake2b(key.encode("utf-8", "surrogatepass"), digest_size=DIGEST_BYTES).digest()
+
+
+class MemorySeen:
+    def __init__(self):
+        self._seen = set()
+
+    def add(self, d: bytes) -> bool:
+        """Record a digest; True if it was new."""
+        if d in self._seen:
+            return False
+        self._seen.add(d)
+        return True
+
+    def __len__(self):
+        return len(self._seen)
+
+    def close(self):
+        pass
+
+
+class DiskSeen:
+    COMMIT_EVERY = 10_000
+
+    def __init__(self, path=None, conn=None, commit_every=COMMIT_EVERY):
+        # with `conn`, the caller owns the connection and its commits (commit_every=None)
+        self.path = path
+        self._own = conn is None
+        self._conn = conn if conn is not None else sqlite3.connect(path)
+        if self._own:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS seen (d BLOB PRIMARY KEY) WITHOUT ROWID")
+        self._commit_every = commit_every
+        self._pending = 0
+
+    def add(self, d: bytes) -> bool:
+        cur = self._conn.execute("INSERT OR IGNORE INTO seen (d) VALUES (?)", (d,))
+        self._pending += 1
+        if self._commit_every and self._pending >= self._commit_every:
+            self._conn.commit()
+            self._pending = 0
+        return cur.rowcount == 1
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+
+    def close(self):
+        if self._own:
+            self._conn.commit()
+            self._conn.close()
+
+
+class BloomSeen:
+    def __init__(self, capacity=10_000_000, error_rate=1e-6):
+        self.nbits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.k = max(1, round(self.nbits / capacity * math.log(2)))
+        self._bits = bytearray((self.nbits + 7) // 8)
+        self._count = 0
+
+    def add(self, d: bytes) -> bool:
+        # double hashing from the two 64-bit halves of the digest
+        h1 = int.from_bytes(d[:8], "little")
+        h2 = int.from_bytes(d[8:16], "little") | 1
+        bits, n = self._bits, self.nbits
+        new = False
+        for i in range(self.k):
+            pos = (h1 + i * h2) % n
+            byte, mask = pos >> 3, 1 << (pos & 7)
+            if not bits[byte] & mask:
+                bits[byte] |= mask
+                new = True
+        self._count += new
+        return new
+
+    def __len__(self):
+        return self._count
+
+    def close(self):
+        pass
+
+
+def make_seen(mode="memory", path=None, capacity=10_000_000):
+    if mode == "disk":
+        for stale in (path, path + "-wal", path + "-shm"):
+            if os.path.exists(stale):
+                os.remove(stale)
+        return DiskSeen(path)
+    if mode == "bloom":
+        return BloomSeen(capacity)
+    return MemorySeen()
+
+
+def peak_rss_mb(children=False):
+    """
+    Peak resident set size in MB of this process, or with `children` of the largest
+    finished child (e.g. a --jobs worker); None where `resource` is unavailable.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    kb = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    return kb / 1024 / (1024 if os.uname().sysname == "Darwin" else 1)
@@ -3,6 +3,7 @@ from __future__ import annotations
 
 import argparse
 import csv
+import sys
 from pathlib import Path
 from typing import Dict, List, Tuple
 
@@ -15,6 +16,9 @@ from sklearn.metrics import (
 )
 
 ART = Path("model_artifacts")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.preprocess import authored_text  # noqa: E402
 
 
 def read_labeled(path: Path) -> Tuple[List[str], List[str]]:
@@ -22,7 +26,7 @@ def read_labeled(path: Path) -> Tuple[List[str], List[str]]:
     with path.open(newline="") as f:
         reader = csv.DictReader(f)
         for row in reader:
-            text = f"{row.get('subject', '')} {row.get('body', '')}".strip()
+            text = f"{row.get('subject', '')} {authored_text(row.get('body', ''))}".strip()
             label = row.get("intent")
             if text and label:
                 X.append(text)
@@ -1,11 +1,22 @@
-import os, re, sys, json
+import os, re, sys, json, argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
+from corpus_db import CorpusDB
+from keyword_matcher import matcher_for
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.preprocess import top_segment  # noqa: E402
 
 # Paths
-ROOT = os.path.dirname(os.path.dirname(__file__))
 RULES_PATH = os.path.join(ROOT, "configs", "filter.json")
 RAW = os.path.join(ROOT, "data", "emails.csv")
 OUT = os.path.join(ROOT, "data", "emails.filtered.csv")
+# rows per task for --jobs: large enough that pickling a chunk to a worker
+# is a small share of filtering it
+JOBS_CHUNKSIZE = 2000
 
 # ------------------------------------------------------------
 # Helper functions
@@ -31,16 +42,41 @@ def domain_of(addr: str):
     return addr.split("@", 1)[1].lower()
 
 
-def any_keyword(text: str, keywords):
-    t = (text or "").lower()
-    return any(k in t for k in keywords)
+def contains_any(lowered, keywords):
+    """Per row of an already-lowercased column: does it contain any of the keywords (as substrings)?"""
+    return matcher_for(keywords).contains(lowered)
+
+
+_TOKEN_RE = re.compile(r"[a-z]{3,}")
 
 
 def token_count(text: str):
-    return len(set(re.findall(r"[a-z]{3,}", (text or "").lower())))
+    return len(set(_TOKEN_RE.findall((text or "").lower())))
+
+
+def has_unique_words(lowered: str, n: int) -> bool:
+    """token_count(text) >= n, stopping at the n-th distinct word."""
+    if n <= 0:
+        return True
+    seen = set()
+    for m in _TOKEN_RE.finditer(lowered):
+        seen.add(m.group())
+        if len(seen) >= n:
+            return True
+    return False
 
 
 # ---------- Top-authored extraction (key fix) ----------
+def top_authored_segment(text: str) -> str:
+    """
+    Returns the message content authored at the top of the email
+    (everything before quote headers/markers).
+    """
+    return top_segment(text)
+
+
+# ---------- Filters ----------
+# a body with any of these at a line start counts as carrying forwarded/quoted history
 QUOTE_START = re.compile(
     r"(?im)^(?:"
     r">+|"
@@ -57,29 +93,6 @@ QUOTE_START = re.compile(
     r")"
 )
 
-
-def top_authored_segment(text: str) -> str:
-    """
-    Returns the message content authored at the top of the email
-    (everything before quote headers/markers).
-    """
-    if not text:
-        return ""
-    lines = text.splitlines()
-    out = []
-    for ln in lines:
-        if QUOTE_START.match(ln):
-            break
-        if re.match(r"^\s*>+", ln):  # quoted line
-            break
-        out.append(ln)
-    # Trim trailing empty lines
-    while out and not out[-1].strip():
-        out.pop()
-    return "\n".join(out).strip()
-
-
-# ---------- Filters ----------
 COURTESY_KWS = [
     "thank you",
     "thanks",
@@ -108,59 +121,23 @@ SIG_KWS = [
     "respectfully",
 ]
 
+AUTO_KWS = [
+    "unsubscribe",
+    "notification",
+    "do not reply",
+    "no-reply",
+    "noreply",
+    "auto-generated",
+    "automated message",
+    "privacy policy",
+    "update preferences",
+    "email preferences",
+    "marketing email",
+    "follow us",
+    "visit our website",
+]
 
-def is_courtesy_top(subj: str, body: str, max_len_words: int = 20) -> bool:
-    top = (top_authored_segment(body) or "").lower()
-    text = f"{subj or ''} {top}".lower()
-    if len(top.split()) <= max_len_words and any(k in text for k in COURTESY_KWS):
-        return True
-    return False
-
-
-def is_signature_only_top(body: str, max_len_words: int = 12) -> bool:
-    top = (top_authored_segment(body) or "").lower()
-    words = len(re.findall(r"\w+", top))
-    if words <= max_len_words and any(k in top for k in SIG_KWS):
-        return True
-    return False
-
-
-def is_short_or_filler_subject(subj: str) -> bool:
-    s = (subj or "").lower().strip()
-    if len(s) < 6 or s in {"-", "//", "re:", "fwd:"}:
-        return True
-    return False
-
-
-def is_auto_generated(text: str) -> bool:
-    t = (text or "").lower()
-    return any(
-        k in t
-        for k in [
-            "unsubscribe",
-            "notification",
-            "do not reply",
-            "no-reply",
-            "noreply",
-            "auto-generated",
-            "automated message",
-            "privacy policy",
-            "update preferences",
-            "email preferences",
-            "marketing email",
-            "follow us",
-            "visit our website",
-        ]
-    )
-
-
-def is_forward_without_new_content(body: str, min_top_words: int = 20) -> bool:
-    t = (body or "").lower()
-    if "forwarded message" in t or QUOTE_START.search(t):
-        top = top_authored_segment(body)
-        if len(top.split()) < min_top_words:
-            return True
-    return False
+FILLER_SUBJECTS = {"-", "//", "re:", "fwd:"}
 
 
 # ------------------------------------------------------------
@@ -168,75 +145,177 @@ def is_forward_without_new_content(body: str, min_top_words: int = 20) -> bool:
 # ------------------------------------------------------------
 
 
-def main():
-    rules = load_rules(RULES_PATH)
-    if not os.path.exists(RAW):
-        print(f"[error] missing data/emails.csv")
-        sys.exit(1)
+def compute_keep(df, rules, derive_domains=None):
+    """
+    Boolean keep mask for a frame with to/to_domain/subject/body columns (may fill in to_domain).
 
-    df = pd.read_csv(RAW).fillna("")
-    before = len(df)
-    print(f"[filter] loaded {before} rows")
+    to_domain is derived from `to` when the column is missing or all empty;
+    `derive_domains` makes that decision for a chunk of a larger file.
 
+    Checks run cheapest first, each on the rows still kept: column-wise subject,
+    length and domain checks over the whole frame, then keyword scans of the
+    lowercased body, then the top-authored checks on one top_segment() per
+    remaining body, then the distinct-word count.
+    """
     keep = pd.Series(True, index=df.index)
 
-    # Compute top-authored snippet once for efficiency
-    df["top_authored"] = df["body"].apply(top_authored_segment)
-
-    # Drop courtesy-only / signature-only top segments
-    courtesy = df.apply(lambda r: is_courtesy_top(r["subject"], r["body"]), axis=1)
-    signature_only = df["body"].apply(is_signature_only_top)
-
-    # Drop messages where the top-authored text is too short (even if long quoted thread)
-    top_too_short = df["top_authored"].str.split().apply(len) < 12
-
-    # Other filters
-    short_subject = df["subject"].apply(is_short_or_filler_subject)
-    auto_generated = df["body"].apply(is_auto_generated)
-    forwarded_no_new = df["body"].apply(is_forward_without_new_content)
-
-    # Combine
-    keep &= ~(
-        courtesy
-        | signature_only
-        | top_too_short
-        | short_subject
-        | auto_generated
-        | forwarded_no_new
-    )
-
-    # Rules-based thresholds
+    # Short / filler subjects, too-short bodies, blocked subjects
+    subject = df["subject"].str.lower()
+    stripped = subject.str.strip()
+    keep &= ~((stripped.str.len() < 6) | stripped.isin(FILLER_SUBJECTS))
+    if "min_body_chars" in rules:
+        keep &= df["body"].str.len() >= rules["min_body_chars"]
     if rules.get("block_subject_keywords"):
-        badsub = df["subject"].apply(
-            lambda s: any_keyword(s, rules["block_subject_keywords"])
-        )
-        keep &= ~badsub
-    if rules.get("block_body_keywords"):
-        badbody = df["body"].apply(
-            lambda s: any_keyword(s, rules["block_body_keywords"])
-        )
-        keep &= ~badbody
+        keep &= ~contains_any(subject, rules["block_subject_keywords"])
 
     # Domain-level filtering
     if "block_domains" in rules:
         df["to_domain"] = df.get("to_domain", "")
-        if "to_domain" not in df.columns or df["to_domain"].eq("").all():
+        if derive_domains is None:
+            derive_domains = df["to_domain"].eq("").all()
+        if derive_domains:
             df["to_domain"] = df["to"].apply(domain_of)
         for dom in rules["block_domains"]:
             keep &= ~df["to_domain"].str.contains(dom, case=False, na=False)
 
-    # Fallback basic content requirements (after top-text checks)
-    # Keep rows that have at least some authored content
-    keep &= df["top_authored"].str.split().apply(len) >= 6
+    # Automated mail and blocked body keywords
+    body = df.loc[keep, "body"].str.lower()
+    drop = contains_any(body, AUTO_KWS)
+    if rules.get("block_body_keywords"):
+        drop |= contains_any(body, rules["block_body_keywords"])
+    keep[drop[drop].index] = False
+
+    # Top-authored segment: courtesy-only, signature-only, too short, forwarded without new text.
+    # top_segment() is the one per-row step; the checks on its result are column-wise.
+    rows = keep[keep].index
+    body = body[rows]
+    top = df.loc[rows, "body"].map(top_segment).str.lower()
+    top_words = top.str.count(r"\S+")
+    forwarded = body.str.contains("forwarded message", regex=False) | body.str.contains(QUOTE_START)
+    drop = (
+        # too short even if a long quoted thread follows (also the 6-word floor)
+        (top_words < 12)
+        | ((top_words <= 20) & contains_any(subject[rows] + " " + top, COURTESY_KWS))
+        | ((top.str.count(r"\w+") <= 12) & contains_any(top, SIG_KWS))
+        | ((top_words < 20) & forwarded)
+    )
+    keep[rows] = ~drop
 
-    # Optional thresholds from rules on FULL body (still useful for junk)
-    if "min_body_chars" in rules:
-        keep &= df["body"].str.len() >= rules["min_body_chars"]
+    # Distinct words over the FULL body (still useful for junk)
     if "min_unique_words" in rules:
-        uniq = df["body"].apply(token_count)
-        keep &= uniq >= rules["min_unique_words"]
+        n = rules["min_unique_words"]
+        rows = keep[keep].index
+        keep[rows] = pd.Series([has_unique_words(t, n) for t in body[rows]], index=rows, dtype=bool)
+    return keep
+
+
+def domains_missing(path, chunksize):
+    """compute_keep's to_domain decision for a whole CSV: the column is absent or empty in every row."""
+    if "to_domain" not in pd.read_csv(path, nrows=0).columns:
+        return True
+    for chunk in pd.read_csv(path, usecols=["to_domain"], dtype=str, chunksize=chunksize):
+        if chunk["to_domain"].fillna("").ne("").any():
+            return False
+    return True
+
+
+def filter_chunk(chunk, rules, derive_domains=None):
+    """(kept rows, row count) of one chunk as read by filter_chunks."""
+    chunk = chunk.fillna("")
+    keep = compute_keep(chunk, rules, derive_domains=derive_domains)
+    return chunk[keep], len(chunk)
+
+
+def ordered_results(chunks, jobs, rules, derive_domains=None):
+    """filter_chunk per chunk in input order; at most 2*jobs chunks in flight to bound memory."""
+    if jobs <= 1:
+        for chunk in chunks:
+            yield filter_chunk(chunk, rules, derive_domains)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as ex:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(ex.submit(filter_chunk, chunk, rules, derive_domains))
+            if len(pending) >= 2 * jobs:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def filter_chunks(src, dst, rules, chunksize, jobs=1):
+    """
+    Filter a CSV `chunksize` rows at a time, appending kept rows to dst, so
+    memory is bounded by one chunk (per worker, with jobs > 1). Columns are read
+    as text, so numeric-looking fields are copied through unchanged.
+    Returns (rows, kept).
+    """
+    derive = domains_missing(src, chunksize) if "block_domains" in rules else None
+    rows = kept = 0
+    chunks = pd.read_csv(src, dtype=str, chunksize=chunksize)
+    with open(dst, "w", newline="") as out:
+        for n, (filtered, count) in enumerate(ordered_results(chunks, jobs, rules, derive)):
+            filtered.to_csv(out, header=n == 0, index=False)
+            rows += count
+            kept += len(filtered)
+    return rows, kept
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--db", help="corpus DB: filter its rows and store the keep flag instead of writing a CSV")
+    ap.add_argument(
+        "--chunksize",
+        type=int,
+        default=0,
+        help="stream the CSV in batches of this many rows instead of loading it whole (0: off)",
+    )
+    ap.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help=f"filter chunks in N worker processes, output in input order (chunks of {JOBS_CHUNKSIZE} rows"
+        " unless --chunksize is given)",
+    )
+    args = ap.parse_args(argv)
+    if (args.chunksize or args.jobs > 1) and args.db:
+        ap.error("--chunksize/--jobs stream data/emails.csv; the corpus DB is filtered in one pass")
+    if args.jobs > 1 and not args.chunksize:
+        args.chunksize = JOBS_CHUNKSIZE
+
+    rules = load_rules(RULES_PATH)
+    if args.chunksize:
+        if not os.path.exists(RAW):
+            print("[error] missing data/emails.csv")
+            sys.exit(1)
+        os.makedirs(os.path.dirname(OUT), exist_ok=True)
+        before, after = filter_chunks(RAW, OUT, rules, args.chunksize, args.jobs)
+        print(
+            f"[filter] kept {after}/{before} rows ({before - after} removed) "
+            f"in chunks of {args.chunksize}, jobs={args.jobs}"
+        )
+        print(f"[filter] wrote -> {OUT}")
+        return
+    if args.db:
+        db = CorpusDB(args.db)
+        df = db.frame("raw").fillna("")
+    else:
+        if not os.path.exists(RAW):
+            print("[error] missing data/emails.csv")
+            sys.exit(1)
+        df = pd.read_csv(RAW).fillna("")
+    before = len(df)
+    print(f"[filter] loaded {before} rows")
+
+    keep = compute_keep(df, rules)
+
+    if args.db:
+        db.set_column("keep", zip(keep.astype(int).tolist(), df["hash"]))
+        db.close()
+        print(f"[filter] kept {int(keep.sum())}/{before} rows ({before - int(keep.sum())} removed)")
+        print(f"[filter] updated keep -> {args.db}")
+        return
 
-    filtered = df[keep].drop(columns=["top_authored"], errors="ignore").copy()
+    filtered = df[keep].copy()
     after = len(filtered)
 
     os.makedirs(os.path.dirname(OUT), exist_ok=True)
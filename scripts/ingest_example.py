@@ -1,20 +1,10 @@
 # scripts/ingest_example.py
-# Convert a simple JSONL export to emails.csv (adjust to your source)
-import json, csv, sys
+# Convert a simple JSONL export to emails.csv (adjust field names in readers.JsonlReader)
+# Same clean/dedupe/write path as mbox_to_csv.py, so rows get to_domain too.
+import sys
 
-# usage: python scripts/ingest_example.py raw.jsonl data/emails.csv
-src, dst = sys.argv[1], sys.argv[2]
-with open(src, "r") as f, open(dst, "w", newline="") as out:
-    w = csv.writer(out)
-    w.writerow(["to", "subject", "body", "intent"])
-    for line in f:
-        obj = json.loads(line)
-        w.writerow(
-            [
-                obj.get("to", "").lower(),
-                obj.get("subject", ""),
-                obj.get("body", ""),
-                obj.get("intent", ""),
-            ]
-        )
-print("wrote", dst)
+from mbox_to_csv import main
+
+# usage: python scripts/ingest_example.py raw.jsonl data/emails.csv [mbox_to_csv options]
+if __name__ == "__main__":
+    main([*sys.argv[1:3], "--format", "jsonl", *sys.argv[3:]])
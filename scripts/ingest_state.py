@@ -0,0 +1,112 @@
+# scripts/ingest_state.py
+"""
+Checkpoint for resumable / incremental `mbox_to_csv.py --resume` runs.
+
+One SQLite file next to the CSV holds:
+- meta:        resume offset for mbox/JSONL sources (+ digest of the bytes before it), CSV byte size
+- files_done:  files already parsed, for directory sources (relative to the source root)
+- message_ids: Message-IDs already ingested
+- seen:        dedupe digests (see dedupe.DiskSeen)
+- threads:     Message-ID -> thread, with --threads (see threads.ThreadIndex)
+
+Everything for a work unit is written in the same transaction as the CSV size
+it produced, after the CSV is fsync'd. On restart the CSV is truncated back to
+that size, so a crash mid-unit just re-parses that unit.
+"""
+import hashlib
+import os
+import sqlite3
+
+from dedupe import DiskSeen
+
+TAIL_BYTES = 4096
+
+_SCHEMA_SQL = (
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS files_done (path TEXT PRIMARY KEY) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS message_ids (mid TEXT PRIMARY KEY) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS seen (d BLOB PRIMARY KEY) WITHOUT ROWID",
+)
+
+
+def _tail_digest(path, offset):
+    start = max(0, offset - TAIL_BYTES)
+    with open(path, "rb") as fh:
+        fh.seek(start)
+        chunk = fh.read(offset - start)
+        nxt = fh.read(5)
+    return hashlib.blake2b(chunk, digest_size=16).hexdigest(), nxt
+
+
+class IngestState:
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        for sql in _SCHEMA_SQL:
+            self.conn.execute(sql)
+        self.conn.commit()
+
+    # --- meta ---
+    def get(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set(self, key, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def reset(self):
+        # including tables other components keep here (near-dupe LSH index, thread index)
+        tables = [r[0] for r in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+        for table in tables:
+            self.conn.execute(f"DELETE FROM {table}")
+        self.conn.commit()
+
+    # --- resume points ---
+    def restore_csv(self, dst):
+        """Truncate dst to the last checkpoint; False (and a clean state) if there is nothing to resume."""
+        csv_bytes = int(self.get("csv_bytes", 0))
+        if not csv_bytes or not os.path.exists(dst) or os.path.getsize(dst) < csv_bytes:
+            self.reset()
+            return False
+        with open(dst, "r+b") as fh:
+            fh.truncate(csv_bytes)
+        return True
+
+    def resume_offset(self, src, separator=None):
+        """
+        Offset to continue a range source from; 0 if the file was rewritten (e.g. a
+        compacted mbox) since. `separator` is what must start at the offset, if anything.
+        """
+        off = int(self.get("offset", 0))
+        if not off or os.path.getsize(src) < off:
+            return 0
+        digest, nxt = _tail_digest(src, off)
+        if digest != self.get("tail") or (separator and nxt and not nxt.startswith(separator)):
+            return 0
+        return off
+
+    def files_done(self):
+        return {r[0] for r in self.conn.execute("SELECT path FROM files_done")}
+
+    # --- per-message ---
+    def seen(self):
+        return DiskSeen(conn=self.conn, commit_every=None)
+
+    def add_message_id(self, mid):
+        """Record a Message-ID; False if it was ingested before."""
+        cur = self.conn.execute("INSERT OR IGNORE INTO message_ids (mid) VALUES (?)", (mid,))
+        return cur.rowcount == 1
+
+    # --- commit ---
+    def checkpoint(self, csv_bytes, src=None, offset=None, files=()):
+        if offset is not None:
+            self._set("offset", offset)
+            self._set("tail", _tail_digest(src, offset)[0])
+        self.conn.executemany("INSERT OR IGNORE INTO files_done (path) VALUES (?)", ((p,) for p in files))
+        self._set("csv_bytes", csv_bytes)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
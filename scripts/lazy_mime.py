@@ -0,0 +1,138 @@
+# scripts/lazy_mime.py
+"""
+Header-first MIME walking for ingest.
+
+A full parse (email.message_from_bytes / mailbox.mbox) builds every part of a
+message, so a PO with a 10 MB PDF attached costs 10 MB of strings before
+extract_text() throws it away. Here only header blocks are parsed; multipart
+bodies are split by searching for boundary lines in the raw buffer (bytes or
+an mmap, addressed by [start, end) offsets), and a payload is copied out only
+for text/plain and text/html leaves -- at most `part_cap` bytes of it.
+
+Decoding goes through Message.get_payload(decode=True) on a header-only
+message, so for well-formed mail the text matches extract_text() on a full
+parse. Differences: non-text single-part bodies are skipped instead of being
+decoded as text, and text parts longer than the cap are truncated.
+"""
+import re
+from email import policy as email_policy
+from email.parser import BytesHeaderParser
+
+PART_CAP = 1024 * 1024
+
+# a header line (or continuation); anything else ends the header block, as in email.feedparser
+_HEADER_LINE = re.compile(rb"From |[\041-\071\073-\176]*:|[\t ]")
+
+
+def split_headers(buf, start, end):
+    """(header_end, body_start) of the message in buf[start:end]."""
+    pos = start
+    while pos < end:
+        nl = buf.find(b"\n", pos, end)
+        line_end = end if nl < 0 else nl + 1
+        if buf[pos:line_end].strip(b"\r\n") == b"":
+            return pos, line_end
+        if not _HEADER_LINE.match(buf, pos, line_end):
+            return pos, pos
+        pos = line_end
+    return end, end
+
+
+def parse_headers(buf, start, end, policy=email_policy.compat32):
+    """Header-only Message of buf[start:end] and the offset its body starts at."""
+    hdr_end, body = split_headers(buf, start, end)
+    return BytesHeaderParser(policy=policy).parsebytes(bytes(buf[start:hdr_end])), body
+
+
+# what may follow `--boundary` on a delimiter line: `--` for the close delimiter, then blanks
+_DELIM_TAIL = re.compile(rb"(--)?[ \t]*(?:\r?\n|\Z)")
+
+
+def _delimiters(buf, start, end, boundary):
+    """Yield (line_start, line_end, is_close) of each `--boundary` line in buf[start:end]; start is a line start."""
+    dash = b"--" + boundary
+    pos = start
+    while True:
+        if pos == 0 and buf[:len(dash)] == dash:
+            at = 0
+        else:
+            at = buf.find(b"\n" + dash, max(pos - 1, 0), end)
+            if at < 0:
+                return
+            at += 1
+        m = _DELIM_TAIL.match(buf, at + len(dash), end)
+        if m:
+            yield at, m.end(), bool(m.group(1))
+        pos = at + len(dash)
+
+
+def _parts(buf, start, end, boundary):
+    """[start, end) of each body part between `--boundary` lines (preamble/epilogue dropped)."""
+    spans = []
+    part = None
+    for line_start, line_end, is_close in _delimiters(buf, start, end, boundary):
+        if part is not None:
+            # the line break before a delimiter belongs to the delimiter
+            stop = line_start - 1
+            if buf[stop - 1:stop] == b"\r":
+                stop -= 1
+            spans.append((part, max(stop, part)))
+        if is_close:
+            return spans
+        part = line_end
+    if part is not None:  # unterminated: the last part runs to the end
+        spans.append((part, end))
+    return spans
+
+
+def walk_leaves(buf, start, end, policy=email_policy.compat32, msg=None, body=None):
+    """Yield (header-only Message, body_start, body_end) for every non-multipart part."""
+    if msg is None:
+        msg, body = parse_headers(buf, start, end, policy)
+    ctype = msg.get_content_type()
+    if msg.get_content_maintype() == "multipart":
+        boundary = msg.get_param("boundary")
+        if boundary:
+            bound = str(boundary).encode("ascii", "surrogateescape")
+            for s, e in _parts(buf, body, end, bound):
+                part, part_body = parse_headers(buf, s, e, policy)
+                if ctype == "multipart/digest" and "content-type" not in part:
+                    part.set_default_type("message/rfc822")
+                yield from walk_leaves(buf, s, e, policy, part, part_body)
+            return
+    elif ctype == "message/rfc822":
+        yield from walk_leaves(buf, body, end, policy)
+        return
+    yield msg, body, end
+
+
+def _decode(part, buf, start, end, cap):
+    if cap is not None:
+        end = min(end, start + cap)
+    part.set_payload(str(bytes(buf[start:end]), "ascii", "surrogateescape"))
+    return (part.get_payload(decode=True) or b"").decode(errors="ignore")
+
+
+def extract_text_lazy(buf, start, end, policy=email_policy.compat32, part_cap=PART_CAP, msg=None, body=None):
+    """
+    (text, is_html) like readers.extract_text(): all text/plain parts, else all
+    text/html parts. Only those payloads are copied and decoded, each capped at
+    part_cap bytes of encoded body (None: no cap).
+    """
+    if msg is None:
+        msg, body = parse_headers(buf, start, end, policy)
+    txt, html = [], []
+    for part, s, e in walk_leaves(buf, start, end, policy, msg, body):
+        ctype = part.get_content_type()
+        if ctype == "text/plain":
+            txt.append(_decode(part, buf, s, e, part_cap))
+        elif ctype == "text/html":
+            html.append(_decode(part, buf, s, e, part_cap))
+        elif part.get_content_maintype() == "text" and part is msg:
+            # single-part text/* other than plain/html: extract_text() keeps it too
+            txt.append(_decode(part, buf, s, e, part_cap))
+    if txt:
+        return "".join(txt), False
+    if html:
+        return "".join(html), True
+    return "", False
@@ -0,0 +1,117 @@
+# scripts/mbox_scan.py
+"""
+Single-pass mbox reader over an mmap.
+
+`mailbox.mbox` builds a table of contents by reading the whole file, then reads
+every message a second time. Here the file is mapped once, `From ` separator
+lines are found with `mmap.find`, and each message is handed out as a
+`memoryview` slice of the mapping (no copy until the parser decodes it).
+
+Separators follow `mailbox.mbox`: any line starting with b"From " (mboxo), and
+the newline in front of the next separator is not part of the message.
+"""
+import mmap
+import os
+from email import policy as email_policy
+from email.parser import Parser
+
+SEP = b"\nFrom "
+
+
+class MboxScan:
+    """mmap'd mbox; use as a context manager (or call close())."""
+
+    def __init__(self, path):
+        self.path = path
+        self._fh = open(path, "rb")
+        self.size = os.fstat(self._fh.fileno()).st_size
+        self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ) if self.size else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._mm is not None:
+            try:
+                self._mm.close()
+            except BufferError:
+                pass  # a caller still holds a slice; the mapping goes with it
+            self._mm = None
+        self._fh.close()
+
+    def next_separator(self, pos):
+        """Offset of the first separator line starting at or after `pos` (size if none)."""
+        mm = self._mm
+        if mm is None or pos >= self.size:
+            return self.size
+        if pos == 0 and mm[:5] == b"From ":
+            return 0
+        i = mm.find(SEP, max(pos - 1, 0))
+        return self.size if i == -1 else i + 1
+
+    def ranges(self, chunk_bytes, start=0):
+        """[start, end) byte ranges of ~chunk_bytes, each beginning on a separator."""
+        cuts = [self.next_separator(start)]
+        while True:
+            nxt = self.next_separator(cuts[-1] + chunk_bytes)
+            if nxt >= self.size:
+                break
+            cuts.append(nxt)
+        cuts.append(self.size)
+        return [(s, e) for s, e in zip(cuts, cuts[1:]) if e > s]
+
+    @property
+    def buffer(self):
+        """The mapping itself (supports find/slicing), or b"" for an empty file."""
+        return self._mm if self._mm is not None else b""
+
+    def spans(self, start=0, end=None):
+        """
+        Yield (offset, next_offset, msg_start, msg_end) for each message whose separator
+        lies in [start, end). [msg_start, msg_end) excludes the `From ` line; `next_offset`
+        is where the following message (or the file) starts, i.e. a safe resume point.
+        """
+        mm = self._mm
+        if mm is None:
+            return
+        end = self.size if end is None else min(end, self.size)
+        pos = self.next_separator(start)
+        while pos < end:
+            nxt = self.next_separator(pos + 1)
+            body = mm.find(b"\n", pos, nxt) + 1
+            stop = nxt
+            if nxt < self.size or mm[stop - 1:stop] == b"\n":
+                stop -= 1
+                if stop > body and mm[stop - 1:stop] == b"\r":
+                    stop -= 1
+            if body:  # separator line has a newline
+                yield pos, nxt, body, max(stop, body)
+            pos = nxt
+
+    def messages(self, start=0, end=None):
+        """Like spans(), but yield (offset, next_offset, view) with a memoryview of the message."""
+        if self._mm is None:
+            return
+        view = memoryview(self._mm)
+        try:
+            for pos, nxt, body, stop in self.spans(start, end):
+                yield pos, nxt, view[body:stop]
+        finally:
+            view.release()
+
+
+def parse_message(view, policy=email_policy.compat32):
+    """Parse one message from a bytes-like slice (same decoding as BytesParser)."""
+    return Parser(policy=policy).parsestr(str(view, "ascii", "surrogateescape"))
+
+
+def iter_mbox(path, start=0, end=None, policy=email_policy.compat32):
+    """Parsed messages of an mbox (optionally only those starting in [start, end))."""
+    with MboxScan(path) as scan:
+        for _, _, view in scan.messages(start, end):
+            with view:
+                msg = parse_message(view, policy)
+            yield msg
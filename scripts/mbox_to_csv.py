@@ -1,99 +1,213 @@
-import os, sys, csv, email, re
-from email import policy
-from email.utils import getaddresses
-from app.preprocess import clean_subject_body, canon_text
-
-ADDR_RE = re.compile(r"[^@<\s]+@[^>\s]+")
-
-
-def primary_to_and_domain(hdr: str):
-    if not hdr:
-        return "", ""
-    addrs = [a[1] for a in getaddresses([hdr]) if a[1]]
-    if not addrs:
-        return "", ""
-    primary = addrs[0].lower().strip()
-    m = ADDR_RE.search(primary)
-    if not m:
-        return primary, ""
-    addr = m.group(0)
-    domain = addr.split("@", 1)[1]
-    return addr, domain
-
-
-def extract_text(msg):
-    if msg.is_multipart():
-        txt, html = "", ""
-        for part in msg.walk():
-            ct = (part.get_content_type() or "").lower()
-            if ct == "text/plain":
-                txt += (part.get_payload(decode=True) or b"").decode(errors="ignore")
-            elif ct == "text/html":
-                html += (part.get_payload(decode=True) or b"").decode(errors="ignore")
-        if txt:
-            return txt, False
-        if html:
-            return html, True
-        return "", False
-    else:
-        ct = (msg.get_content_type() or "").lower()
-        payload = (msg.get_payload(decode=True) or b"").decode(errors="ignore")
-        return payload, (ct == "text/html")
-
-
-def iter_messages(path):
-    # Apple Mail: .mbox is a folder with Messages/*.emlx
-    if os.path.isdir(path) and path.endswith(".mbox"):
-        messages_dir = os.path.join(path, "Messages")
-        for root, _, files in os.walk(messages_dir):
-            for f in files:
-                if f.endswith(".emlx"):
-                    with open(os.path.join(root, f), "rb") as fh:
-                        msg = email.message_from_binary_file(fh, policy=policy.default)
-                        yield msg
-        return
-    # Standard mbox file
-    import mailbox
+import os, csv, time, argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dedupe import MODES, make_seen, peak_rss_mb
+from ingest_state import IngestState
+from lazy_mime import PART_CAP
+from readers import READERS, detect_reader, extract_text, parse_row, primary_to_and_domain  # noqa: F401
+
+
+def iter_messages(path, fmt=None):
+    """email.message.Message per message of an mbox file, Apple Mail .mbox folder, Maildir or .eml tree."""
+    yield from detect_reader(path, fmt).messages(path)
 
-    m = mailbox.mbox(path)
-    for msg in m:
-        yield msg
 
+def run_unit(unit, near_dupes=False, mime="lazy", part_cap=PART_CAP, boilerplate=None):
+    items = READERS[unit[0]].parse(unit, mime, part_cap)
+    if boilerplate:
+        from boilerplate import load_cached, strip_item
 
-def main():
-    if len(sys.argv) != 3:
-        print(
-            "usage: python scripts/mbox_to_csv.py <INBOX.mbox|mbox-folder> data/emails.csv"
-        )
-        sys.exit(1)
-    src, dst = sys.argv[1], sys.argv[2]
-    os.makedirs(os.path.dirname(dst), exist_ok=True)
+        index = load_cached(boilerplate)
+        items = [strip_item(item, index) for item in items]
+    if near_dupes:
+        # MinHash signatures are the expensive part of near-dupe detection; compute them here
+        from near_dupes import row_signature
 
-    seen = set()
-    kept = 0
+        items = [item and item + (row_signature(item[0][3] or item[0][2]),) for item in items]
+    return items
 
-    with open(dst, "w", newline="") as out:
+
+def ordered_results(units, jobs, near_dupes=False, mime="lazy", part_cap=PART_CAP, boilerplate=None):
+    """Results per unit in input order; at most 2*jobs units in flight to bound memory."""
+    if jobs <= 1:
+        for unit in units:
+            yield run_unit(unit, near_dupes, mime, part_cap, boilerplate)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as ex:
+        pending = deque()
+        it = iter(units)
+        for unit in it:
+            pending.append(ex.submit(run_unit, unit, near_dupes, mime, part_cap, boilerplate))
+            if len(pending) >= 2 * jobs:
+                break
+        while pending:
+            yield pending.popleft().result()
+            nxt = next(it, None)
+            if nxt is not None:
+                pending.append(ex.submit(run_unit, nxt, near_dupes, mime, part_cap, boilerplate))
+
+
+def units_bytes(units):
+    return sum(READERS[u[0]].nbytes(u) for u in units)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(
+        usage="python scripts/mbox_to_csv.py <mbox|Mail.mbox folder|Maildir|.eml dir|export.jsonl> data/emails.csv"
+        " [--format F] [--jobs N]"
+    )
+    ap.add_argument("src")
+    ap.add_argument("dst")
+    ap.add_argument("--format", choices=sorted(READERS), help="source format (default: detect from src)")
+    ap.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="parser processes (default: all cores)")
+    ap.add_argument("--dedupe", choices=MODES, default="memory", help="seen-set backend for duplicate detection")
+    ap.add_argument("--dedupe-path", help="SQLite file for --dedupe disk (default: <dst>.seen.db)")
+    ap.add_argument("--bloom-capacity", type=int, default=10_000_000, help="expected messages for --dedupe bloom")
+    ap.add_argument(
+        "--resume",
+        action="store_true",
+        help="checkpoint progress and append only new messages on reruns (dedupe state lives in the checkpoint)",
+    )
+    ap.add_argument("--state", help="checkpoint file for --resume (default: <dst>.state.db)")
+    ap.add_argument("--db", help="also add the kept rows to this corpus DB (see corpus_db.py)")
+    ap.add_argument("--near-dupes", action="store_true", help="also drop near-duplicate bodies (MinHash/LSH)")
+    ap.add_argument("--near-threshold", type=float, default=0.8, help="estimated Jaccard for --near-dupes")
+    ap.add_argument("--near-db", help="keep the --near-dupes index in this SQLite file instead of memory")
+    ap.add_argument(
+        "--mime",
+        choices=("lazy", "full"),
+        default="lazy",
+        help="lazy: parse headers first and decode only text parts; full: parse every part (slower)",
+    )
+    ap.add_argument("--part-cap", type=int, default=PART_CAP, help="max encoded bytes read per text part (0: no cap)")
+    ap.add_argument("--boilerplate", help="strip the lines in this index from bodies (see boilerplate.py)")
+    ap.add_argument("--threads", action="store_true", help="add thread_id/thread_pos columns (see threads.py)")
+    ap.add_argument(
+        "--latest-per-thread",
+        action="store_true",
+        help="keep only the newest message of each thread (implies --threads; not with --resume)",
+    )
+    args = ap.parse_args(argv)
+    if args.latest_per_thread and args.resume:
+        ap.error("--latest-per-thread needs the whole source in one run; use threads.py on the CSV after --resume")
+    if args.near_db and args.resume:
+        ap.error("--near-db is not used with --resume; the near-dupe index lives in the checkpoint")
+    args.threads = args.threads or args.latest_per_thread
+    src, dst = args.src, args.dst
+    os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+
+    reader = detect_reader(src, args.format)
+    state, append = None, False
+    start_offset, done_files = 0, frozenset()
+    if args.resume:
+        state = IngestState(args.state or dst + ".state.db")
+        append = state.restore_csv(dst)
+        if append and reader.resume == "files":
+            done_files = state.files_done()
+        elif append:
+            start_offset = state.resume_offset(src, reader.separator)
+            if not start_offset:
+                print("[ingest] source changed since last checkpoint; rescanning, skipping known messages")
+        seen = state.seen()
+    else:
+        seen = make_seen(args.dedupe, args.dedupe_path or dst + ".seen.db", args.bloom_capacity)
+    lsh = None
+    if args.near_dupes:
+        from near_dupes import LSHIndex
+
+        # the index is part of the checkpoint when resuming
+        if state is None and args.near_db and os.path.exists(args.near_db):
+            os.remove(args.near_db)
+        lsh = LSHIndex(threshold=args.near_threshold, path=args.near_db, conn=state.conn if state else None)
+    thread_index = None
+    if args.threads:
+        from threads import THREAD_COLUMNS, ThreadIndex, latest_per_thread
+
+        thread_index = ThreadIndex(conn=state.conn if state else None)
+    corpus = None
+    if args.db:
+        from corpus_db import COLUMNS, CorpusDB
+
+        corpus = CorpusDB(args.db)
+    parsed = kept = dupes = near = known = 0
+    started = time.perf_counter()
+
+    units = reader.units(src, start_offset, done_files)
+    with open(dst, "a" if append else "w", newline="") as out:
         w = csv.writer(out)
-        # include to_domain for better priors
-        w.writerow(["to", "to_domain", "subject", "body", "intent"])
-        for msg in iter_messages(src):
-            to_addr, to_domain = primary_to_and_domain(msg.get("to"))
-            subj = (msg.get("subject") or "").strip()
-            body_raw, is_html = extract_text(msg)
-            subj_clean, body_clean = clean_subject_body(subj, body_raw, is_html)
-
-            if not (subj_clean or body_clean):
-                continue
-
-            key = canon_text(subj_clean, body_clean)
-            if key in seen:
-                continue
-            seen.add(key)
-
-            w.writerow([to_addr, to_domain, subj_clean, body_clean, ""])
-            kept += 1
-
-    print(f"Wrote {kept} rows to {dst}")
+        if not append:
+            # include to_domain for better priors
+            w.writerow(["to", "to_domain", "subject", "body", "intent"] + (THREAD_COLUMNS if args.threads else []))
+        results = ordered_results(units, args.jobs, args.near_dupes, args.mime, args.part_cap, args.boilerplate)
+        for unit, rows in zip(units, results):
+            new_rows = []
+            for item in rows:
+                parsed += 1
+                if item is None:
+                    continue
+                row, key, mid, parents = item[:4]
+                if state is not None and mid and not state.add_message_id(mid):
+                    known += 1
+                    continue
+                if thread_index is not None:
+                    # before dedupe, so replies to a dropped duplicate still find their thread
+                    fallback = int.from_bytes(key[:8], "little", signed=True)
+                    row = row + list(thread_index.assign(mid, parents, fallback))
+                if not seen.add(key):
+                    dupes += 1
+                    continue
+                if lsh is not None and item[4] is not None and lsh.assign(item[4])[1]:
+                    near += 1
+                    continue
+
+                w.writerow(row)
+                kept += 1
+                if corpus is not None:
+                    new_rows.append({"hash": key.hex(), **dict(zip(COLUMNS, row))})
+            if new_rows:
+                corpus.add(new_rows)
+            if state is not None:
+                out.flush()
+                os.fsync(out.fileno())
+                csv_bytes = os.fstat(out.fileno()).st_size
+                if reader.resume == "files":
+                    state.checkpoint(csv_bytes, files=unit[2])
+                else:
+                    state.checkpoint(csv_bytes, src=src, offset=unit[3])
+        # zip() stops before the generator does; close it so the worker pool is shut down and reaped here
+        results.close()
+        if state is not None and not units:
+            out.flush()
+            state.checkpoint(os.fstat(out.fileno()).st_size)
+    seen.close()
+    if lsh is not None:
+        lsh.close()
+    if corpus is not None:
+        corpus.close()
+    if state is not None:
+        state.close()
+    if args.latest_per_thread:
+        total, kept = latest_per_thread(dst)
+
+    secs = max(time.perf_counter() - started, 1e-9)
+    mb = units_bytes(units) / 1e6
+    print(f"{'Appended' if append else 'Wrote'} {kept} rows to {dst}")
+    print(
+        f"[ingest] {parsed} messages in {secs:.1f}s "
+        f"({parsed / secs:.0f} msg/s, {mb / secs:.1f} MB/s, {reader.name}, jobs={args.jobs}); "
+        f"{dupes} duplicates dropped ({'checkpoint' if state else args.dedupe} dedupe)"
+    )
+    if lsh is not None:
+        print(f"[ingest] {near} near-duplicates dropped (threshold={args.near_threshold})")
+    if known:
+        print(f"[ingest] {known} messages already ingested (Message-ID)")
+    if args.latest_per_thread:
+        print(f"[ingest] kept the newest message of each of {kept} threads ({total - kept} earlier messages dropped)")
+    rss = peak_rss_mb()
+    if rss is not None:
+        # parsing runs in the workers with --jobs > 1; the pool has exited, so they are counted
+        workers = f", largest worker {peak_rss_mb(children=True):.0f} MB" if args.jobs > 1 else ""
+        print(f"[ingest] peak RSS {rss:.0f} MB (parent process){workers}")
 
 
 if __name__ == "__main__":
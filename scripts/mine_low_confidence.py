@@ -3,6 +3,7 @@ from __future__ import annotations
 
 import argparse
 import csv
+import sys
 from pathlib import Path
 from typing import List
 
@@ -10,6 +11,9 @@ import joblib
 import numpy as np
 
 ART = Path("model_artifacts")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.preprocess import authored_text  # noqa: E402
 
 
 def read_unlabeled(path: Path) -> List[dict]:
@@ -50,16 +54,29 @@ def main():
     ap.add_argument("--low", type=float, default=0.40)
     ap.add_argument("--high", type=float, default=0.65)
     ap.add_argument("--limit", type=int, default=500)
+    ap.add_argument("--db", help="corpus DB: score its unlabeled kept rows and store pred_intent/pred_conf")
     args = ap.parse_args()
 
     vec, clf, classes = load_artifacts()
-    rows = read_unlabeled(Path(args.unlabeled))
+    db = None
+    if args.db:
+        from corpus_db import CorpusDB
+
+        db = CorpusDB(args.db)
+        keys = ("hash", "to", "to_domain", "subject", "body", "intent")
+        rows = [{k: r[k] for k in keys} for r in db.rows("unlabeled")]
+    else:
+        rows = read_unlabeled(Path(args.unlabeled))
     if not rows:
-        print(f"[mine] No rows in {args.unlabeled}")
+        print(f"[mine] No rows in {args.db or args.unlabeled}")
         return
 
-    texts = [f"{r.get('subject', '')} {r.get('body', '')}".strip() for r in rows]
+    texts = [f"{r.get('subject', '')} {authored_text(r.get('body', ''))}".strip() for r in rows]
     proba = predict_proba(vec, clf, texts)
+    if db is not None:
+        top = np.argmax(proba, axis=1)
+        db.set_predictions((classes[i], float(p[i]), r["hash"]) for r, p, i in zip(rows, proba, top))
+        db.close()
 
     selected = []
     for row, probs in zip(rows, proba):
@@ -0,0 +1,239 @@
+# scripts/near_dupes.py
+"""
+Near-duplicate detection with MinHash + LSH.
+
+Bodies are normalized (lowercase, digits masked so PO numbers/dates don't
+matter), cut into word 5-gram shingles and summarized as a MinHash signature.
+Signatures are banded into an LSH index; a candidate from a shared band is
+accepted only if the signatures agree on >= threshold of their slots, so the
+cluster test is an estimate of Jaccard similarity, not just a bucket hit.
+
+Clusters are "leader" clusters: the first message seen starts a cluster and
+later ones join it. Only leaders are indexed, so memory grows with the number
+of distinct messages; pass a SQLite path (--db) to keep the index on disk.
+
+usage: python scripts/near_dupes.py data/emails.csv [--out data/emails.dedup.csv] [--drop]
+adds columns cluster_id (leader row number) and near_dup (1 for every non-leader row)
+"""
+import argparse
+import csv
+import hashlib
+import os
+import re
+import sqlite3
+import sys
+import time
+import zlib
+from multiprocessing import Pool
+
+import numpy as np
+
+NUM_PERM = 128
+SHINGLE_WORDS = 5
+THRESHOLD = 0.8
+
+_MERSENNE = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_WORD_RE = re.compile(r"\w+")
+_DIGIT_RE = re.compile(r"\d")
+
+csv.field_size_limit(sys.maxsize)
+
+
+def shingles(text, k=SHINGLE_WORDS):
+    words = _WORD_RE.findall(_DIGIT_RE.sub("0", (text or "").lower()))
+    if not words:
+        return []
+    if len(words) <= k:
+        return [" ".join(words)]
+    return [" ".join(words[i:i + k]) for i in range(len(words) - k + 1)]
+
+
+class MinHasher:
+    def __init__(self, num_perm=NUM_PERM, seed=1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self._a = rng.randint(1, _MERSENNE, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, _MERSENNE, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text):
+        """uint32[num_perm] MinHash of the text's shingles, or None if it has no words."""
+        sh = shingles(text)
+        if not sh:
+            return None
+        h = np.fromiter((zlib.crc32(s.encode("utf-8", "surrogatepass")) for s in sh), dtype=np.uint64, count=len(sh))
+        # uint64 wrap-around in a*h is intended (universal hashing mod 2^61-1)
+        perm = (np.outer(h, self._a) + self._b) % _MERSENNE & _MAX_HASH
+        return perm.min(axis=0).astype(np.uint32)
+
+
+def lsh_params(num_perm, threshold):
+    """(bands, rows): most rows per band whose LSH threshold (1/b)^(1/r) is still <= threshold."""
+    best = (num_perm, 1)
+    for r in range(1, num_perm + 1):
+        b = num_perm // r
+        if (1.0 / b) ** (1.0 / r) <= threshold:
+            best = (b, r)
+    return best
+
+
+class LSHIndex:
+    """Leader-cluster LSH index; in memory, or in SQLite (path, or a caller-owned conn)."""
+
+    def __init__(self, num_perm=NUM_PERM, threshold=THRESHOLD, path=None, conn=None):
+        self.num_perm = num_perm
+        self.threshold = threshold
+        self.bands, self.rows = lsh_params(num_perm, threshold)
+        self._own = conn is None and path is not None
+        self._conn = sqlite3.connect(path) if self._own else conn
+        if self._conn is not None:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS lsh_buckets"
+                " (band INTEGER, key INTEGER, cluster INTEGER, PRIMARY KEY (band, key)) WITHOUT ROWID"
+            )
+            self._conn.execute("CREATE TABLE IF NOT EXISTS lsh_leaders (cluster INTEGER PRIMARY KEY, sig BLOB)")
+            self._next = self._conn.execute("SELECT COALESCE(MAX(cluster) + 1, 0) FROM lsh_leaders").fetchone()[0]
+        else:
+            self._buckets = [dict() for _ in range(self.bands)]
+            self._leaders = {}
+            self._next = 0
+
+    def _band_keys(self, sig):
+        r = self.rows
+        return [
+            int.from_bytes(
+                hashlib.blake2b(sig[i * r:(i + 1) * r].tobytes(), digest_size=8).digest(), "little", signed=True
+            )
+            for i in range(self.bands)
+        ]
+
+    def _candidates(self, keys):
+        out = []
+        for band, key in enumerate(keys):
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT cluster FROM lsh_buckets WHERE band = ? AND key = ?", (band, key)
+                ).fetchone()
+                c = row[0] if row else None
+            else:
+                c = self._buckets[band].get(key)
+            if c is not None and c not in out:
+                out.append(c)
+        return out
+
+    def _leader_sig(self, cluster):
+        if self._conn is not None:
+            blob = self._conn.execute("SELECT sig FROM lsh_leaders WHERE cluster = ?", (cluster,)).fetchone()[0]
+            return np.frombuffer(blob, dtype=np.uint32)
+        return self._leaders[cluster]
+
+    def assign(self, sig, cluster=None):
+        """
+        Cluster for a signature: (cluster_id, True) if it near-duplicates an earlier
+        leader, else it becomes a leader itself -> (cluster or a fresh id, False).
+        """
+        keys = self._band_keys(sig)
+        for c in self._candidates(keys):
+            if np.count_nonzero(self._leader_sig(c) == sig) >= self.threshold * self.num_perm:
+                return c, True
+        if cluster is None:
+            cluster = self._next
+        self._next = max(self._next, cluster + 1)
+        if self._conn is not None:
+            self._conn.execute("INSERT INTO lsh_leaders (cluster, sig) VALUES (?, ?)", (cluster, sig.tobytes()))
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO lsh_buckets (band, key, cluster) VALUES (?, ?, ?)",
+                [(band, key, cluster) for band, key in enumerate(keys)],
+            )
+        else:
+            self._leaders[cluster] = sig
+            for band, key in enumerate(keys):
+                self._buckets[band].setdefault(key, cluster)
+        return cluster, False
+
+    def flush(self):
+        if self._own:
+            self._conn.commit()
+
+    def close(self):
+        if self._own:
+            self._conn.commit()
+            self._conn.close()
+
+
+# ------------------------------------------------------------
+# Standalone pass over a CSV
+# ------------------------------------------------------------
+
+_HASHER = None
+
+
+def row_signature(text):
+    """MinHasher().signature(text), with one hasher per process (workers call this too)."""
+    global _HASHER
+    if _HASHER is None:
+        _HASHER = MinHasher()
+    return _HASHER.signature(text)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Tag (or drop) near-duplicate rows with MinHash/LSH.")
+    ap.add_argument("src")
+    ap.add_argument("--out", help="output CSV (default: rewrite src)")
+    ap.add_argument("--threshold", type=float, default=THRESHOLD, help="estimated Jaccard to count as near-duplicate")
+    ap.add_argument("--db", help="keep the LSH index in this SQLite file instead of memory")
+    ap.add_argument("--drop", action="store_true", help="write only cluster leaders")
+    ap.add_argument("--jobs", type=int, default=1, help="processes computing signatures")
+    args = ap.parse_args(argv)
+
+    if args.db and os.path.exists(args.db):
+        os.remove(args.db)
+    index = LSHIndex(threshold=args.threshold, path=args.db)
+    out_path = args.out or args.src
+    tmp_path = out_path + ".tmp"
+    started = time.perf_counter()
+    n = dups = 0
+
+    with open(args.src, newline="") as f, open(tmp_path, "w", newline="") as out:
+        reader = csv.DictReader(f)
+        fields = [c for c in (reader.fieldnames or []) if c not in ("cluster_id", "near_dup")]
+        w = csv.DictWriter(out, fieldnames=fields + ["cluster_id", "near_dup"])
+        w.writeheader()
+
+        pool = Pool(args.jobs) if args.jobs > 1 else None
+        try:
+            while True:
+                batch = [r for _, r in zip(range(10_000), reader)]
+                if not batch:
+                    break
+                texts = [r.get("body") or r.get("subject") or "" for r in batch]
+                sigs = pool.map(row_signature, texts, chunksize=256) if pool else map(row_signature, texts)
+                for row, sig in zip(batch, sigs):
+                    row.pop("cluster_id", None)
+                    row.pop("near_dup", None)
+                    if sig is None:
+                        cluster, dup = n, False
+                    else:
+                        cluster, dup = index.assign(sig, cluster=n)
+                    n += 1
+                    dups += dup
+                    if dup and args.drop:
+                        continue
+                    w.writerow({**row, "cluster_id": cluster, "near_dup": int(dup)})
+                index.flush()
+        finally:
+            if pool:
+                pool.close()
+    index.close()
+    os.replace(tmp_path, out_path)
+
+    secs = max(time.perf_counter() - started, 1e-9)
+    print(
+        f"[near-dupes] {n} rows, {dups} near-duplicates ({dups / max(n, 1):.1%}) "
+        f"{'dropped' if args.drop else 'tagged'} -> {out_path} in {secs:.1f}s "
+        f"(bands={index.bands} x rows={index.rows}, threshold={args.threshold})"
+    )
+
+
+if __name__ == "__main__":
+    main()
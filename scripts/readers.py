@@ -0,0 +1,414 @@
+# scripts/readers.py
+"""
+Source readers for mbox_to_csv.py.
+
+Every reader splits its source into picklable work units and turns a unit into
+parsed items `(csv row, dedupe digest, Message-ID, ancestor Message-IDs)` (None
+for messages without usable text), so all formats share the same worker pool, dedupe, checkpoint
+and CSV writer.
+
+  mbox    mbox file                     byte ranges on 'From ' lines (mbox_scan)
+  emlx    Apple Mail .mbox folder       batches of *.emlx files
+  maildir Maildir / Maildir++ tree      batches of files in cur/ and new/
+  eml     directory tree of *.eml       batches of *.eml files
+  jsonl   JSON Lines export             byte ranges on line ends, one object per line
+
+Directory readers list files with os.scandir on a thread pool (one task per
+directory), then sort the relative paths so the output order is stable.
+Range readers resume from a byte offset, directory readers from a set of
+processed files.
+
+RFC 822 sources are parsed header-first by default (mime="lazy", see
+lazy_mime.py): attachments are never decoded and text parts are capped at
+part_cap bytes. mime="full" parses every part with the email package.
+"""
+import email
+import json
+import os
+import re
+import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from email import policy
+from email.utils import getaddresses
+
+from dedupe import digest
+from lazy_mime import PART_CAP, extract_text_lazy, parse_headers
+from mbox_scan import MboxScan, parse_message
+from threads import parent_ids
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.preprocess import clean_subject_body, canon_text  # noqa: E402
+
+ADDR_RE = re.compile(r"[^@<\s]+@[^>\s]+")
+
+# Work units handed to the pool: ~8 MB of a range source, or a batch of files.
+CHUNK_BYTES = 8 * 1024 * 1024
+FILE_BATCH = 256
+SCAN_THREADS = 8
+
+
+# ------------------------------------------------------------
+# Message -> row
+# ------------------------------------------------------------
+
+
+def primary_to_and_domain(hdr: str):
+    if not hdr:
+        return "", ""
+    addrs = [a[1] for a in getaddresses([hdr]) if a[1]]
+    if not addrs:
+        return "", ""
+    primary = addrs[0].lower().strip()
+    m = ADDR_RE.search(primary)
+    if not m:
+        return primary, ""
+    addr = m.group(0)
+    domain = addr.split("@", 1)[1]
+    return addr, domain
+
+
+def extract_text(msg):
+    if msg.is_multipart():
+        txt, html = "", ""
+        for part in msg.walk():
+            ct = (part.get_content_type() or "").lower()
+            if ct == "text/plain":
+                txt += (part.get_payload(decode=True) or b"").decode(errors="ignore")
+            elif ct == "text/html":
+                html += (part.get_payload(decode=True) or b"").decode(errors="ignore")
+        if txt:
+            return txt, False
+        if html:
+            return html, True
+        return "", False
+    else:
+        ct = (msg.get_content_type() or "").lower()
+        payload = (msg.get_payload(decode=True) or b"").decode(errors="ignore")
+        return payload, (ct == "text/html")
+
+
+def row_from_fields(to_hdr, subject, body, is_html=False, intent="", mid="", parents=()):
+    """
+    Clean one message's fields into (csv row, 128-bit dedupe digest, Message-ID,
+    ancestor Message-IDs root first), or None if empty.
+    """
+    to_addr, to_domain = primary_to_and_domain(to_hdr)
+    subj_clean, body_clean = clean_subject_body((subject or "").strip(), body, is_html)
+
+    if not (subj_clean or body_clean):
+        return None
+    row = [to_addr, to_domain, subj_clean, body_clean, intent]
+    return row, digest(canon_text(subj_clean, body_clean)), mid, parents
+
+
+def _headers_row(msg, body_raw, is_html):
+    mid = str(msg.get("message-id") or "").strip()
+    parents = parent_ids(msg.get("references"), msg.get("in-reply-to"))
+    return row_from_fields(msg.get("to"), msg.get("subject"), body_raw, is_html, mid=mid, parents=parents)
+
+
+def parse_row(msg):
+    return _headers_row(msg, *extract_text(msg))
+
+
+def parse_row_lazy(buf, start, end, policy=policy.compat32, part_cap=PART_CAP):
+    """parse_row() for the raw message in buf[start:end], without parsing non-text parts."""
+    msg, body = parse_headers(buf, start, end, policy)
+    return _headers_row(msg, *extract_text_lazy(buf, start, end, policy, part_cap or None, msg, body))
+
+
+def read_emlx(fp):
+    """Raw RFC 822 bytes of an .emlx (first line is the message byte count, a plist follows)."""
+    with open(fp, "rb") as fh:
+        first = fh.readline()
+        try:
+            return fh.read(int(first.strip()))
+        except ValueError:
+            return first + fh.read()
+
+
+def _read_bytes(fp):
+    with open(fp, "rb") as fh:
+        return fh.read()
+
+
+# ------------------------------------------------------------
+# Directory walking
+# ------------------------------------------------------------
+
+
+def _scandir(path):
+    dirs, files = [], []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    dirs.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    files.append(entry.path)
+    except OSError:
+        pass
+    return dirs, files
+
+
+def scan_files(root, accept, threads=SCAN_THREADS):
+    """Sorted paths (relative to root) of files under root for which accept(path) is true."""
+    found = []
+    with ThreadPoolExecutor(max_workers=threads) as ex:
+        pending = {ex.submit(_scandir, root)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                dirs, files = fut.result()
+                found.extend(f for f in files if accept(f))
+                pending |= {ex.submit(_scandir, d) for d in dirs}
+    return sorted(os.path.relpath(p, root) for p in found)
+
+
+# ------------------------------------------------------------
+# Readers
+# ------------------------------------------------------------
+
+READERS = {}
+
+
+def register(cls):
+    READERS[cls.name] = cls()
+    return cls
+
+
+class Reader:
+    name = ""
+    resume = "offset"  # "offset" (range units) or "files" (file-batch units)
+    separator = None   # bytes a resume offset must point at, if any
+
+    def detect(self, path):
+        return False
+
+    def units(self, path, start=0, done=frozenset()):
+        raise NotImplementedError
+
+    def parse(self, unit, mime="lazy", part_cap=PART_CAP):
+        """Items for a unit; `mime`/`part_cap` choose how RFC 822 messages are parsed (0: no cap)."""
+        raise NotImplementedError
+
+    def nbytes(self, unit):
+        return unit[3] - unit[2]
+
+    def messages(self, path):
+        """email.message.Message objects, for formats that have them."""
+        raise NotImplementedError(f"{self.name} sources have no RFC 822 messages")
+
+
+class FileReader(Reader):
+    resume = "files"
+
+    def accept(self, path):
+        raise NotImplementedError
+
+    def raw(self, path):
+        return _read_bytes(path)
+
+    def load(self, path):
+        return email.message_from_bytes(self.raw(path), policy=policy.default)
+
+    def files(self, path):
+        return scan_files(path, self.accept)
+
+    def units(self, path, start=0, done=frozenset()):
+        files = [rel for rel in self.files(path) if rel not in done]
+        return [(self.name, path, files[i:i + FILE_BATCH]) for i in range(0, len(files), FILE_BATCH)]
+
+    def parse(self, unit, mime="lazy", part_cap=PART_CAP):
+        _, root, files = unit
+        if mime == "full":
+            return [parse_row(self.load(os.path.join(root, rel))) for rel in files]
+        rows = []
+        for rel in files:
+            data = self.raw(os.path.join(root, rel))
+            rows.append(parse_row_lazy(data, 0, len(data), policy.default, part_cap))
+        return rows
+
+    def nbytes(self, unit):
+        return sum(os.path.getsize(os.path.join(unit[1], rel)) for rel in unit[2])
+
+    def messages(self, path):
+        for rel in self.files(path):
+            yield self.load(os.path.join(path, rel))
+
+
+@register
+class EmlxReader(FileReader):
+    name = "emlx"
+
+    def detect(self, path):
+        # Apple Mail: .mbox is a folder with Messages/*.emlx
+        return os.path.isdir(path) and path.endswith(".mbox")
+
+    def accept(self, path):
+        return path.endswith(".emlx")
+
+    def raw(self, path):
+        return read_emlx(path)
+
+
+@register
+class MaildirReader(FileReader):
+    name = "maildir"
+
+    def detect(self, path):
+        if not os.path.isdir(path):
+            return False
+        if os.path.isdir(os.path.join(path, "cur")) and os.path.isdir(os.path.join(path, "new")):
+            return True
+        # Maildir++: subfolders like .Sent/cur
+        with os.scandir(path) as it:
+            return any(
+                e.name.startswith(".") and e.is_dir() and os.path.isdir(os.path.join(e.path, "cur"))
+                for e in it
+            )
+
+    def accept(self, path):
+        parent = os.path.basename(os.path.dirname(path))
+        return parent in ("cur", "new") and not os.path.basename(path).startswith(".")
+
+
+@register
+class EmlReader(FileReader):
+    name = "eml"
+
+    def detect(self, path):
+        return os.path.isdir(path)
+
+    def accept(self, path):
+        return path.lower().endswith(".eml")
+
+
+@register
+class MboxReader(Reader):
+    name = "mbox"
+    separator = b"From "
+
+    def detect(self, path):
+        return os.path.isfile(path)
+
+    def units(self, path, start=0, done=frozenset()):
+        with MboxScan(path) as scan:
+            return [(self.name, path, s, e) for s, e in scan.ranges(CHUNK_BYTES, start)]
+
+    def parse(self, unit, mime="lazy", part_cap=PART_CAP):
+        _, path, start, end = unit
+        rows = []
+        with MboxScan(path) as scan:
+            if mime == "full":
+                for _, _, view in scan.messages(start, end):
+                    with view:
+                        msg = parse_message(view)  # compat32, like mailbox.mbox
+                    rows.append(parse_row(msg))
+            else:
+                buf = scan.buffer
+                for _, _, s, e in scan.spans(start, end):
+                    rows.append(parse_row_lazy(buf, s, e, policy.compat32, part_cap))
+        return rows
+
+    def messages(self, path):
+        with MboxScan(path) as scan:
+            for _, _, view in scan.messages():
+                with view:
+                    msg = parse_message(view)
+                yield msg
+
+
+def line_ranges(path, chunk_bytes=CHUNK_BYTES, start=0):
+    """[start, end) byte ranges of ~chunk_bytes that begin at a line start."""
+    size = os.path.getsize(path)
+    cuts = [start]
+    with open(path, "rb") as fh:
+        while cuts[-1] + chunk_bytes < size:
+            fh.seek(cuts[-1] + chunk_bytes)
+            fh.readline()
+            if fh.tell() >= size:
+                break
+            cuts.append(fh.tell())
+    cuts.append(size)
+    return [(s, e) for s, e in zip(cuts, cuts[1:]) if e > s]
+
+
+def _first(obj, *keys):
+    for k in keys:
+        v = obj.get(k)
+        if v:
+            return v
+    return ""
+
+
+@register
+class JsonlReader(Reader):
+    """
+    One JSON object per line. Recognized keys: to/recipient (string or list),
+    subject, body/text (plain) or html, intent/label, message_id/id,
+    references (string or list), in_reply_to.
+    """
+
+    name = "jsonl"
+
+    def detect(self, path):
+        return os.path.isfile(path) and path.lower().endswith((".jsonl", ".ndjson"))
+
+    def units(self, path, start=0, done=frozenset()):
+        return [(self.name, path, s, e) for s, e in line_ranges(path, CHUNK_BYTES, start)]
+
+    def parse(self, unit, mime="lazy", part_cap=PART_CAP):
+        _, path, start, end = unit
+        rows = []
+        decode = json.JSONDecoder().decode
+        with open(path, "rb") as fh:
+            fh.seek(start)
+            while fh.tell() < end:
+                line = fh.readline()
+                if not line:
+                    break
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    obj = decode(line.decode("utf-8", "replace"))
+                except ValueError:
+                    rows.append(None)
+                    continue
+                rows.append(self.row(obj) if isinstance(obj, dict) else None)
+        return rows
+
+    @staticmethod
+    def row(obj):
+        to = _first(obj, "to", "recipient")
+        if isinstance(to, list):
+            to = ", ".join(str(t) for t in to)
+        refs = obj.get("references")
+        body, is_html = _first(obj, "body", "text"), False
+        if not body and obj.get("html"):
+            body, is_html = obj["html"], True
+        return row_from_fields(
+            str(to),
+            str(obj.get("subject") or ""),
+            str(body),
+            is_html,
+            intent=str(_first(obj, "intent", "label")).strip(),
+            mid=str(_first(obj, "message_id", "id")),
+            parents=parent_ids(" ".join(map(str, refs)) if isinstance(refs, list) else refs, obj.get("in_reply_to")),
+        )
+
+
+# detection order: most specific first
+DETECT_ORDER = ("emlx", "maildir", "eml", "jsonl", "mbox")
+
+
+def detect_reader(path, fmt=None):
+    if fmt:
+        return READERS[fmt]
+    for name in DETECT_ORDER:
+        if READERS[name].detect(path):
+            return READERS[name]
+    raise ValueError(f"no reader for {path}")
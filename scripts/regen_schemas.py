@@ -12,6 +12,10 @@ from pydantic import ValidationError
 from intent_model import IntentSpec
 
 ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from app.schema_store import BLOB_PATH, INDEX_PATH, SAMPLES_PATH, write_indexed_schema  # noqa: E402
+from app.templating import ENV_OPTIONS, TEMPLATES_DIR  # noqa: E402
+
 REGISTRY_DIR = ROOT / "intents" / "registry"
 
 # Generated outputs (safe: does not overwrite runtime files)
@@ -159,6 +163,16 @@ def build_autodetect_table(intents: List[IntentSpec]) -> Dict[str, Dict]:
     return table
 
 
+def build_samples_table(intents: List[IntentSpec]) -> Dict[str, List[Dict]]:
+    """Sample field sets from each intent's tests.samples (rendered once at app warm-up)."""
+    table: Dict[str, List[Dict]] = {}
+    for spec in intents:
+        samples = [s.get("fields") for s in spec.tests.samples if isinstance(s.get("fields"), dict)]
+        if samples:
+            table[spec.id] = samples
+    return table
+
+
 def write_py_dict(path: Path, var_name: str, data: Dict):
     path.parent.mkdir(parents=True, exist_ok=True)
     content = (
@@ -177,6 +191,16 @@ def main() -> int:
     # Write generated artifacts (safe: new files only)
     write_py_dict(APP_SCHEMA_GEN, "SCHEMA_GENERATED", backend)
     write_py_dict(APP_AUTODETECT_GEN, "AUTODETECT_GENERATED", autodetect)
+    # Indexed artifact the app actually loads (mmapped blob + offsets + /intents cards)
+    schema_version = write_indexed_schema(backend)
+    SAMPLES_PATH.write_text(
+        json.dumps(build_samples_table(intents), indent=2, sort_keys=True) + "\n", encoding="utf-8"
+    )
+
+    # Precompile templates/ so the app imports them instead of parsing at runtime
+    from app.precompiled import COMPILED_DIR, compile_templates
+
+    n_compiled = compile_templates(TEMPLATES_DIR, ENV_OPTIONS)
 
     PUBLIC_DIR.mkdir(parents=True, exist_ok=True)
     PUBLIC_SCHEMA_JSON.write_text(
@@ -184,11 +208,15 @@ def main() -> int:
     )
 
     print(
-        f"[ok] intents={len(intents)} "
+        f"[ok] intents={len(intents)} version={schema_version} "
         f"→ {APP_SCHEMA_GEN.relative_to(ROOT)}, "
         f"{APP_AUTODETECT_GEN.relative_to(ROOT)}, "
+        f"{INDEX_PATH.relative_to(ROOT)}, "
+        f"{BLOB_PATH.relative_to(ROOT)}, "
+        f"{SAMPLES_PATH.relative_to(ROOT)}, "
         f"{PUBLIC_SCHEMA_JSON.relative_to(ROOT)}"
     )
+    print(f"[ok] templates={n_compiled} → {COMPILED_DIR.relative_to(ROOT)}/")
     return 0
 
 
@@ -9,19 +9,35 @@ def read_rows(path: Path):
         return list(csv.DictReader(f))
 
 
-def stratified_split(rows, label_key="intent", val_frac=0.2, seed=42):
+def stratified_split(rows, label_key="intent", val_frac=0.2, seed=42, group_key="cluster_id"):
+    """
+    Per-label random split. Rows sharing a `group_key` value (near-duplicate
+    clusters from scripts/near_dupes.py) stay on the same side, so near-copies
+    can't leak from train into val; rows without one are their own group.
+    """
     random.seed(seed)
-    by_label = defaultdict(list)
-    for r in rows:
+    groups = {}
+    for i, r in enumerate(rows):
         lab = (r.get(label_key) or "").strip()
         if lab:
-            by_label[lab].append(r)
+            # CorpusDB.rows() gives cluster ids as integers (0 is a real cluster), CSVs as strings
+            gid = r.get(group_key)
+            gid = ("" if gid is None else str(gid)).strip() or ("row", i)
+            groups.setdefault(gid, (lab, []))[1].append(r)
+    by_label = defaultdict(list)
+    for lab, items in groups.values():
+        by_label[lab].append(items)
     train, val = [], []
     for lab, items in by_label.items():
         random.shuffle(items)
-        k = max(1, int(len(items) * val_frac))
-        val.extend(items[:k])
-        train.extend(items[k:])
+        k = max(1, int(sum(len(g) for g in items) * val_frac))
+        n_val = 0
+        for g in items:
+            if n_val < k:
+                val.extend(g)
+                n_val += len(g)
+            else:
+                train.extend(g)
     return train, val
 
 
@@ -35,19 +51,29 @@ def write_csv(path: Path, rows):
         w.writerows(rows)
 
 
-def main():
+def main(argv=None):
     ap = argparse.ArgumentParser()
     ap.add_argument("--in", dest="inp", default="data/emails.labeled.csv")
     ap.add_argument("--train", default="data/emails.labeled.train.csv")
     ap.add_argument("--val", default="data/emails.labeled.val.csv")
     ap.add_argument("--val_frac", type=float, default=0.2)
     ap.add_argument("--seed", type=int, default=42)
-    args = ap.parse_args()
+    ap.add_argument("--db", help="corpus DB: split its labeled rows and store the split column instead of writing CSVs")
+    args = ap.parse_args(argv)
+
+    if args.db:
+        from corpus_db import CorpusDB
 
-    rows = read_rows(Path(args.inp))
-    train, val = stratified_split(rows, val_frac=args.val_frac, seed=args.seed)
-    write_csv(Path(args.train), train)
-    write_csv(Path(args.val), val)
+        db = CorpusDB(args.db)
+        train, val = stratified_split(db.rows("labeled"), val_frac=args.val_frac, seed=args.seed)
+        db.clear_column("split")
+        db.set_column("split", [("train", r["hash"]) for r in train] + [("val", r["hash"]) for r in val])
+        db.close()
+    else:
+        rows = read_rows(Path(args.inp))
+        train, val = stratified_split(rows, val_frac=args.val_frac, seed=args.seed)
+        write_csv(Path(args.train), train)
+        write_csv(Path(args.val), val)
     print(f"[split] train={len(train)}  val={len(val)}  (val_frac={args.val_frac})")
 
 
@@ -0,0 +1,158 @@
+# scripts/threads.py
+"""
+Thread reconstruction from Message-ID / In-Reply-To / References.
+
+During ingest (mbox_to_csv.py --threads) every message is placed in a thread:
+  thread_id   hash of the thread root: the first References entry (or the
+              In-Reply-To target), else the message's own Message-ID
+  thread_pos  depth in the thread: parent's position + 1 if the parent was
+              seen, else the number of ancestors the headers list (root = 0)
+
+Messages are indexed by a 64-bit hash of their Message-ID, in memory or in a
+SQLite table (the --resume checkpoint), so replies ingested in a later run
+still join their thread.
+
+`latest_per_thread` keeps only the newest authored message of each thread
+(deepest position; the later row on ties): replies already quote what came
+before, so earlier messages mostly repeat content downstream stages re-read.
+
+usage: python scripts/threads.py data/emails.csv [--out data/emails.latest.csv]
+keeps the newest row per thread of a CSV written with --threads
+"""
+import argparse
+import csv
+import hashlib
+import os
+import re
+import sqlite3
+import sys
+
+THREAD_COLUMNS = ["thread_id", "thread_pos"]
+
+_MSG_ID_RE = re.compile(r"<[^<>\s]+>")
+
+csv.field_size_limit(sys.maxsize)
+
+
+def message_ids(value):
+    """Message-IDs in a References / In-Reply-To value, in order ("<a@b>" form)."""
+    if not value:
+        return []
+    value = str(value)
+    found = _MSG_ID_RE.findall(value)
+    if found:
+        return found
+    return [f"<{v}>" for v in value.split()]
+
+
+def parent_ids(references, in_reply_to):
+    """Ancestors of a message, root first: References, then In-Reply-To if References lacks it."""
+    refs = message_ids(references)
+    irt = message_ids(in_reply_to)[:1]
+    return tuple(refs + [i for i in irt if i not in refs])
+
+
+def id_key(mid):
+    """Signed 64-bit hash of a Message-ID (angle brackets and whitespace ignored)."""
+    norm = mid.strip().strip("<>").strip().encode("utf-8", "surrogateescape")
+    return int.from_bytes(hashlib.blake2b(norm, digest_size=8).digest(), "little", signed=True)
+
+
+def thread_hex(key):
+    return f"{key & 0xFFFFFFFFFFFFFFFF:016x}"
+
+
+class ThreadIndex:
+    """Message-ID hash -> (thread, position); in memory, or in SQLite (path, or a caller-owned conn)."""
+
+    def __init__(self, path=None, conn=None):
+        self._own = conn is None and path is not None
+        self._conn = sqlite3.connect(path) if self._own else conn
+        if self._conn is not None:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS threads (mid INTEGER PRIMARY KEY, thread INTEGER, pos INTEGER)"
+            )
+        else:
+            self._map = {}
+
+    def _get(self, key):
+        if self._conn is not None:
+            return self._conn.execute("SELECT thread, pos FROM threads WHERE mid = ?", (key,)).fetchone()
+        return self._map.get(key)
+
+    def _put(self, key, thread, pos):
+        if self._conn is not None:
+            self._conn.execute("INSERT OR REPLACE INTO threads (mid, thread, pos) VALUES (?, ?, ?)", (key, thread, pos))
+        else:
+            self._map[key] = (thread, pos)
+
+    def assign(self, mid, parents=(), fallback=None):
+        """
+        (thread_id hex, position) for a message. `parents` is root-first (see
+        parent_ids); `fallback` keys messages with no Message-ID and no parents.
+        """
+        key = id_key(mid) if mid else None
+        thread = None
+        pos = len(parents)
+        if parents:
+            hit = self._get(id_key(parents[-1]))
+            if hit is not None:
+                thread, pos = hit[0], hit[1] + 1
+            else:
+                hit = self._get(id_key(parents[0]))
+                thread = hit[0] if hit is not None else id_key(parents[0])
+        elif key is not None:
+            thread = key
+        else:
+            thread = fallback if fallback is not None else 0
+        if key is not None:
+            self._put(key, thread, pos)
+        return thread_hex(thread), pos
+
+    def flush(self):
+        if self._own:
+            self._conn.commit()
+
+    def close(self):
+        if self._own:
+            self._conn.commit()
+            self._conn.close()
+
+
+def latest_per_thread(src, dst=None):
+    """Keep the newest row of each thread in a CSV with thread columns; returns (rows, kept)."""
+    best = {}
+    with open(src, newline="") as f:
+        for n, row in enumerate(csv.DictReader(f)):
+            tid = row.get("thread_id") or f"row{n}"
+            pos = int(row.get("thread_pos") or 0)
+            if tid not in best or pos >= best[tid][0]:
+                best[tid] = (pos, n)
+    keep = {n for _, n in best.values()}
+
+    dst = dst or src
+    tmp = dst + ".tmp"
+    with open(src, newline="") as f, open(tmp, "w", newline="") as out:
+        reader = csv.reader(f)
+        w = csv.writer(out)
+        w.writerow(next(reader, []))
+        total = 0
+        for n, row in enumerate(reader):
+            total += 1
+            if n in keep:
+                w.writerow(row)
+    os.replace(tmp, dst)
+    return total, len(keep)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Keep only the newest message of each thread.")
+    ap.add_argument("src", help="CSV written by mbox_to_csv.py --threads")
+    ap.add_argument("--out", help="output CSV (default: rewrite src)")
+    args = ap.parse_args(argv)
+    total, kept = latest_per_thread(args.src, args.out)
+    print(f"[threads] {total} rows in {kept} threads; kept the newest of each -> {args.out or args.src}")
+
+
+if __name__ == "__main__":
+    main()
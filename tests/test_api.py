@@ -114,3 +114,275 @@ def test_generate_polite_for_all_intents():
 
         # Check tone (greeting + thanks) for all intents.
         _assert_polite(body)
+
+
+# --------------------------
+# Indexed schema artifact
+# --------------------------
+def test_indexed_schema_matches_generated_module():
+    from app.schema_generated import SCHEMA_GENERATED
+    from app.schema_store import LazySchema, build_cards
+
+    lazy = LazySchema()
+    assert list(lazy) == sorted(SCHEMA_GENERATED)
+    assert dict(lazy) == SCHEMA_GENERATED
+    assert lazy.cards == build_cards(SCHEMA_GENERATED)
+
+    assert client.get("/schema").json() == SCHEMA_GENERATED
+    assert client.get("/intents").json() == lazy.cards
+
+
+# --------------------------
+# Industries + filtered intents
+# --------------------------
+def test_industries_counts_cover_registry():
+    schema = client.get("/schema").json()
+    r = client.get("/industries")
+    assert r.status_code == 200
+    rows = r.json()
+    assert sum(x["count"] for x in rows) == len(schema)
+    for x in rows:
+        ids = [c["id"] for c in client.get("/intents", params={"industry": x["industry"]}).json()]
+        assert len(ids) == x["count"]
+        assert all(schema[i]["industry"] == x["industry"] for i in ids)
+
+
+def test_intents_cursor_pagination_walks_everything_once():
+    full = [c["id"] for c in client.get("/intents").json()]
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3}
+        if cursor is not None:
+            params["cursor"] = cursor
+        r = client.get("/intents", params=params)
+        assert r.status_code == 200
+        seen.extend(c["id"] for c in r.json())
+        cursor = r.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert seen == full
+
+
+def test_intents_prefix_query_matches_label_or_id():
+    cards = client.get("/intents").json()
+    r = client.get("/intents", params={"q": "ORDER"})
+    assert r.status_code == 200
+    got = sorted(c["id"] for c in r.json())
+    want = sorted(
+        c["id"] for c in cards
+        if c["label"].lower().startswith("order") or c["id"].startswith("order")
+    )
+    assert got == want and got
+    assert client.get("/intents", params={"industry": "No Such Industry"}).json() == []
+
+
+# --------------------------
+# Server-side user templates
+# --------------------------
+def test_user_template_crud_and_generate_by_id(tmp_path, monkeypatch):
+    import app.user_templates as ut
+
+    monkeypatch.setattr(ut, "_STORE", ut.UserTemplateStore(tmp_path / "user_templates.db"))
+
+    r = client.post("/user_templates", json={
+        "label": "My Quote",
+        "subject": "Quote for {{ partNumber }}",
+        "body": "Hello {{ customerName }},\n\nPlease quote {{ partNumber }}.",
+        "fields": [
+            {"name": "customerName", "required": True},
+            {"name": "partNumber", "required": True},
+        ],
+    })
+    assert r.status_code == 201
+    rec = r.json()
+    tid = rec["id"]
+    assert tid == "u:my_quote" and rec["version"] == 1
+    assert [x["id"] for x in client.get("/user_templates").json()] == [tid]
+
+    gen = client.post("/generate", json={
+        "intent": tid,
+        "templateId": tid,
+        "fields": {"customerName": "Jane", "partNumber": "PN-1"},
+    })
+    assert gen.status_code == 200
+    out = gen.json()
+    assert out["subject"] == "Quote for PN-1"
+    assert "Please quote PN-1." in out["body"] and out["missing"] == []
+
+    upd = client.put(f"/user_templates/{tid}", json={"subject": "RFQ {{ partNumber }}", "version": 1})
+    assert upd.status_code == 200 and upd.json()["version"] == 2
+    assert client.put(f"/user_templates/{tid}", json={"body": "x", "version": 1}).status_code == 409
+
+    gen = client.post("/generate", json={"intent": tid, "templateId": tid, "fields": {"partNumber": "PN-2"}})
+    assert gen.json()["subject"] == "RFQ PN-2"
+    assert gen.json()["missing"] == ["customerName"]
+    stale = client.post("/generate", json={"intent": tid, "templateId": tid, "templateVersion": 1})
+    assert stale.status_code == 409
+
+    assert client.delete(f"/user_templates/{tid}").status_code == 200
+    assert client.get(f"/user_templates/{tid}").status_code == 404
+
+
+def test_user_template_syntax_errors(tmp_path, monkeypatch):
+    import app.user_templates as ut
+
+    store = ut.UserTemplateStore(tmp_path / "user_templates.db")
+    monkeypatch.setattr(ut, "_STORE", store)
+
+    bad = client.post("/user_templates", json={"label": "Bad", "body": "Hi {{ name "})
+    assert bad.status_code == 400 and "syntax" in bad.json()["detail"].lower()
+    assert client.get("/user_templates").json() == []
+
+    tid = client.post("/user_templates", json={"label": "Ok", "body": "Hi {{ name }}"}).json()["id"]
+    bad = client.put(f"/user_templates/{tid}", json={"subject": "{% if x %}open", "version": 1})
+    assert bad.status_code == 400
+    assert client.get(f"/user_templates/{tid}").json()["version"] == 1
+
+    # a broken template stored before validation existed: structured error, not a bare 500
+    store._conn.execute("UPDATE user_templates SET body = ?, version = 2 WHERE id = ?", ("{{ oops", tid))
+    store._conn.commit()
+    gen = client.post("/generate", json={"intent": tid, "templateId": tid, "fields": {}})
+    assert gen.status_code == 500 and gen.json()["detail"].startswith(f"Template render error for '{tid}'")
+
+
+# --------------------------
+# Schema versioning / delta sync
+# --------------------------
+def test_schema_delta_since_current_version_is_empty():
+    r = client.get("/schema")
+    version = int(r.headers["X-Schema-Version"])
+    delta = client.get("/schema", params={"since": version}).json()
+    assert delta["version"] == version and not delta["full"]
+    assert delta["added"] == {} and delta["changed"] == {} and delta["removed"] == []
+
+    full = client.get("/schema", params={"since": 0}).json()
+    assert full["full"] and full["added"] == r.json()
+
+
+def test_regen_bumps_version_and_tracks_changes(tmp_path):
+    from app.schema_store import LazySchema, write_indexed_schema
+
+    idx, blob = tmp_path / "s.idx.json", tmp_path / "s.blob"
+    base = {"a": {"label": "A"}, "b": {"label": "B"}, "c": {"label": "C"}}
+    assert write_indexed_schema(base, idx, blob) == 1
+    assert write_indexed_schema(base, idx, blob) == 1  # no content change, no bump
+
+    nxt = {"a": {"label": "A"}, "b": {"label": "B2"}, "d": {"label": "D"}}
+    assert write_indexed_schema(nxt, idx, blob) == 2
+
+    delta = LazySchema(idx, blob).delta(1)
+    assert delta["added"] == {"d": {"label": "D"}}
+    assert delta["changed"] == {"b": {"label": "B2"}}
+    assert delta["removed"] == ["c"]
+    assert set(delta["hashes"]) == {"b", "d"}
+
+
+def test_rewrite_does_not_disturb_open_lazy_schema(tmp_path):
+    from app.schema_store import LazySchema, write_indexed_schema
+
+    idx, blob = tmp_path / "s.idx.json", tmp_path / "s.blob"
+    write_indexed_schema({iid: {"label": iid * 40} for iid in "abcdef"}, idx, blob)
+    old = LazySchema(idx, blob)
+
+    # shorter, different content at the same offsets
+    write_indexed_schema({"a": {"label": "é"}, "z": {"label": "Z"}}, idx, blob)
+    assert {iid: old[iid] for iid in old} == {iid: {"label": iid * 40} for iid in "abcdef"}
+    assert dict(LazySchema(idx, blob)) == {"a": {"label": "é"}, "z": {"label": "Z"}}
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["s.blob", "s.idx.json"]
+
+
+# --------------------------
+# Immutable intent metadata snapshots
+# --------------------------
+def test_intent_meta_is_frozen_and_reload_swaps_snapshot():
+    import dataclasses
+    import app.main as main
+
+    snap = main._snapshot()
+    meta = snap.meta("order_request")
+    assert isinstance(meta.required, tuple) and isinstance(meta.fields, frozenset)
+    assert meta.template.name == "order_request.j2"
+    assert not hasattr(meta, "__dict__")
+    try:
+        meta.label = "changed"
+    except dataclasses.FrozenInstanceError:
+        pass
+    else:
+        raise AssertionError("IntentMeta should be immutable")
+
+    fresh = main.reload_schema()
+    assert fresh is not snap and main._snapshot() is fresh
+    assert snap.meta("order_request") is meta  # old snapshot stays intact for in-flight requests
+    assert fresh.meta("order_request").required == meta.required
+
+
+# --------------------------
+# Bootstrap bundle
+# --------------------------
+def test_bootstrap_bundles_startup_data_and_revalidates():
+    r = client.get("/bootstrap")
+    assert r.status_code == 200
+    boot = r.json()
+    assert boot["schema"] == client.get("/schema").json()
+    assert boot["intents"] == client.get("/intents").json()
+    assert boot["industries"] == client.get("/industries").json()
+    assert boot["capabilities"]["schemaVersion"] == int(client.get("/schema").headers["X-Schema-Version"])
+
+    etag = r.headers["ETag"]
+    again = client.get("/bootstrap", headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.content == b""
+
+    # A client with a cached schema skips it and syncs through /schema?since=<schemaVersion>
+    lite = client.get("/bootstrap", params={"schema": "false"})
+    assert lite.status_code == 200 and "schema" not in lite.json()
+    assert lite.json() == {k: v for k, v in boot.items() if k != "schema"}
+    assert lite.headers["ETag"] != etag
+    delta = client.get("/schema", params={"since": boot["capabilities"]["schemaVersion"]}).json()
+    assert not delta["full"] and not delta["added"] and not delta["changed"] and not delta["removed"]
+
+
+# --------------------------
+# Warm-up / readiness
+# --------------------------
+def test_ready_after_warmup_renders_samples():
+    import app.main as main
+
+    state = main.warmup()
+    assert state["ready"] and not state["errors"], state["errors"]
+    assert state["templates"] > 0 and state["samples"] > 0
+
+    r = client.get("/ready")
+    assert r.status_code == 200 and r.json()["ready"] is True
+
+
+# --------------------------
+# Precompiled templates
+# --------------------------
+def test_precompiled_templates_match_source_and_fall_back_when_stale():
+    from jinja2 import Environment, FileSystemLoader
+
+    from app.precompiled import COMPILED_DIR, PrecompiledLoader, load_manifest
+    from app.schema_store import load_samples
+    from app.templating import ENV_OPTIONS, TEMPLATES_DIR
+
+    manifest = load_manifest()
+    assert manifest, "run `make regen` to precompile templates/"
+    source_env = Environment(loader=FileSystemLoader(str(TEMPLATES_DIR)), **ENV_OPTIONS)
+    aot_env = Environment(
+        loader=PrecompiledLoader(FileSystemLoader(str(TEMPLATES_DIR)), COMPILED_DIR, manifest),
+        **ENV_OPTIONS,
+    )
+    samples = load_samples()
+    for name in manifest:
+        fields = (samples.get(name[:-3]) or [{}])[0]
+        tpl = aot_env.get_template(name)
+        assert tpl.filename.endswith(".py"), f"{name} was not loaded from its compiled module"
+        assert tpl.render(**fields) == source_env.get_template(name).render(**fields)
+
+    stale = {name: "0" * 40 for name in manifest}
+    stale_env = Environment(
+        loader=PrecompiledLoader(FileSystemLoader(str(TEMPLATES_DIR)), COMPILED_DIR, stale),
+        **ENV_OPTIONS,
+    )
+    name = next(iter(manifest))
+    assert stale_env.get_template(name).filename.endswith(".j2")
@@ -0,0 +1,52 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Modules that must only load on first use, never at `import app.main`.
+LAZY_MODULES = ("jinja2", "sklearn", "joblib", "numpy", "pandas", "model")
+
+# Cumulative import time budget for app.main (override on slow runners).
+IMPORT_BUDGET_MS = float(os.environ.get("SMART_MAIL_IMPORT_BUDGET_MS", "1500"))
+
+
+def _importtime(module: str):
+    """Run `python -X importtime -c 'import <module>'` in a fresh interpreter."""
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        try:
+            rows[name.strip()] = int(cumulative.strip())
+        except ValueError:  # header row
+            continue
+    return rows
+
+
+def test_import_app_main_skips_heavy_modules():
+    rows = _importtime("app.main")
+    eager = sorted(
+        name for name in rows if name.split(".", 1)[0] in LAZY_MODULES
+    )
+    assert not eager, f"Imported eagerly by app.main: {', '.join(eager)}"
+
+
+def test_import_app_main_within_budget():
+    rows = _importtime("app.main")
+    assert "app.main" in rows
+    took_ms = rows["app.main"] / 1000.0
+    assert took_ms <= IMPORT_BUDGET_MS, (
+        f"import app.main took {took_ms:.0f} ms (budget {IMPORT_BUDGET_MS:.0f} ms)"
+    )
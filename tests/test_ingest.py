@@ -0,0 +1,634 @@
+import csv
+import email
+import mailbox
+import os
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "scripts"))
+
+import mbox_to_csv  # noqa: E402
+import readers  # noqa: E402
+from mbox_scan import MboxScan, iter_mbox  # noqa: E402
+
+
+def _write_mbox(path: Path, n: int = 40, first: int = 0) -> None:
+    parts = []
+    for i in range(first, n):
+        k = i % 25  # messages 25.. repeat earlier ones (duplicates)
+        parts.append(
+            f"From sender{k}@example.com Mon Jan  1 00:00:00 2024\n"
+            f"To: Buyer {k} <buyer{k}@shop{k % 3}.example>\n"
+            f"Message-ID: <{i}@example.com>\n"
+            f"Subject: Order {k}\n"
+            "Content-Type: text/plain; charset=utf-8\n"
+            "\n"
+            f"Please ship {k} units of part P-{k}.\n"
+            ">From the warehouse, thanks.\n"
+            "\n"
+        )
+    path.write_text("".join(parts))
+
+
+def _rows(path: Path):
+    with open(path, newline="") as fh:
+        return list(csv.reader(fh))
+
+
+def test_mbox_ranges_start_on_separators(tmp_path):
+    src = tmp_path / "inbox.mbox"
+    _write_mbox(src)
+    data = src.read_bytes()
+    with MboxScan(str(src)) as scan:
+        ranges = scan.ranges(300)
+    assert len(ranges) > 1
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(data)
+    for (s, e), (s2, _) in zip(ranges, ranges[1:]):
+        assert e == s2
+        assert data[s2:s2 + 5] == b"From "
+
+
+def test_parallel_ingest_matches_sequential(tmp_path, monkeypatch, capsys):
+    src = tmp_path / "inbox.mbox"
+    _write_mbox(src)
+    monkeypatch.setattr(readers, "CHUNK_BYTES", 300)
+
+    seq, par = tmp_path / "seq.csv", tmp_path / "par.csv"
+    mbox_to_csv.main([str(src), str(seq), "--jobs", "1"])
+    mbox_to_csv.main([str(src), str(par), "--jobs", "2"])
+    assert "(parent process), largest worker" in capsys.readouterr().out
+
+    rows = _rows(seq)
+    assert rows == _rows(par)
+    assert rows[0] == ["to", "to_domain", "subject", "body", "intent"]
+    assert len(rows) == 1 + 25
+    assert rows[1][:2] == ["buyer0@shop0.example", "shop0.example"]
+    assert [r[2] for r in rows[1:4]] == ["Order 0", "Order 1", "Order 2"]
+
+    # same messages as the mailbox-module reader, in the same order
+    legacy = [mbox_to_csv.parse_row(m) for m in mailbox.mbox(str(src))]
+    assert [item[0] for item in legacy[:25]] == rows[1:]
+
+
+def test_mbox_scan_matches_mailbox_module(tmp_path):
+    src = tmp_path / "inbox.mbox"
+    src.write_bytes(
+        b"From a@x Mon Jan  1 00:00:00 2024\r\nSubject: one\r\n\r\nfirst\r\n\r\n"
+        b"From b@x Mon Jan  1 00:00:00 2024\nSubject: two\n\nsecond\nFromage is not a separator\n"
+        b"From c@x Mon Jan  1 00:00:00 2024\nSubject: three\n\nno trailing newline"
+    )
+    ours = list(iter_mbox(str(src)))
+    theirs = list(mailbox.mbox(str(src)))
+    assert [m["subject"] for m in ours] == ["one", "two", "three"]
+    assert [m.get_payload().strip() for m in ours] == [m.get_payload().strip() for m in theirs]
+
+    with MboxScan(str(src)) as scan:
+        offsets = [(s, e) for s, e, view in scan.messages()]
+    assert offsets[0][0] == 0 and offsets[-1][1] == src.stat().st_size
+    assert all(e == s2 for (_, e), (s2, _) in zip(offsets, offsets[1:]))
+
+
+@pytest.mark.parametrize("mode", ["disk", "bloom"])
+def test_dedupe_modes_match_memory(tmp_path, mode, capsys):
+    src = tmp_path / "inbox.mbox"
+    _write_mbox(src)
+    mem, other = tmp_path / "mem.csv", tmp_path / f"{mode}.csv"
+    mbox_to_csv.main([str(src), str(mem), "--jobs", "1"])
+    mbox_to_csv.main([str(src), str(other), "--jobs", "1", "--dedupe", mode, "--bloom-capacity", "1000"])
+    assert _rows(mem) == _rows(other)
+    out = capsys.readouterr().out
+    assert "15 duplicates dropped" in out and "peak RSS" in out
+
+
+def test_resume_appends_only_new_messages(tmp_path, capsys):
+    src, dst = tmp_path / "inbox.mbox", tmp_path / "out.csv"
+    _write_mbox(src, n=20)
+    mbox_to_csv.main([str(src), str(dst), "--jobs", "1", "--resume"])
+    assert len(_rows(dst)) == 1 + 20
+
+    # mailbox grows; a crash left a half-written row after the last checkpoint
+    with open(src, "a") as fh:
+        full = tmp_path / "full.mbox"
+        _write_mbox(full, n=40)
+        fh.write(full.read_text()[len(src.read_text()):])
+    with open(dst, "a") as fh:
+        fh.write('partial@row.example,"unterminated')
+    capsys.readouterr()
+
+    mbox_to_csv.main([str(src), str(dst), "--jobs", "1", "--resume"])
+    out = capsys.readouterr().out
+    assert "Appended 5 rows" in out and "20 messages in" in out
+
+    fresh = tmp_path / "fresh.csv"
+    mbox_to_csv.main([str(src), str(fresh), "--jobs", "1"])
+    assert _rows(dst) == _rows(fresh)
+
+    # nothing new: no rows appended, file unchanged
+    before = dst.read_bytes()
+    mbox_to_csv.main([str(src), str(dst), "--jobs", "1", "--resume"])
+    assert dst.read_bytes() == before
+
+
+def test_resume_after_mailbox_rewrite_skips_known_message_ids(tmp_path, capsys):
+    src, dst = tmp_path / "inbox.mbox", tmp_path / "out.csv"
+    _write_mbox(src, n=10)
+    mbox_to_csv.main([str(src), str(dst), "--jobs", "1", "--resume"])
+
+    # compaction: first messages removed, a new one added -> offsets no longer valid
+    _write_mbox(src, n=11, first=5)
+    capsys.readouterr()
+    mbox_to_csv.main([str(src), str(dst), "--jobs", "1", "--resume"])
+    out = capsys.readouterr().out
+    assert "rescanning" in out and "Appended 1 rows" in out
+    assert len(_rows(dst)) == 1 + 11
+
+
+def test_emlx_folder_resume(tmp_path):
+    src = tmp_path / "Inbox.mbox"
+    (src / "Messages").mkdir(parents=True)
+
+    def add(i):
+        raw = f"To: a{i}@x.example\nSubject: Hello {i}\nMessage-ID: <{i}@x>\n\nBody {i}\n".encode()
+        plist = b"<?xml version=\"1.0\"?><plist><dict/></plist>"
+        (src / "Messages" / f"{i}.emlx").write_bytes(str(len(raw)).encode() + b"\n" + raw + plist)
+
+    for i in range(3):
+        add(i)
+    dst = tmp_path / "out.csv"
+    mbox_to_csv.main([str(src), str(dst), "--jobs", "1", "--resume"])
+    add(3)
+    mbox_to_csv.main([str(src), str(dst), "--jobs", "1", "--resume"])
+    rows = _rows(dst)
+    assert [r[2] for r in rows[1:]] == ["Hello 0", "Hello 1", "Hello 2", "Hello 3"]
+    assert rows[1][:2] == ["a0@x.example", "x.example"]
+    assert rows[1][3] == "Body 0"
+
+
+def test_near_dupes_clusters_edited_copies(tmp_path):
+    import near_dupes
+
+    base = (
+        "Please ship the parts on purchase order {po} to our Asheville hangar by Friday, "
+        "thanks for the quick turnaround"
+    )
+    src = tmp_path / "emails.csv"
+    with open(src, "w", newline="") as fh:
+        w = csv.writer(fh)
+        w.writerow(["to", "to_domain", "subject", "body", "intent"])
+        w.writerow(["a@x.example", "x.example", "PO 1", base.format(po="MSPO25-02752"), "order_request"])
+        w.writerow(["a@x.example", "x.example", "PO 2", base.format(po="MSPO25-09911"), "order_request"])
+        w.writerow(
+            ["b@y.example", "y.example", "Invoice", "The invoice attached has the wrong billing address", "billing"]
+        )
+        w.writerow(["a@x.example", "x.example", "PO 3", base.format(po="MSPO25-06521") + " again", "order_request"])
+
+    near_dupes.main([str(src), "--out", str(tmp_path / "tagged.csv")])
+    rows = list(csv.DictReader(open(tmp_path / "tagged.csv", newline="")))
+    assert [r["cluster_id"] for r in rows] == ["0", "0", "2", "0"]
+    assert [r["near_dup"] for r in rows] == ["0", "1", "0", "1"]
+
+    near_dupes.main([str(src), "--out", str(tmp_path / "dropped.csv"), "--drop", "--db", str(tmp_path / "lsh.db")])
+    assert [r["subject"] for r in csv.DictReader(open(tmp_path / "dropped.csv", newline=""))] == ["PO 1", "Invoice"]
+
+    mbox = tmp_path / "inbox.mbox"
+    _write_mbox(mbox)
+    mem, disk = tmp_path / "mem.csv", tmp_path / "disk.csv"
+    mbox_to_csv.main([str(mbox), str(mem), "--jobs", "1", "--near-dupes"])
+    for _ in range(2):  # a rerun starts from a fresh index
+        mbox_to_csv.main([str(mbox), str(disk), "--jobs", "2", "--near-dupes", "--near-db", str(tmp_path / "near.db")])
+        assert _rows(disk) == _rows(mem)
+    with sqlite3.connect(tmp_path / "near.db") as conn:
+        assert conn.execute("SELECT COUNT(*) FROM lsh_leaders").fetchone()[0] == len(_rows(mem)) - 1
+
+    import split_train_val
+
+    train, val = split_train_val.stratified_split(rows, val_frac=0.5)
+    clusters = lambda part: {r["cluster_id"] for r in part}  # noqa: E731
+    assert not clusters(train) & clusters(val)
+
+
+def test_corpus_db_stages_update_in_place(tmp_path, monkeypatch, capsys):
+    import corpus_db
+    import filter_csv
+    import split_train_val
+
+    src = ROOT / "data" / "emails.csv"
+    db_path = str(tmp_path / "corpus.db")
+    db = corpus_db.CorpusDB(db_path)
+    n = db.import_csv(str(src))
+    assert n == len(_rows(src)) - 1
+    db.import_csv(str(src))  # idempotent: keyed by content hash
+    assert db.stats()["raw"] == n
+    db.close()
+
+    # filter: same decisions as the CSV path, stored as a column
+    monkeypatch.setattr(filter_csv, "RAW", str(src))
+    monkeypatch.setattr(filter_csv, "OUT", str(tmp_path / "filtered.csv"))
+    filter_csv.main([])
+    filter_csv.main(["--db", db_path])
+    db = corpus_db.CorpusDB(db_path)
+    filtered = _rows(tmp_path / "filtered.csv")
+    assert db.stats()["filtered"] == len(filtered) - 1
+
+    # labels arrive from a labeled CSV; split writes the split column
+    labeled = tmp_path / "labeled.csv"
+    with open(labeled, "w", newline="") as fh:
+        w = csv.writer(fh)
+        w.writerow(filtered[0])
+        for i, r in enumerate(filtered[1:41]):
+            w.writerow(r[:4] + [("order_request", "billing")[i % 2]])
+    db.import_csv(str(labeled))
+    assert db.stats()["labeled"] == 40
+    db.close()
+    split_train_val.main(["--db", db_path, "--val_frac", "0.25"])
+
+    db = corpus_db.CorpusDB(db_path)
+    stats = db.stats()
+    assert (stats["train"], stats["val"]) == (30, 10)
+    out = tmp_path / "train.csv"
+    assert db.export_csv(str(out), "train") == 30
+    assert _rows(out)[0] == list(corpus_db.COLUMNS)
+    if db.fts:
+        word = _rows(out)[1][2].split()[0]
+        assert db.search(f'"{word}"')
+    db.close()
+
+
+def test_split_db_keeps_clusters_together(tmp_path):
+    import corpus_db
+    import split_train_val
+
+    src = tmp_path / "clustered.csv"
+    with open(src, "w", newline="") as fh:
+        w = csv.writer(fh)
+        w.writerow(["to", "to_domain", "subject", "body", "intent", "cluster_id", "near_dup"])
+        for i in range(40):
+            cluster = "" if i % 5 == 4 else i // 5 * 5  # clusters of 4 led by rows 0, 5, 10, ...; 0 included
+            w.writerow([f"a{i}@x.example", "x.example", f"PO {i}", f"body {i}", ("order_request", "billing")[i % 2],
+                        cluster, int(cluster != "" and cluster != i)])
+    db_path = str(tmp_path / "corpus.db")
+    db = corpus_db.CorpusDB(db_path)
+    db.import_csv(str(src))
+    assert {type(r["cluster_id"]) for r in db.rows("labeled")} == {int, str}
+    db.close()
+
+    split_train_val.main(["--db", db_path, "--val_frac", "0.25"])
+    db = corpus_db.CorpusDB(db_path)
+    rows = db.conn.execute("SELECT cluster_id, split FROM emails WHERE cluster_id IS NOT NULL").fetchall()
+    db.close()
+    sides = {}
+    for cluster, split in rows:
+        sides.setdefault(cluster, set()).add(split)
+    assert len(sides) == 8 and all(len(s) == 1 for s in sides.values())
+    assert {s for v in sides.values() for s in v} == {"train", "val"}
+
+
+def _message(i, html=False):
+    ct = "text/html" if html else "text/plain"
+    body = f"<p>Please quote {i} valves</p>" if html else f"Please quote {i} valves"
+    return (
+        f"To: Buyer <buyer{i}@vendor.example>\nSubject: RFQ {i}\nMessage-ID: <rfq{i}@x>\n"
+        f"Content-Type: {ct}\n\n{body}\n"
+    )
+
+
+def test_reader_registry_formats(tmp_path):
+    # Maildir++ with a subfolder, temp files ignored
+    md = tmp_path / "Maildir"
+    for sub in ("cur", "new", "tmp", ".Sent/cur", ".Sent/new"):
+        (md / sub).mkdir(parents=True)
+    (md / "cur" / "1:2,S").write_text(_message(1))
+    (md / "new" / "2").write_text(_message(2, html=True))
+    (md / "tmp" / "3").write_text(_message(3))
+    (md / ".Sent" / "cur" / "4:2,S").write_text(_message(4))
+
+    # .eml tree
+    eml = tmp_path / "export"
+    (eml / "2024" / "01").mkdir(parents=True)
+    (eml / "a.eml").write_text(_message(5))
+    (eml / "2024" / "01" / "b.EML").write_text(_message(6))
+    (eml / "notes.txt").write_text("not mail")
+
+    # JSONL export (the ingest_example.py layout)
+    jl = tmp_path / "raw.jsonl"
+    jl.write_text(
+        '{"to": "Sales@Shop.example", "subject": "Re: PO 7", "body": "Ship it", "intent": "order_request"}\n'
+        "\n"
+        "not json\n"
+        '{"to": ["x@y.example", "z@y.example"], "subject": "Quote", "html": "<b>Price?</b>", "id": "m8"}\n'
+    )
+
+    assert readers.detect_reader(str(md)).name == "maildir"
+    assert readers.detect_reader(str(eml)).name == "eml"
+    assert readers.detect_reader(str(jl)).name == "jsonl"
+
+    for src, subjects in ((md, ["RFQ 4", "RFQ 1", "RFQ 2"]), (eml, ["RFQ 6", "RFQ 5"])):
+        dst = tmp_path / f"{src.name}.csv"
+        mbox_to_csv.main([str(src), str(dst), "--jobs", "2", "--resume"])
+        rows = _rows(dst)
+        assert [r[2] for r in rows[1:]] == subjects
+        mbox_to_csv.main([str(src), str(dst), "--jobs", "1", "--resume"])
+        assert _rows(dst) == rows
+
+    # the documented commands, from the repo root without PYTHONPATH
+    env = {k: v for k, v in os.environ.items() if k != "PYTHONPATH"}
+    dst = tmp_path / "jsonl.csv"
+    subprocess.run(
+        [sys.executable, "scripts/ingest_example.py", str(jl), str(dst), "--jobs", "1"],
+        check=True, cwd=ROOT, env=env, capture_output=True,
+    )
+    rows = _rows(dst)
+    assert rows[0] == ["to", "to_domain", "subject", "body", "intent"]
+    assert rows[1] == ["sales@shop.example", "shop.example", "PO 7", "Ship it", "order_request"]
+    assert rows[2] == ["x@y.example", "y.example", "Quote", "Price?", ""]
+
+    dst = tmp_path / "cli.csv"
+    subprocess.run(
+        [sys.executable, "scripts/mbox_to_csv.py", str(eml), str(dst), "--jobs", "2"],
+        check=True, cwd=ROOT, env=env, capture_output=True,
+    )
+    assert [r[2] for r in _rows(dst)[1:]] == ["RFQ 6", "RFQ 5"]
+
+
+def test_html_to_text_matches_legacy_and_is_linear():
+    import time
+
+    import bench
+    from app.preprocess import html_to_text
+
+    samples = [
+        "<p>Hello <b>team</b>,</p><p>PO&nbsp;#123 &amp; more</p>",
+        "<html><head><STYLE>p{x:y}</STYLE><script>var a='<p>';</script></head><body>Hi<br>there<BR/>!</body></html>",
+        "<div>a < b and c > d</div><!-- note -->tail <unclosed",
+        "<style>never closed<p>text</p>",
+        "plain text, no tags &lt;b&gt;",
+        "",
+    ]
+    for s in samples:
+        assert html_to_text(s) == bench.legacy_html_to_text(s)
+
+    nasty = "<p>Hi</p>" + "<style>a{}</style ><td>x</td>" * 5000 + "< 1 <" * 50000
+    t = time.perf_counter()
+    assert html_to_text(nasty, max_chars=0).startswith("Hi")
+    assert time.perf_counter() - t < 1.0
+
+    assert html_to_text("<p>" + "x" * 100 + "</p>", max_chars=10) == "x" * 7
+
+
+def _mime_samples():
+    from email.message import EmailMessage
+
+    out = []
+    m = EmailMessage()
+    m["To"], m["Subject"], m["Message-ID"] = "Buyer <b@shop.example>", "PO 12 attached", "<po12@x>"
+    m.set_content("Please find PO 12 attached.\nRegards, Ann =)\n", cte="quoted-printable")
+    m.add_alternative("<p>Please find <b>PO 12</b> attached.</p>", subtype="html")
+    m.add_attachment(os.urandom(200_000), maintype="application", subtype="pdf", filename="po12.pdf")
+    out.append(m)
+
+    m = EmailMessage()
+    m["To"], m["Subject"] = "ops@vendor.example", "Newsletter"
+    m.set_content("<html><body>Sale &amp; more<br>now</body></html>", subtype="html", cte="base64")
+    m.add_attachment(b"\x89PNG" + os.urandom(5000), maintype="image", subtype="png", filename="logo.png")
+    out.append(m)
+
+    inner = EmailMessage()
+    inner["Subject"] = "Original quote"
+    inner.set_content("Quote: 40 valves at 3.10 EUR (naïve pricing)\n", charset="utf-8", cte="base64")
+    m = EmailMessage()
+    m["To"], m["Subject"] = "sales@shop.example", "Fwd: quote"
+    m.set_content("See below.\n")
+    m.add_attachment(inner)
+    out.append(m)
+
+    m = EmailMessage()
+    m["To"], m["Subject"] = "a@b.example", "Invoice only"
+    m.set_content(os.urandom(3000), maintype="application", subtype="octet-stream")
+    out.append(m)
+    return out
+
+
+def test_lazy_mime_matches_full_parse(tmp_path):
+    from email import policy
+
+    from lazy_mime import extract_text_lazy
+
+    msgs = _mime_samples()
+    mbox = tmp_path / "mime.mbox"
+    with open(mbox, "wb") as fh:
+        for m in msgs:
+            raw = mailbox.mboxMessage(m).as_bytes().replace(b"\nFrom ", b"\n>From ")
+            fh.write(b"From x@y Mon Jan  1 00:00:00 2024\n" + raw + b"\n")
+    eml = tmp_path / "eml"
+    eml.mkdir()
+    for i, m in enumerate(msgs):
+        (eml / f"{i}.eml").write_bytes(m.as_bytes(policy=policy.SMTP))  # CRLF line ends
+
+    full, lazy = tmp_path / "full.csv", tmp_path / "lazy.csv"
+    for src in (mbox, eml):
+        mbox_to_csv.main([str(src), str(full), "--jobs", "1", "--mime", "full"])
+        mbox_to_csv.main([str(src), str(lazy), "--jobs", "1"])
+        rows = _rows(lazy)
+        # the octet-stream body is skipped by the lazy walk; the full parse decodes it as text
+        assert rows[:-1] == _rows(full)[:-1]
+        assert [r[2:4] for r in rows[1:]][-1] == ["Invoice only", ""]
+        assert [r[2] for r in rows[1:]] == ["PO 12 attached", "Newsletter", "quote", "Invoice only"]
+        assert "Regards, Ann =)" in rows[1][3] and "Sale & more" in rows[2][3] and "naïve" in rows[3][3]
+
+    for m in msgs[:3]:
+        data = m.as_bytes()
+        assert extract_text_lazy(data, 0, len(data), policy.default) == readers.extract_text(
+            email.message_from_bytes(data, policy=policy.default)
+        )
+
+    # per-part cap: only the first part_cap encoded bytes of a text part are decoded
+    big = msgs[0].as_bytes().replace(b"Please find PO 12", b"Please find PO 12 " + b"filler " * 50_000)
+    text, is_html = extract_text_lazy(big, 0, len(big), policy.default, part_cap=1000)
+    assert not is_html and text.startswith("Please find PO 12 filler") and len(text) <= 1000
+
+
+def test_segment_body_matches_legacy_quote_rules():
+    import bench
+    from app.preprocess import authored_text, segment_body, strip_quoted, top_segment
+
+    for body in bench.synthetic_bodies(300):
+        seg = segment_body(body)
+        assert seg.newest == strip_quoted(body) == bench.legacy_strip_quoted(body)
+        assert seg.top == top_segment(body) == bench.legacy_top_authored_segment(body)
+
+    body = (
+        "Need 5 units by Friday.\r\n\r\nBest regards,\r\nAnn\r\n\r\n"
+        "On Mon, Jan 1 Bob wrote:\r\n> Can you confirm?\r\n>> older\r\n"
+    )
+    seg = segment_body(body)
+    assert seg.top == "Need 5 units by Friday.\n\nBest regards,\nAnn"
+    assert seg.signature == "Best regards,\nAnn"
+    assert seg.quoted.startswith("On Mon, Jan 1 Bob wrote:")
+    assert seg.newest == bench.legacy_strip_quoted(body)
+    assert authored_text("Thanks,\n\nI need 5 more units") == "Thanks,\n\nI need 5 more units"
+    assert authored_text("PO 7 attached.\n-- \nCarol\nAcme") == "PO 7 attached."
+    # a bare '>' line no longer swallows the line after it
+    assert segment_body("hi\n>\nfoo").newest == "hi\n\nfoo"
+
+    # legacy line rules: "To:" needs text after it, '>' may be indented, any splitlines() boundary
+    edge_cases = [
+        "Please ship 5 units.\nTo:\nthe Asheville hangar\n> old",
+        "Please ship 5 units.\n  > indented quote\nafter",
+        "Please ship\x0cFrom: Dan\nold",
+        "Please ship\u2028> quoted\u2028old",
+        "Please ship\rOn Mon Dan wrote:\r> x",
+        "Thanks,\x0cAnn\u2028-- original message --\nold",
+    ]
+    for body in edge_cases:
+        assert segment_body(body).top == top_segment(body) == bench.legacy_top_authored_segment(body)
+        assert segment_body(body).newest == bench.legacy_strip_quoted(body)
+    assert segment_body(edge_cases[0]).top == "Please ship 5 units.\nTo:\nthe Asheville hangar"
+    assert segment_body(edge_cases[2]).top == "Please ship"
+
+
+def test_filter_keep_matches_row_wise_version():
+    import bench
+    import filter_csv
+    import pandas as pd
+
+    csv_rows = pd.read_csv(ROOT / "data" / "emails.csv").fillna("")
+    df = pd.concat([csv_rows, bench.synthetic_frame(2000)], ignore_index=True)
+    rules = filter_csv.load_rules("missing.json")
+    for extra in ({}, {"block_subject_keywords": ["invoice"], "block_body_keywords": ["defects", "rev 1"]}):
+        expected = bench.legacy_compute_keep(df.copy(), {**rules, **extra})
+        keep = filter_csv.compute_keep(df.copy(), {**rules, **extra})
+        assert keep.tolist() == expected.tolist()
+        assert 0 < keep.sum() < len(df)
+
+
+def test_filter_chunked_and_parallel_output_match_whole_file(tmp_path, monkeypatch):
+    import filter_csv
+    import pandas as pd
+
+    src = ROOT / "data" / "emails.csv"
+    monkeypatch.setattr(filter_csv, "RAW", str(src))
+    monkeypatch.setattr(filter_csv, "OUT", str(tmp_path / "whole.csv"))
+    filter_csv.main([])
+    monkeypatch.setattr(filter_csv, "OUT", str(tmp_path / "chunked.csv"))
+    filter_csv.main(["--chunksize", "97"])
+    assert (tmp_path / "chunked.csv").read_bytes() == (tmp_path / "whole.csv").read_bytes()
+    monkeypatch.setattr(filter_csv, "OUT", str(tmp_path / "jobs.csv"))
+    filter_csv.main(["--chunksize", "97", "--jobs", "2"])
+    assert (tmp_path / "jobs.csv").read_bytes() == (tmp_path / "whole.csv").read_bytes()
+
+    # to_domain is derived from `to` only if it is empty in the whole file, not per chunk
+    df = pd.read_csv(src).fillna("").head(300)
+    df["to_domain"] = ""
+    df.loc[299, "to_domain"] = "late.example"
+    df.to_csv(tmp_path / "domains.csv", index=False)
+    rules = {**filter_csv.load_rules("missing.json"), "block_domains": ["example"]}
+    expected = df[filter_csv.compute_keep(df, rules)]
+    rows, kept = filter_csv.filter_chunks(str(tmp_path / "domains.csv"), str(tmp_path / "out.csv"), rules, 50)
+    assert (rows, kept) == (300, len(expected))
+    assert (tmp_path / "out.csv").read_text() == expected.to_csv(index=False)
+
+
+def test_keyword_matcher_matches_substring_any():
+    import random
+
+    import pandas as pd
+    from keyword_matcher import KeywordMatcher
+
+    rng = random.Random(3)
+    texts = pd.Series(["".join(rng.choice("ab.(*) \n") for _ in range(rng.randint(0, 40))) for _ in range(300)])
+    for size in (0, 3, 200):
+        keywords = ["".join(rng.choice("ab.(*) ") for _ in range(rng.randint(1, 5))) for _ in range(size)]
+        for kws in (keywords, keywords + ["a", "ab"], keywords + [""]):
+            expected = [any(k in t for k in kws) for t in texts]
+            for substring_max in (0, 10_000):
+                matcher = KeywordMatcher(kws, substring_max=substring_max)
+                assert matcher.contains(texts).tolist() == expected
+                assert [matcher.search(t) for t in texts] == expected
+
+
+def test_boilerplate_index_strips_repeated_lines(tmp_path):
+    import boilerplate
+
+    words = ["valves", "gaskets", "pumps", "seals", "hoses", "north", "south", "east", "west", "central", "dock", "lot"]
+    disclaimer = "This e-mail and any attachments are confidential and intended solely for the addressee."
+    src = tmp_path / "inbox.mbox"
+    src.write_text(
+        "".join(
+            f"From a@x Mon Jan  1 00:00:00 2024\nTo: buyer{i}@shop.example\nSubject: PO {i}\n\n"
+            f"Please ship {i} {words[i % 6]} to our {words[i // 6]} warehouse.\n\n"
+            f"Ann Lee | Purchasing | +1 555 01{i:02d}\n{disclaimer}\n\n"
+            for i in range(30)
+        )
+    )
+    raw, stripped = tmp_path / "raw.csv", tmp_path / "stripped.csv"
+    mbox_to_csv.main([str(src), str(raw), "--jobs", "1"])
+
+    index_path = tmp_path / "bp.npy"
+    boilerplate.main(["build", str(raw), "--out", str(index_path), "--min-count", "10"])
+    index = boilerplate.BoilerplateIndex.load(str(index_path))
+    assert len(index) == 2  # the signature line (digits masked) and the disclaimer
+    assert boilerplate.line_hash(">>  ann lee | purchasing | +1 555 0199") in index.hashes
+
+    mbox_to_csv.main([str(src), str(stripped), "--jobs", "2", "--boilerplate", str(index_path)])
+    rows = _rows(stripped)
+    assert len(rows) == 31
+    assert [r[3] for r in rows[1:3]] == [
+        "Please ship 0 valves to our valves warehouse.",
+        "Please ship 1 gaskets to our valves warehouse.",
+    ]
+
+    boilerplate.main(["strip", str(raw), "--index", str(index_path)])
+    assert _rows(raw) == rows
+
+
+def _thread_mbox(path, specs):
+    path.write_text(
+        "".join(
+            f"From a@x Mon Jan  1 00:00:00 2024\nTo: buyer@shop.example\nSubject: {subject}\n"
+            f"Message-ID: <{mid}@x>\n{headers}\n{body}\n\n"
+            for mid, subject, headers, body in specs
+        )
+    )
+
+
+def test_threads_ids_positions_and_latest(tmp_path, capsys):
+    first = [
+        ("a", "PO 1", "", "Please quote 10 valves."),
+        ("b", "Re: PO 1", "In-Reply-To: <a@x>\nReferences: <a@x>\n", "Price is 3 EUR each."),
+        ("d", "Invoice 9", "", "Invoice 9 attached."),
+        # reply that arrives before its parent 'f', which is itself a reply to 'd'
+        ("g", "Re: Invoice 9", "References: <d@x> <f@x>\n", "Paid today."),
+        ("f", "Re: Invoice 9", "References: <d@x>\n", "Due date?"),
+    ]
+    more = [("c", "Re: PO 1", "In-Reply-To: <b@x>\n", "Confirmed, ship them.")]
+    src, dst = tmp_path / "inbox.mbox", tmp_path / "out.csv"
+    _thread_mbox(src, first)
+    mbox_to_csv.main([str(src), str(dst), "--jobs", "1", "--threads", "--resume"])
+    _thread_mbox(src, first + more)
+    mbox_to_csv.main([str(src), str(dst), "--jobs", "1", "--threads", "--resume"])
+
+    rows = _rows(dst)
+    assert rows[0][-2:] == ["thread_id", "thread_pos"]
+    by_body = {r[3]: (r[5], int(r[6])) for r in rows[1:]}
+    po, inv = by_body["Please quote 10 valves."][0], by_body["Invoice 9 attached."][0]
+    assert po != inv
+    assert by_body == {
+        "Please quote 10 valves.": (po, 0),
+        "Price is 3 EUR each.": (po, 1),
+        "Invoice 9 attached.": (inv, 0),
+        "Paid today.": (inv, 2),
+        "Due date?": (inv, 1),
+        # only In-Reply-To, parent known from the first run's checkpoint
+        "Confirmed, ship them.": (po, 2),
+    }
+
+    latest = tmp_path / "latest.csv"
+    _thread_mbox(src, first + more)
+    mbox_to_csv.main([str(src), str(latest), "--jobs", "1", "--latest-per-thread"])
+    assert [r[3] for r in _rows(latest)[1:]] == ["Paid today.", "Confirmed, ship them."]
+    assert "kept the newest message of each of 2 threads (4 earlier messages dropped)" in capsys.readouterr().out
@@ -93,6 +93,72 @@ on(document, 'DOMContentLoaded', () => {
     };
   }
 })();
+/* =========================================================================================
+ * Schema cache + delta sync (/schema?since=<version>)
+ * =======================================================================================*/
+const SCHEMA_CACHE_KEY = 'SMT_SCHEMA_CACHE_V1';
+
+function readSchemaCache(){
+  try {
+    const cached = JSON.parse(localStorage.getItem(SCHEMA_CACHE_KEY) || 'null');
+    return (cached && cached.version > 0 && cached.schema) ? cached : null;
+  } catch(_e) {
+    return null;
+  }
+}
+
+function writeSchemaCache(version, schema){
+  if (!(version > 0)) return; // unversioned server: nothing to sync against
+  try { localStorage.setItem(SCHEMA_CACHE_KEY, JSON.stringify({ version, schema })); } catch(_e) {}
+}
+
+async function loadSchemaSynced(cached = readSchemaCache()){
+  if (cached) {
+    const res = await fetch(`/schema?since=${encodeURIComponent(cached.version)}`);
+    if (res.ok) {
+      const delta = await res.json();
+      if (delta && typeof delta.version === 'number' && delta.added) {
+        const schema = delta.full ? {} : { ...cached.schema };
+        Object.assign(schema, delta.added || {}, delta.changed || {});
+        (delta.removed || []).forEach(id => { delete schema[id]; });
+        writeSchemaCache(delta.version, schema);
+        return schema;
+      }
+      // Unversioned server: it answered with the full schema
+      return delta;
+    }
+  }
+
+  const res = await fetch('/schema');
+  if (!res.ok) throw new Error('Failed to load schema');
+  const schema = await res.json();
+  writeSchemaCache(Number(res.headers.get('X-Schema-Version') || 0), schema);
+  return schema;
+}
+
+// One round trip for schema + cards + industries + capabilities. The server sends an
+// ETag with Cache-Control: no-cache, so a warm browser cache revalidates with a 304.
+// With a cached schema the bundle is fetched without it; the cache is reused as is when
+// capabilities.schemaVersion matches and patched through /schema?since= when it doesn't.
+async function loadBootstrap(){
+  const cached = readSchemaCache();
+  try {
+    const res = await fetch(cached ? '/bootstrap?schema=false' : '/bootstrap');
+    if (!res.ok) return null;
+    const boot = await res.json();
+    if (!boot || !Array.isArray(boot.intents)) return null;
+    const version = Number((boot.capabilities || {}).schemaVersion || 0);
+    if (boot.schema) {
+      writeSchemaCache(version, boot.schema);
+    } else if (cached) {
+      boot.schema = version === cached.version ? cached.schema : await loadSchemaSynced(cached);
+    }
+    return boot.schema ? boot : null;
+  } catch(_e) {
+    return null;
+  }
+}
+
 /* =========================================================================================
  * Init (modernized for YAML schema)
  * =======================================================================================*/
@@ -105,15 +171,22 @@ on(document, 'DOMContentLoaded', () => {
     if(document.body.dataset.theme === 'cosmic') Starfield.start();
 
     try {
-      // Fetch generated schema
-      const schemaRes = await fetch('/schema');
-      if (!schemaRes.ok) throw new Error('Failed to load schema');
-      window.SCHEMA = await schemaRes.json();
-
-      // Fetch compact intent list for cards
-      const intentsRes = await fetch('/intents');
-      if (!intentsRes.ok) throw new Error('Failed to load intents');
-      const data = await intentsRes.json();
+      const boot = await loadBootstrap();
+      let data;
+      if (boot) {
+        window.SCHEMA = boot.schema;
+        window.INDUSTRIES = boot.industries || [];
+        window.SERVER_CAPABILITIES = boot.capabilities || {};
+        data = boot.intents;
+      } else {
+        // Older server: fetch generated schema (cached copy + delta when versioned)
+        window.SCHEMA = await loadSchemaSynced();
+
+        // Fetch compact intent list for cards
+        const intentsRes = await fetch('/intents');
+        if (!intentsRes.ok) throw new Error('Failed to load intents');
+        data = await intentsRes.json();
+      }
 
       // Render cards dynamically from schema/intents
       let nextIntents = [];